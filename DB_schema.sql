@@ -56,9 +56,7 @@ CREATE TABLE `products` (
   `is_prime_eligible` tinyint(1) DEFAULT NULL,
   PRIMARY KEY (`product_id`),
   KEY `idx_category` (`category`),
-  KEY `idx_brand` (`brand`),
-  KEY `idx_products_productid` (`product_id`),
-  KEY `idx_products_category` (`category`)
+  KEY `idx_brand` (`brand`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -81,14 +79,18 @@ CREATE TABLE `time_dimension` (
   `is_weekend` tinyint(1) DEFAULT NULL,
   `festival_name` varchar(50) DEFAULT NULL,
   PRIMARY KEY (`date_key`),
-  KEY `idx_year_month` (`year`,`month`),
-  KEY `idx_time_dimension_datekey` (`date_key`)
+  KEY `idx_year_month` (`year`,`month`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
 -- Table structure for table `transactions`
 --
+-- Range partitioned by date_key year. MySQL does not allow foreign keys on
+-- partitioned tables, so referential integrity is checked by Data_Loader.py
+-- (utils/partitions.py report_orphans) and the partition key is part of the
+-- primary key. The loader adds partitions for new years.
+--
 
 DROP TABLE IF EXISTS `transactions`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
@@ -105,13 +107,185 @@ CREATE TABLE `transactions` (
   `corrected_price` decimal(10,2) NOT NULL,
   `return_status` varchar(20) DEFAULT NULL,
   `customer_rating` decimal(2,1) DEFAULT NULL,
-  PRIMARY KEY (`transaction_id`),
+  PRIMARY KEY (`transaction_id`,`date_key`),
   KEY `idx_analytics` (`date_key`,`customer_id`,`product_id`),
   KEY `idx_product_id` (`product_id`),
-  KEY `idx_customer` (`customer_id`),
-  CONSTRAINT `transactions_ibfk_1` FOREIGN KEY (`date_key`) REFERENCES `time_dimension` (`date_key`),
-  CONSTRAINT `transactions_ibfk_2` FOREIGN KEY (`customer_id`) REFERENCES `customers` (`customer_id`),
-  CONSTRAINT `transactions_ibfk_3` FOREIGN KEY (`product_id`) REFERENCES `products` (`product_id`)
+  KEY `idx_customer` (`customer_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+/*!50500 PARTITION BY RANGE  COLUMNS(date_key)
+(PARTITION p2015 VALUES LESS THAN ('2016-01-01'),
+ PARTITION p2016 VALUES LESS THAN ('2017-01-01'),
+ PARTITION p2017 VALUES LESS THAN ('2018-01-01'),
+ PARTITION p2018 VALUES LESS THAN ('2019-01-01'),
+ PARTITION p2019 VALUES LESS THAN ('2020-01-01'),
+ PARTITION p2020 VALUES LESS THAN ('2021-01-01'),
+ PARTITION p2021 VALUES LESS THAN ('2022-01-01'),
+ PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+ PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+ PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+ PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+ PARTITION pmax VALUES LESS THAN (MAXVALUE)) */;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `customer_sketches`
+--
+-- HyperLogLog sketches of customer_id per period (day/month/year grain) and
+-- state + segment slice, maintained by Data_Loader.py (see utils/sketches.py).
+--
+
+DROP TABLE IF EXISTS `customer_sketches`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `customer_sketches` (
+  `grain` varchar(5) NOT NULL,
+  `period_start` date NOT NULL,
+  `state` varchar(50) NOT NULL DEFAULT '',
+  `customer_segment` varchar(50) NOT NULL DEFAULT '',
+  `revenue` decimal(16,2) NOT NULL,
+  `orders` int NOT NULL,
+  `customer_sketch` blob NOT NULL,
+  PRIMARY KEY (`grain`,`period_start`,`state`,`customer_segment`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `load_runs`
+--
+-- One row per completed Data_Loader.py run. The latest load_id is the data
+-- version that derived caches (forecasts, snapshots) are keyed on.
+--
+
+DROP TABLE IF EXISTS `load_runs`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `load_runs` (
+  `load_id` int NOT NULL AUTO_INCREMENT,
+  `finished_at` datetime NOT NULL,
+  `transactions_loaded` int DEFAULT NULL,
+  PRIMARY KEY (`load_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `daily_ops_aggregates`
+--
+-- Per-day operational totals overall ('all'), by state and by category,
+-- maintained by Data_Loader.py for the sliding-window alerts (utils/alerts.py).
+--
+
+DROP TABLE IF EXISTS `daily_ops_aggregates`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `daily_ops_aggregates` (
+  `date_key` date NOT NULL,
+  `dimension` varchar(20) NOT NULL,
+  `dim_value` varchar(100) NOT NULL DEFAULT '',
+  `orders` int NOT NULL,
+  `returned` int NOT NULL,
+  `delivery_sum` decimal(14,2) NOT NULL,
+  `delivery_n` int NOT NULL,
+  `rating_sum` decimal(14,1) NOT NULL,
+  `rating_n` int NOT NULL,
+  PRIMARY KEY (`date_key`,`dimension`,`dim_value`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `alert_state`
+--
+
+DROP TABLE IF EXISTS `alert_state`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `alert_state` (
+  `rule` varchar(50) NOT NULL,
+  `window_days` smallint NOT NULL,
+  `dimension` varchar(20) NOT NULL,
+  `dim_value` varchar(100) NOT NULL DEFAULT '',
+  `value` double DEFAULT NULL,
+  `threshold` double NOT NULL,
+  `triggered` tinyint(1) NOT NULL,
+  `message` varchar(255) DEFAULT NULL,
+  `as_of` date NOT NULL,
+  `evaluated_at` datetime NOT NULL,
+  PRIMARY KEY (`rule`,`window_days`,`dimension`,`dim_value`),
+  KEY `idx_triggered` (`triggered`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `geo_cube`
+--
+-- Lifetime revenue / transactions / customers over the customer attributes,
+-- rebuilt by Data_Loader.py with GROUP BY ... WITH ROLLUP (utils/geo_cube.py).
+-- NULL attributes are rolled up; grouping_level counts the grouped ones.
+--
+
+DROP TABLE IF EXISTS `geo_cube`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `geo_cube` (
+  `grouping_level` tinyint NOT NULL,
+  `state` varchar(50) DEFAULT NULL,
+  `city` varchar(50) DEFAULT NULL,
+  `tier` varchar(50) DEFAULT NULL,
+  `customer_segment` varchar(50) DEFAULT NULL,
+  `age_range` varchar(50) DEFAULT NULL,
+  `is_prime_member` tinyint DEFAULT NULL,
+  `revenue` decimal(18,2) NOT NULL,
+  `transactions` int NOT NULL,
+  `customers` int NOT NULL,
+  KEY `idx_grouping_level` (`grouping_level`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+--
+-- Table structure for table `sample_strata`
+--
+-- Rows per (year, state, subcategory) stratum and the hash threshold the
+-- stratified sample was drawn with, rebuilt by Data_Loader.py (utils/sampling.py).
+--
+
+DROP TABLE IF EXISTS `sample_strata`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `sample_strata` (
+  `year` smallint NOT NULL,
+  `state` varchar(50) NOT NULL DEFAULT '',
+  `subcategory` varchar(100) NOT NULL DEFAULT '',
+  `stratum_rows` int NOT NULL,
+  `threshold` int NOT NULL,
+  `sample_rows` int NOT NULL DEFAULT 0,
+  PRIMARY KEY (`year`,`state`,`subcategory`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `transactions_sample`
+--
+-- Stratified sample of transactions, denormalized with the attributes the
+-- approximate page views filter and group on.
+--
+
+DROP TABLE IF EXISTS `transactions_sample`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `transactions_sample` (
+  `transaction_id` varchar(50) NOT NULL,
+  `date_key` date NOT NULL,
+  `year` smallint NOT NULL,
+  `month` tinyint DEFAULT NULL,
+  `festival_name` varchar(50) DEFAULT NULL,
+  `state` varchar(50) NOT NULL DEFAULT '',
+  `category` varchar(100) DEFAULT NULL,
+  `subcategory` varchar(100) NOT NULL DEFAULT '',
+  `corrected_price` decimal(10,2) NOT NULL,
+  `delivery_days` int DEFAULT NULL,
+  `payment_method` varchar(50) DEFAULT NULL,
+  `return_status` varchar(20) DEFAULT NULL,
+  `customer_rating` decimal(2,1) DEFAULT NULL,
+  PRIMARY KEY (`transaction_id`,`date_key`),
+  KEY `idx_stratum` (`year`,`state`,`subcategory`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
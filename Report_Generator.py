@@ -0,0 +1,491 @@
+"""
+Monthly report: the data_visualization.ipynb analyses as one batch job.
+
+    python Report_Generator.py --csv cleaned.csv --out reports --workers 4
+
+1. cleaned.csv is loaded once, only the columns the analyses use, with
+   categorical strings and narrow numeric types. The compact frame is kept
+   as Parquet next to the CSV and reused while the CSV is unchanged.
+2. The aggregates come from a few shared group-by passes (PASSES) instead
+   of one groupby over the full frame per analysis; every analysis derives
+   its small table from one of them.
+3. The figures are rendered in a process pool.
+4. Everything is written to a static directory: reports/<label>/index.html,
+   figures/*.png, data/*.csv and timings.json with per-analysis timings.
+"""
+import argparse
+import calendar
+import html
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Columns the analyses read, with compact types
+CATEGORICAL = [
+    "customer_id", "payment_method", "subcategory", "brand", "customer_city", "customer_tier",
+    "customer_age_group", "customer_spending_tier", "is_prime_member", "festival_name", "return_status",
+]
+NUMERIC = {
+    "order_year": "Int16",
+    "order_month": "Int8",
+    "final_amount_inr": "float64",
+    "original_price_inr": "float64",
+    "delivery_days": "float32",
+    "customer_rating": "float32",
+    "discount_percent": "float32",
+}
+NO_FESTIVAL = "No Festival"
+MAX_SCATTER_POINTS = 5000
+SEASONAL_YEARS = 6
+TOP_BRANDS = 10
+DISCOUNT_BINS = 20
+
+SALES = {"revenue": ("final_amount_inr", "sum"), "orders": ("final_amount_inr", "size")}
+
+# Shared group-by passes: name -> (keys, aggregations)
+PASSES = {
+    "time_product": (["order_year", "order_month", "subcategory", "payment_method"], SALES),
+    "customer_profile": (["customer_tier", "customer_city", "customer_age_group",
+                          "customer_spending_tier", "is_prime_member", "order_year"], SALES),
+    "customers": (["customer_id"], SALES),
+    "days": (["order_date", "is_festival"], SALES),
+    "ratings": (["return_status", "customer_rating"], SALES),
+    "brands": (["brand", "subcategory", "order_year"],
+               {**SALES, "list_price": ("original_price_inr", "sum")}),
+    "delivery": (["delivery_days", "customer_rating"], {"orders": ("final_amount_inr", "size")}),
+    "discounts": (["discount_percent"], {"orders": ("final_amount_inr", "size")}),
+}
+
+
+# Loading
+
+def columnar_cache(csv_path):
+    return csv_path.with_suffix(".report.parquet")
+
+
+def load_frame(csv_path):
+    """The columns the analyses need, from the Parquet cache when it is newer than the CSV."""
+    cache = columnar_cache(csv_path)
+    if cache.exists() and cache.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(cache)
+
+    dtypes = {**{c: "category" for c in CATEGORICAL}, **NUMERIC}
+    df = pd.read_csv(csv_path, usecols=list(dtypes) + ["order_date"], dtype=dtypes)
+    df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce", dayfirst=True)
+    df["is_festival"] = df["festival_name"].astype(object).fillna(NO_FESTIVAL) != NO_FESTIVAL
+    df = df.drop(columns=["festival_name"])
+    try:
+        df.to_parquet(cache, index=False)
+    except Exception as e:
+        print(f"Could not write columnar cache {cache}: {e}")
+    return df
+
+
+def check_pass(name, agg, df):
+    """Every row must land in some group of a pass."""
+    if "revenue" in agg and not np.isclose(agg["revenue"].sum(), df["final_amount_inr"].sum()):
+        raise RuntimeError(f"Pass {name} lost revenue: {agg['revenue'].sum()} of {df['final_amount_inr'].sum()}")
+    if agg["orders"].sum() != len(df):
+        raise RuntimeError(f"Pass {name} lost rows: {agg['orders'].sum()} of {len(df)}")
+
+
+def run_passes(df, names):
+    """Runs each needed group-by pass once; returns ({name: aggregate}, {name: seconds})."""
+    aggregates, seconds = {}, {}
+    for name in names:
+        keys, aggregations = PASSES[name]
+        start = time.perf_counter()
+        # Nulls keep their own group: every analysis drops the nulls of the keys it
+        # groups by (as the notebook's one-column groupbys do), not of the whole pass
+        aggregates[name] = df.groupby(keys, observed=True, dropna=False).agg(**aggregations).reset_index()
+        seconds[name] = time.perf_counter() - start
+        check_pass(name, aggregates[name], df)
+        print(f"  pass {name}: {len(aggregates[name])} groups in {seconds[name]:.2f}s")
+    return aggregates, seconds
+
+
+# Derivations: each turns one pass into the small table an analysis plots
+
+def sum_by(agg, keys, column="revenue"):
+    return agg.groupby(keys, observed=True)[column].sum()
+
+
+def monthly_revenue(agg):
+    return sum_by(agg, ["order_year", "order_month"]).unstack().reindex(columns=range(1, 13)).fillna(0)
+
+
+def seasonal_trend(agg):
+    monthly = monthly_revenue(agg)
+    return monthly.loc[sorted(monthly.index)[-SEASONAL_YEARS:]]
+
+
+def payment_evolution(agg):
+    return sum_by(agg, ["order_year", "payment_method"], "orders").unstack().fillna(0)
+
+
+def subcategory_revenue(agg):
+    return sum_by(agg, "subcategory").sort_values(ascending=False)
+
+
+def prime_impact(agg):
+    totals = agg.groupby("is_prime_member", observed=True)[["revenue", "orders"]].sum()
+    labels = ["Prime" if str(v).strip().lower() in ("1", "1.0", "true", "yes") else "Non-Prime"
+              for v in totals.index]
+    return pd.Series((totals["revenue"] / totals["orders"]).to_numpy(), index=labels).sort_index()
+
+
+def price_vs_demand(agg):
+    totals = agg.groupby(["subcategory", "order_year"], observed=True)[["revenue", "orders"]].sum()
+    return pd.DataFrame({"avg_price": totals["revenue"] / totals["orders"],
+                         "total_demand": totals["orders"]}).reset_index()
+
+
+def customer_sample(agg):
+    if len(agg) <= MAX_SCATTER_POINTS:
+        return agg[["orders", "revenue"]]
+    return agg[["orders", "revenue"]].sample(MAX_SCATTER_POINTS, random_state=0)
+
+
+def festival_average(agg):
+    daily = agg.groupby(["order_date", "is_festival"])["revenue"].sum().reset_index()
+    return daily.groupby("is_festival")["revenue"].mean().rename({True: "Festival", False: "No Festival"})
+
+
+def daily_sales(agg):
+    return agg.groupby(["order_date", "is_festival"])["revenue"].sum().reset_index().sort_values("order_date")
+
+
+def returned_by_rating(agg):
+    return agg[agg["return_status"] == "Returned"].groupby("customer_rating")["orders"].sum()
+
+
+def brand_by_category(agg):
+    pivot = sum_by(agg, ["subcategory", "brand"], "list_price").unstack().fillna(0)
+    return pivot[pivot.sum().sort_values(ascending=False).index[:TOP_BRANDS]]
+
+
+def discount_bins(agg):
+    # The notebook's 20-bin histogram, from the distinct values weighted by their orders
+    known = agg.dropna(subset=["discount_percent"])
+    counts, edges = np.histogram(known["discount_percent"], bins=DISCOUNT_BINS, weights=known["orders"])
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "orders": counts})
+
+
+# Plots: ax, data -> None; run in the render workers
+
+def bar(ax, data, xlabel="", ylabel="Revenue (INR)", horizontal=False):
+    labels = [str(label) for label in data.index]
+    if horizontal:
+        ax.barh(labels[::-1], data.to_numpy()[::-1])
+        ax.set_xlabel(ylabel)
+        ax.set_ylabel(xlabel)
+    else:
+        ax.bar(labels, data.to_numpy())
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.tick_params(axis="x", rotation=45)
+    ax.ticklabel_format(style="plain", axis="x" if horizontal else "y")
+
+
+def histogram(ax, data):
+    ax.bar(data["left"], data["orders"], width=data["right"] - data["left"], align="edge", edgecolor="black")
+    ax.set_xlabel("discount_percent")
+    ax.set_ylabel("Number of Orders")
+
+
+def heatmap(ax, data):
+    image = ax.imshow(data.to_numpy(), aspect="auto", cmap="Blues")
+    ax.figure.colorbar(image, ax=ax, label="Sales")
+    ax.set_xticks(range(12), [calendar.month_abbr[m] for m in range(1, 13)])
+    ax.set_yticks(range(len(data.index)), [str(y) for y in data.index])
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Year")
+
+
+def lines(ax, data, xlabel="", ylabel="", by_row=False):
+    data = data.T if by_row else data
+    for column in data.columns:
+        ax.plot(data.index, data[column].to_numpy(), marker="o", label=str(column))
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend()
+    ax.grid(alpha=0.3)
+
+
+def seasonal_lines(ax, data):
+    lines(ax, data, "Month", "Sales", by_row=True)
+    ax.set_xticks(range(1, 13), [calendar.month_abbr[m] for m in range(1, 13)])
+
+
+def pie(ax, data):
+    ax.pie(data.to_numpy(), labels=[str(label) for label in data.index], autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+
+
+def scatter(ax, data, x, y, xlabel, ylabel):
+    ax.scatter(data[x], data[y], alpha=0.4, s=10)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+
+
+def price_demand_scatter(ax, data):
+    for subcategory, rows in data.groupby("subcategory", observed=True):
+        ax.scatter(rows["avg_price"], rows["total_demand"], s=80, alpha=0.6, label=str(subcategory))
+    ax.set_xlabel("Average Price (INR)")
+    ax.set_ylabel("Total Demand (Units Sold)")
+    ax.legend()
+    ax.grid(True)
+
+
+def daily_line(ax, data):
+    ax.plot(data["order_date"], data["revenue"], label="Sales")
+    festival = data[data["is_festival"]]
+    ax.scatter(festival["order_date"], festival["revenue"], color="red", label="Festival Days")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Sales")
+    ax.legend()
+
+
+def delivery_rating_bubbles(ax, data):
+    ax.scatter(data["delivery_days"], data["customer_rating"],
+               s=300 * data["orders"] / max(data["orders"].max(), 1), alpha=0.5)
+    ax.set_xlabel("Delivery Days")
+    ax.set_ylabel("Customer Rating")
+    ax.grid(True)
+
+
+def stacked_bars(ax, data):
+    data.plot(kind="bar", stacked=True, ax=ax)
+    ax.set_xlabel("Subcategory")
+    ax.set_ylabel("Total Original Price (INR)")
+    ax.legend(title="Brand")
+
+
+# name -> (title, pass, derive(aggregate), plot(ax, data), figsize)
+ANALYSES = {
+    "yearly_revenue": (
+        "Yearly Sales in INR", "time_product",
+        lambda agg: sum_by(agg, "order_year"),
+        lambda ax, data: bar(ax, data, "Year"), (10, 5)),
+    "monthly_heatmap": (
+        "Monthly Sales Heatmap (Across Years)", "time_product",
+        monthly_revenue, heatmap, (14, 6)),
+    "seasonal_trend": (
+        "Seasonal Sales Trend by Year", "time_product",
+        seasonal_trend, seasonal_lines, (14, 6)),
+    "rfm_scatter": (
+        "RFM Scatter Plot: Frequency vs Monetary", "customers",
+        customer_sample,
+        lambda ax, data: scatter(ax, data, "orders", "revenue", "Purchase Frequency",
+                                 "Total Monetary Value (INR)"), (8, 5)),
+    "purchase_frequency": (
+        "Distribution of Customer Purchase Frequency", "customers",
+        lambda agg: agg["orders"].value_counts().sort_index(),
+        lambda ax, data: bar(ax, data, "Number of Purchases per Customer", "Number of Customers"), (10, 5)),
+    "payment_evolution": (
+        "Evolution of Payment Methods", "time_product",
+        payment_evolution,
+        lambda ax, data: lines(ax, data, "Year", "Number of Orders"), (12, 6)),
+    "subcategory_revenue": (
+        "Total Sales by Subcategory (INR)", "time_product",
+        subcategory_revenue,
+        lambda ax, data: bar(ax, data, "Subcategory", horizontal=True), (12, 7)),
+    "subcategory_share": (
+        "Sales Contribution by Subcategory", "time_product",
+        subcategory_revenue, pie, (8, 8)),
+    "price_vs_demand": (
+        "Price vs Demand: Subcategory Comparison", "time_product",
+        price_vs_demand, price_demand_scatter, (12, 6)),
+    "prime_impact": (
+        "Average Final Amount by Prime Membership", "customer_profile",
+        prime_impact,
+        lambda ax, data: bar(ax, data, "Prime Member", "Average Final Amount (INR)"), (10, 6)),
+    "city_revenue": (
+        "Total Revenue by City (INR)", "customer_profile",
+        lambda agg: sum_by(agg, "customer_city").sort_values(ascending=False),
+        lambda ax, data: bar(ax, data, "City", horizontal=True), (15, 8)),
+    "tier_revenue": (
+        "Total Revenue by Customer Tier (INR)", "customer_profile",
+        lambda agg: sum_by(agg, "customer_tier").sort_values(ascending=False),
+        lambda ax, data: bar(ax, data, "Customer Tier"), (10, 6)),
+    "tier_growth": (
+        "Revenue Growth Patterns by Customer Tier Over Time", "customer_profile",
+        lambda agg: sum_by(agg, ["order_year", "customer_tier"]).unstack().fillna(0),
+        lambda ax, data: lines(ax, data, "Order Year", "Total Final Amount (INR)"), (10, 7)),
+    "age_group_sales": (
+        "Total Sales by Customer Age Group (INR)", "customer_profile",
+        lambda agg: sum_by(agg, "customer_age_group"),
+        lambda ax, data: bar(ax, data, "Customer Age Group"), (10, 6)),
+    "spending_tier_sales": (
+        "Customer Segment vs Sales (INR)", "customer_profile",
+        lambda agg: sum_by(agg, "customer_spending_tier").sort_values(ascending=False),
+        lambda ax, data: bar(ax, data, "Customer Segment"), (12, 6)),
+    "festival_average": (
+        "Average Sales: Festival vs Non-Festival Days", "days",
+        festival_average,
+        lambda ax, data: bar(ax, data, "", "Average Sales (INR)"), (8, 5)),
+    "festival_daily": (
+        "Daily Sales with Festival Highlights", "days",
+        daily_sales, daily_line, (12, 5)),
+    "delivery_days": (
+        "Distribution of Delivery Days", "delivery",
+        lambda agg: agg.groupby("delivery_days")["orders"].sum(),
+        lambda ax, data: bar(ax, data, "Delivery Days", "Number of Orders"), (10, 5)),
+    "delivery_vs_rating": (
+        "Delivery Days vs Customer Rating (bubble size = orders)", "delivery",
+        lambda agg: agg, delivery_rating_bubbles, (10, 6)),
+    "return_status": (
+        "Return Status Distribution", "ratings",
+        lambda agg: agg.groupby("return_status", observed=True)["orders"].sum(), pie, (8, 6)),
+    "returned_by_rating": (
+        "Count of Returned Items by Customer Rating", "ratings",
+        returned_by_rating,
+        lambda ax, data: bar(ax, data, "Customer Rating (1 to 5)", "Count of Returned Items"), (8, 5)),
+    "rating_sales": (
+        "Sales by Customer Rating", "ratings",
+        lambda agg: agg.groupby("customer_rating")["revenue"].sum(),
+        lambda ax, data: bar(ax, data, "Customer Rating"), (8, 5)),
+    "top_brands": (
+        f"Top {TOP_BRANDS} Brands by Total Sales (INR)", "brands",
+        lambda agg: sum_by(agg, "brand").sort_values(ascending=False).head(TOP_BRANDS),
+        lambda ax, data: bar(ax, data, "Brand"), (12, 6)),
+    "brand_by_category": (
+        f"Brand Comparison by Category (Top {TOP_BRANDS} Brands)", "brands",
+        brand_by_category, stacked_bars, (16, 9)),
+    "discount_distribution": (
+        "Distribution of discount_percent on orders", "discounts",
+        discount_bins, histogram, (10, 5)),
+}
+
+
+# Rendering (worker processes)
+
+def render_figure(name, data, path):
+    """Draws one analysis into path; returns (name, seconds)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    title, _, _, plot, figsize = ANALYSES[name]
+    fig, ax = plt.subplots(figsize=figsize)
+    plot(ax, data)
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path, format="png")
+    plt.close(fig)
+    return name, time.perf_counter() - start
+
+
+# Report
+
+def write_index(out_dir, label, csv_path, rows, timings):
+    sections = "\n".join(
+        f'<h2>{html.escape(ANALYSES[t["analysis"]][0])}</h2>\n'
+        f'<img src="figures/{t["analysis"]}.png" alt="{html.escape(t["analysis"])}">\n'
+        f'<p><a href="data/{t["analysis"]}.csv">data</a></p>'
+        for t in timings if t.get("render_seconds") is not None
+    )
+    table = "\n".join(
+        f'<tr><td>{t["analysis"]}</td><td>{t["pass"]}</td><td>{t["pass_seconds"]:.2f}</td>'
+        f'<td>{t["derive_seconds"]:.3f}</td><td>{(t["render_seconds"] or 0):.2f}</td></tr>'
+        for t in timings
+    )
+    (out_dir / "index.html").write_text(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Amazon Sales Report {html.escape(label)}</title>
+<style>body {{ font-family: sans-serif; max-width: 1100px; margin: auto; }} img {{ max-width: 100%; }}
+td, th {{ padding: 2px 10px; text-align: right; }}</style></head>
+<body>
+<h1>Amazon Sales Report {html.escape(label)}</h1>
+<p>{rows:,} transactions from {html.escape(csv_path.name)}, generated {datetime.now():%Y-%m-%d %H:%M}.</p>
+{sections}
+<h2>Timings (seconds)</h2>
+<table><tr><th>analysis</th><th>pass (shared)</th><th>pass</th><th>derive</th><th>render</th></tr>
+{table}
+</table>
+</body></html>
+""", encoding="utf-8")
+
+
+def generate_report(csv_path, out_root, label, workers=4, only=None):
+    csv_path = Path(csv_path)
+    names = only or list(ANALYSES)
+    out_dir = Path(out_root) / label
+    (out_dir / "figures").mkdir(parents=True, exist_ok=True)
+    (out_dir / "data").mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    df = load_frame(csv_path)
+    load_seconds = time.perf_counter() - start
+    print(f"Loaded {len(df):,} rows ({df.memory_usage(deep=True).sum() / 2 ** 20:.0f} MB) "
+          f"in {load_seconds:.1f}s")
+
+    aggregates, pass_seconds = run_passes(df, sorted({ANALYSES[name][1] for name in names}))
+    rows = len(df)
+    del df
+
+    timings = {}
+    derived = {}
+    for name in names:
+        _, pass_name, derive, _, _ = ANALYSES[name]
+        derive_start = time.perf_counter()
+        derived[name] = derive(aggregates[pass_name])
+        timings[name] = {
+            "analysis": name,
+            "pass": pass_name,
+            "pass_seconds": round(pass_seconds[pass_name], 3),
+            "derive_seconds": round(time.perf_counter() - derive_start, 4),
+            "render_seconds": None,
+        }
+        derived[name].to_csv(out_dir / "data" / f"{name}.csv")
+
+    print(f"Rendering {len(names)} figures with {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_figure, name, derived[name], str(out_dir / "figures" / f"{name}.png")): name
+            for name in names
+        }
+        for future in as_completed(futures):
+            try:
+                name, seconds = future.result()
+                timings[name]["render_seconds"] = round(seconds, 3)
+            except Exception as e:
+                print(f"  -> ERROR rendering {futures[future]}: {e}")
+
+    timings = [timings[name] for name in names]
+    total = time.perf_counter() - start
+    (out_dir / "timings.json").write_text(json.dumps({
+        "label": label,
+        "source": str(csv_path),
+        "rows": rows,
+        "load_seconds": round(load_seconds, 3),
+        "pass_seconds": {k: round(v, 3) for k, v in pass_seconds.items()},
+        "total_seconds": round(total, 3),
+        "analyses": timings,
+    }, indent=2))
+    write_index(out_dir, label, csv_path, rows, timings)
+    print(f"Wrote {out_dir / 'index.html'} in {total:.1f}s.")
+    return out_dir, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the static sales report from cleaned.csv.")
+    parser.add_argument("--csv", default="cleaned.csv")
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--label", default=datetime.now().strftime("%Y-%m"), help="Report directory name.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--only", nargs="+", choices=list(ANALYSES), help="Only these analyses.")
+    args = parser.parse_args()
+
+    if not Path(args.csv).exists():
+        sys.exit(f"ERROR: {args.csv} not found.")
+    out_dir, timings = generate_report(args.csv, args.out, args.label, args.workers, args.only)
+    if any(t["render_seconds"] is None for t in timings):
+        sys.exit(1)
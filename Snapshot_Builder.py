@@ -0,0 +1,122 @@
+import argparse
+import shutil
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils import snapshots, shared_snapshot
+from utils.analytics_backend import get_analytics_connection
+from utils.db_connection import get_connection
+from utils.load_runs import get_data_version
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+
+# Each job runs one page's data preparation without Streamlit and returns
+# {snapshot_name: DataFrame}. Page modules are imported inside the job so
+# every worker process opens its own database connection.
+
+def executive_job():
+    from pages._2_Executive_Dashboard import get_executive_summary
+    kpis, categories_df = get_executive_summary(get_analytics_connection())
+    return {
+        "executive_kpis": pd.DataFrame([kpis] if kpis else []),
+        "executive_top_categories": categories_df if categories_df is not None else pd.DataFrame(),
+    }
+
+
+def geographic_cube_job():
+    from pages._3_Revenue_Analytics import query_geographic_cube
+    return {"geo_cube": query_geographic_cube()}
+
+
+def customer_job():
+    from pages._4_Customer_Analytics import query_data
+    customers, transactions = query_data()
+    return {"customers": customers, "customer_transactions": transactions}
+
+
+def inventory_job():
+    from pages._5_Inventory_Analytics import query_data
+    return {"inventory": query_data()}
+
+
+def sample_job():
+    from utils.sampling import query_sample
+    return {"transactions_sample": query_sample()}
+
+
+JOBS = {
+    "executive": executive_job,
+    "geographic_cube": geographic_cube_job,
+    "customer": customer_job,
+    "inventory": inventory_job,
+    "sample": sample_job,
+}
+
+
+def run_job(name, directory):
+    """Runs one job and writes its snapshots; returns (name, seconds, rows written)."""
+    start = time.perf_counter()
+    frames = JOBS[name]()
+    rows = 0
+    for snapshot_name, df in frames.items():
+        snapshots.write_snapshot(directory, snapshot_name, df)
+        if snapshot_name in shared_snapshot.SHARED_DATASETS:
+            shared_snapshot.write_shared(directory, snapshot_name, df)
+        rows += len(df)
+    return name, time.perf_counter() - start, rows
+
+
+def build_snapshots(workers=4, jobs=None):
+    """Runs every job in parallel and publishes the snapshots for the current data version."""
+    conn = get_connection()
+    if conn is None:
+        print("ERROR: No database connection available for snapshot build.")
+        return None
+    version = get_data_version(conn)
+    conn.close()
+
+    directory = snapshots.staging_dir(version)
+    names = jobs or list(JOBS)
+    if jobs and snapshots.current_version() != version:
+        # The published datasets are of older data: nothing to carry over
+        print(f"No published snapshots of data version {version}: building every job.")
+        names = list(JOBS)
+    elif jobs:
+        # Partial rebuild: carry the other datasets over from the published build
+        snapshots.seed_from_current(directory)
+    print(f"Building {len(names)} snapshot jobs for data version {version} with {workers} workers...")
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, name, str(directory)): name for name in names}
+        for future in as_completed(futures):
+            try:
+                name, seconds, rows = future.result()
+                print(f"  -> {name}: {rows} rows in {seconds:.1f}s")
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"  -> ERROR in {futures[future]}: {e}")
+
+    if failed:
+        print(f"Not publishing version {version}: {len(failed)} jobs failed.")
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+
+    path = snapshots.publish(directory)
+    print(f"Published snapshots to {path}.")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute dashboard datasets into snapshots.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--jobs", nargs="+", choices=list(JOBS), help="Only run these jobs.")
+    args = parser.parse_args()
+
+    if build_snapshots(args.workers, args.jobs) is None:
+        sys.exit(1)
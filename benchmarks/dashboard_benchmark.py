@@ -0,0 +1,168 @@
+# benchmarks/dashboard_benchmark.py
+"""
+End-to-end timings of every dashboard page against a synthetic dataset.
+
+Point AMAZONDB_DATABASE at a scratch database created from DB_schema.sql,
+then for example:
+    python -m benchmarks.dashboard_benchmark --scale 1M --label baseline
+    python -m benchmarks.dashboard_benchmark --scale 1M --skip-load --label after --compare baseline
+
+For each page it times the headless data query (cold, straight from the
+database) and the page's app() render with warm caches, recording wall
+time, peak Python allocations and resident memory growth. Results are
+written to benchmarks/results/<label>.json so runs can be compared.
+Set DASHBOARD_BACKEND=duckdb to benchmark the embedded analytics replica
+(the load step builds it) instead of MySQL.
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+# Benchmark the queries, not published snapshots: point the snapshot
+# reader at an empty directory before any page is imported.
+os.environ["DASHBOARD_SNAPSHOT_DIR"] = tempfile.mkdtemp(prefix="dashboard-benchmark-")
+
+import psutil
+
+from benchmarks import synthetic_data
+from utils import analytics_backend, page_registry
+from utils.analytics_backend import get_analytics_connection
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def executive_query():
+    from pages._2_Executive_Dashboard import get_executive_summary
+    return get_executive_summary(get_analytics_connection())
+
+
+def revenue_query():
+    from pages._3_Revenue_Analytics import query_geographic_cube
+    return query_geographic_cube()
+
+
+def customer_query():
+    from pages._4_Customer_Analytics import query_data
+    return query_data()
+
+
+def inventory_query():
+    from pages._5_Inventory_Analytics import query_data
+    return query_data()
+
+
+# These pages only read SQL aggregates: time their loaders uncached
+
+def logistics_query():
+    from pages import _6_Logistics as page
+    loaders = [page.load_ops_summary, page.load_status_counts, page.load_payment_counts,
+               page.load_rating_histogram]
+    return [loader.__wrapped__() for loader in loaders]
+
+
+def advanced_query():
+    from pages import _7_Advanced_Analytics as page
+    loaders = [page.load_kpis, page.load_delivery, page.load_payments, page.load_satisfaction]
+    return [loader.__wrapped__() for loader in loaders]
+
+
+QUERIES = {
+    "Executive Dashboard": executive_query,
+    "Revenue Analytics": revenue_query,
+    "Customer Analytics": customer_query,
+    "Inventory Analytics": inventory_query,
+    "Logistics": logistics_query,
+    "Advanced Analytics": advanced_query,
+}
+
+
+def measure(fn, repeats):
+    """Best wall time over repeats, with peak traced allocations and RSS growth of the first run."""
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+    tracemalloc.start()
+    timings = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if i == 0:
+            _, peak = tracemalloc.get_traced_memory()
+            rss_growth = process.memory_info().rss - rss_before
+    tracemalloc.stop()
+    return {
+        "seconds": min(timings),
+        "peak_mb": peak / 2 ** 20,
+        "rss_growth_mb": rss_growth / 2 ** 20,
+    }
+
+
+def run(repeats):
+    results = {}
+    for name, query in QUERIES.items():
+        print(f"Timing {name}...")
+        results[f"{name} / query"] = measure(query, repeats)
+        # app() runs in Streamlit bare mode (outside `streamlit run`), elements are discarded
+        render = lambda: page_registry.render(name)
+        render()  # warm the page's caches first
+        results[f"{name} / render (warm)"] = measure(render, repeats)
+    return results
+
+
+def print_table(results, baseline=None):
+    header = "| step | seconds | peak MB | RSS growth MB |"
+    if baseline:
+        header += " vs baseline |"
+    print(header)
+    print("|" + "---|" * (header.count("|") - 1))
+    for step, r in results.items():
+        row = f"| {step} | {r['seconds']:.3f} | {r['peak_mb']:.1f} | {r['rss_growth_mb']:.1f} |"
+        if baseline:
+            before = baseline.get(step)
+            row += f" {r['seconds'] / before['seconds'] - 1:+.0%} |" if before and before["seconds"] else " n/a |"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every dashboard page on synthetic data.")
+    parser.add_argument("--scale", choices=list(synthetic_data.SCALES), default="1M")
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the data already loaded.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--label", default="latest", help="Results are saved as results/<label>.json.")
+    parser.add_argument("--compare", help="Label (or path) of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    if not args.skip_load:
+        start = time.perf_counter()
+        synthetic_data.load_mysql(synthetic_data.SCALES[args.scale])
+        print(f"Loaded {args.scale} transactions in {time.perf_counter() - start:.1f}s")
+
+    results = run(args.repeats)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{args.label}.json"
+    path.write_text(json.dumps({
+        "scale": args.scale, "backend": analytics_backend.BACKEND, "results": results
+    }, indent=2))
+    print(f"Saved results to {path}\n")
+
+    baseline = None
+    if args.compare:
+        compare = Path(args.compare)
+        if not compare.exists():
+            compare = RESULTS_DIR / f"{args.compare}.json"
+        baseline = json.loads(compare.read_text())["results"]
+    print_table(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
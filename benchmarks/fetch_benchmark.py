@@ -0,0 +1,60 @@
+# benchmarks/fetch_benchmark.py
+"""
+Fetch throughput and peak memory: pd.read_sql versus the streaming typed fetch.
+
+Runs a page-sized query against the configured MySQL database:
+    python -m benchmarks.fetch_benchmark --limit 1000000 --chunk-rows 50000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+from utils import typed_fetch
+from utils.db_connection import new_connection
+
+warnings.filterwarnings("ignore")
+
+QUERY = """
+    SELECT
+        t.transaction_id, t.corrected_price, t.customer_rating, t.payment_method,
+        t.delivery_days, t.return_status, td.date_key, td.year, td.month, p.category
+    FROM transactions t
+    JOIN time_dimension td ON t.date_key = td.date_key
+    JOIN products p ON t.product_id = p.product_id
+"""
+
+
+def run(name, fetch):
+    conn = new_connection()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = fetch(conn)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    conn.close()
+
+    frame_mb = df.memory_usage(deep=True).sum() / 2 ** 20
+    print(f"{name:<14} {len(df):>10,} {seconds:>8.2f} {len(df) / seconds:>12,.0f} "
+          f"{peak / 2 ** 20:>9.1f} {frame_mb:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pd.read_sql with the streaming typed fetch.")
+    parser.add_argument("--limit", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=typed_fetch.CHUNK_ROWS)
+    args = parser.parse_args()
+
+    query = f"{QUERY} LIMIT {int(args.limit)}"
+    print(f"{'fetch':<14} {'rows':>10} {'seconds':>8} {'rows/sec':>12} {'peak MB':>9} {'frame MB':>9}")
+    run("pd.read_sql", lambda conn: pd.read_sql(query, conn))
+    run("typed stream", lambda conn: typed_fetch.stream_mysql(conn, query, chunk_rows=args.chunk_rows))
+
+
+if __name__ == "__main__":
+    main()
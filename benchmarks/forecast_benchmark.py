@@ -0,0 +1,55 @@
+# benchmarks/forecast_benchmark.py
+"""
+Throughput of the batched forecasting engine (series forecast per second).
+
+Runs on a synthetic demand matrix, no database needed:
+    python -m benchmarks.forecast_benchmark --series 1000 10000 50000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils import forecasting
+
+
+def synthetic_demand(n_series, n_months, seed=0):
+    """Poisson demand with a per-series level, trend and yearly seasonality."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_months)
+    level = rng.gamma(2.0, 20.0, size=(n_series, 1))
+    trend = rng.normal(0, 0.002, size=(n_series, 1))
+    season = 1 + 0.3 * np.sin(2 * np.pi * (t + rng.integers(0, 12, size=(n_series, 1))) / 12)
+    # A steep negative trend would take the rate below zero in later months
+    rate = np.maximum(level * season * (1 + trend * t), 0)
+    return rng.poisson(rate).astype(np.float64)
+
+
+def run(n_series, n_months, horizon, repeats):
+    matrix = synthetic_demand(n_series, n_months)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        forecasts, errors, best = forecasting.forecast_all(matrix, horizon=horizon)
+        forecasting.best_forecasts(forecasts, best)
+        timings.append(time.perf_counter() - start)
+    best_time = min(timings)
+    return best_time, n_series / best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched forecasting engine.")
+    parser.add_argument("--series", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--months", type=int, default=132)
+    parser.add_argument("--horizon", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'series':>10} {'months':>7} {'seconds':>9} {'series/sec':>12}")
+    for n_series in args.series:
+        seconds, rate = run(n_series, args.months, args.horizon, args.repeats)
+        print(f"{n_series:>10} {args.months:>7} {seconds:>9.3f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
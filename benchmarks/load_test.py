@@ -0,0 +1,274 @@
+# benchmarks/load_test.py
+"""
+Concurrent-session load test of the Streamlit dashboard.
+
+Drives N simulated sessions at once through app.py with Streamlit's testing
+API (AppTest): every session is a separate script session in this process,
+as with `streamlit run`, so they share the page caches and the database
+connections exactly like real users on one server process. Each session
+opens the dashboard, then repeatedly either navigates to another page or
+changes one of the page's filters (selectboxes and toggles).
+
+Point AMAZONDB_DATABASE at a scratch database created from DB_schema.sql
+(the same stand-in as benchmarks/dashboard_benchmark.py), then for example:
+    python -m benchmarks.load_test --scale 1M --sessions 1 5 10 25 --steps 10 --label baseline
+    python -m benchmarks.load_test --skip-load --sessions 1 5 10 25 --label after
+
+For every concurrency level it reports page latency percentiles (one
+script run per step), errors, the peak number of database connections
+(server-wide Threads_connected and this process's own sockets) and the
+process memory. Caches are cleared before each level, like the first
+visitors after a load, unless --warm is given. Results are written to
+benchmarks/results/load_<label>.json.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+# Like the page benchmark, measure the queries rather than published
+# snapshots, unless a snapshot directory is given explicitly
+os.environ.setdefault("DASHBOARD_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="dashboard-load-test-"))
+
+import numpy as np
+import psutil
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import synthetic_data
+from utils import analytics_backend, cache_manager, page_registry
+from utils.db_connection import new_connection
+
+warnings.filterwarnings("ignore")
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+NAVIGATION_LABEL = "Go to"
+MYSQL_PORT = 3306
+SAMPLE_SECONDS = 0.2
+
+
+# Simulated sessions
+
+def filters(at):
+    """The page's filter widgets: every selectbox but navigation, and toggles."""
+    boxes = [box for box in at.selectbox if box.label != NAVIGATION_LABEL and len(box.options) > 1]
+    return boxes + list(at.toggle)
+
+
+def next_step(at, rng, navigate):
+    """Changes one widget on the page; returns (page, action)."""
+    navigation = next(box for box in at.sidebar.selectbox if box.label == NAVIGATION_LABEL)
+    page = navigation.value
+    widgets = filters(at)
+    if not widgets or rng.random() < navigate:
+        page = rng.choice([name for name in page_registry.PAGES if name != page])
+        navigation.select(page)
+        return page, "navigate"
+    widget = rng.choice(widgets)
+    if hasattr(widget, "options"):
+        widget.select_index(rng.randrange(len(widget.options)))
+        return page, f"filter {widget.label}"
+    widget.set_value(not widget.value)
+    return page, f"toggle {widget.label}"
+
+
+def open_app(timeout):
+    # From the source rather than the file, so Streamlit does not pick up
+    # pages/ as multipage-app pages: the dashboard navigates with its own selectbox
+    return AppTest.from_string(APP.read_text(encoding="utf-8"), default_timeout=timeout)
+
+
+def run_step(at, page, action, timeout, steps, lock):
+    start = time.perf_counter()
+    error = None
+    try:
+        at.run(timeout=timeout)
+        if at.exception:
+            error = at.exception[0].message
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    with lock:
+        steps.append({
+            "page": page,
+            "action": action,
+            "seconds": time.perf_counter() - start,
+            "error": error.splitlines()[0][:200] if error else None,
+        })
+
+
+def session(seed, n_steps, think, navigate, timeout, steps, lock):
+    rng = random.Random(seed)
+    at = open_app(timeout)
+    run_step(at, "Home", "open", timeout, steps, lock)
+    for _ in range(n_steps):
+        time.sleep(rng.uniform(0, think))
+        try:
+            page, action = next_step(at, rng, navigate)
+        except Exception as e:
+            # The previous run failed before drawing its widgets
+            with lock:
+                steps.append({"page": None, "action": "step", "seconds": 0.0,
+                              "error": f"{type(e).__name__}: {e}"[:200]})
+            at = open_app(timeout)
+            page, action = "Home", "reopen"
+        run_step(at, page, action, timeout, steps, lock)
+
+
+# Resource monitor
+
+class Monitor(threading.Thread):
+    """Samples process RSS and database connections until stopped."""
+
+    def __init__(self):
+        super().__init__(name="load-test-monitor", daemon=True)
+        self.process = psutil.Process()
+        self.stopped = threading.Event()
+        self.rss = []
+        self.process_connections = []
+        self.server_connections = []
+        self.conn = None
+        if analytics_backend.BACKEND != "duckdb":
+            try:
+                self.conn = new_connection()
+            except Exception as e:
+                print(f"Cannot monitor server connections: {e}")
+
+    def sample(self):
+        self.rss.append(self.process.memory_info().rss)
+        # net_connections() replaced connections() in psutil 6
+        list_connections = getattr(self.process, "net_connections", None) or self.process.connections
+        connections = list_connections(kind="tcp")
+        self.process_connections.append(
+            sum(1 for c in connections if c.raddr and c.raddr.port == MYSQL_PORT)
+        )
+        if self.conn is not None:
+            cursor = self.conn.cursor()
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_connected'")
+            self.server_connections.append(int(cursor.fetchone()[1]))
+            cursor.close()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Monitor sample failed: {e}")
+            self.stopped.wait(SAMPLE_SECONDS)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+        if self.conn is not None:
+            self.conn.close()
+
+
+# Levels
+
+def percentiles(seconds):
+    if not seconds:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "max": max(seconds)}
+
+
+def run_level(sessions, n_steps, think, navigate, timeout, warm, seed):
+    if not warm:
+        st.cache_data.clear()
+        cache_manager.clear()
+    steps, lock = [], threading.Lock()
+    monitor = Monitor()
+    monitor.start()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=session, name=f"load-session-{i}",
+                         args=(seed * 1000 + i, n_steps, think, navigate, timeout, steps, lock))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    monitor.stop()
+
+    errors = [s for s in steps if s["error"]]
+    by_page = {}
+    for s in steps:
+        if s["page"] is not None:
+            by_page.setdefault(s["page"], []).append(s["seconds"])
+    return {
+        "sessions": sessions,
+        "steps": len(steps),
+        "wall_seconds": wall,
+        "latency": percentiles([s["seconds"] for s in steps if not s["error"]]),
+        "latency_by_page": {page: percentiles(seconds) for page, seconds in sorted(by_page.items())},
+        "errors": len(errors),
+        "error_samples": sorted({s["error"] for s in errors})[:10],
+        "peak_process_connections": max(monitor.process_connections),
+        "peak_server_connections": max(monitor.server_connections) if monitor.server_connections else None,
+        "peak_rss_mb": max(monitor.rss) / 2 ** 20,
+        "end_rss_mb": monitor.rss[-1] / 2 ** 20,
+        "cache_mb": cache_manager.usage()["used_mb"],
+    }
+
+
+def print_table(levels):
+    print("| sessions | steps | p50 s | p95 s | p99 s | errors | DB conns (process / server) | peak RSS MB |")
+    print("|---|---|---|---|---|---|---|---|")
+    fmt = lambda v: "n/a" if v is None else f"{v:.2f}"
+    for r in levels:
+        latency = r["latency"]
+        print(f"| {r['sessions']} | {r['steps']} | {fmt(latency['p50'])} | {fmt(latency['p95'])} | "
+              f"{fmt(latency['p99'])} | {r['errors']} | {r['peak_process_connections']} / "
+              f"{r['peak_server_connections'] if r['peak_server_connections'] is not None else 'n/a'} | "
+              f"{r['peak_rss_mb']:.0f} |")
+    for r in levels:
+        for error in r["error_samples"]:
+            print(f"  [{r['sessions']} sessions] {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--scale", choices=list(synthetic_data.SCALES), default="1M")
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the data already loaded.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25],
+                        help="Concurrency levels, run in order.")
+    parser.add_argument("--steps", type=int, default=10, help="Interactions per session after opening.")
+    parser.add_argument("--think", type=float, default=1.0, help="Max seconds between interactions.")
+    parser.add_argument("--navigate", type=float, default=0.4,
+                        help="Share of interactions that switch page rather than change a filter.")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds before a script run counts as failed.")
+    parser.add_argument("--warm", action="store_true", help="Keep caches between levels.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default="latest", help="Results are saved as results/load_<label>.json.")
+    args = parser.parse_args()
+
+    if not args.skip_load:
+        start = time.perf_counter()
+        synthetic_data.load_mysql(synthetic_data.SCALES[args.scale])
+        print(f"Loaded {args.scale} transactions in {time.perf_counter() - start:.1f}s")
+
+    levels = []
+    for sessions in args.sessions:
+        print(f"Running {sessions} concurrent sessions...")
+        levels.append(run_level(sessions, args.steps, args.think, args.navigate, args.timeout,
+                                args.warm, args.seed))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"load_{args.label}.json"
+    path.write_text(json.dumps({
+        "scale": args.scale, "backend": analytics_backend.BACKEND, "levels": levels
+    }, indent=2))
+    print(f"Saved results to {path}\n")
+    print_table(levels)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/sample_accuracy.py
+"""
+Error bounds of the approximate mode against exact answers on synthetic data.
+
+Draws the stratified sample (utils/sampling.py) from a synthetic dataset
+with several seeds and, for the aggregations the Revenue, Inventory and
+Logistics pages estimate, compares every estimate with the exact value:
+
+    coverage     share of 95% intervals containing the exact value
+    error        relative error of the estimate
+    half-width   relative half-width of the interval
+
+Fails (exit status 1) if an aggregation's coverage is below MIN_COVERAGE or
+a headline figure is off by more than HEADLINE_ERROR:
+    python -m benchmarks.sample_accuracy --rows 1000000 --sample-rows 100000 --seeds 20
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate
+from utils import sampling
+from utils.period_kpis import period
+
+MIN_COVERAGE = 0.90
+HEADLINE_ERROR = 0.01
+
+
+def synthetic_frame(rows, seed=0):
+    """Synthetic transactions joined to their dimensions, as the sample stores them."""
+    tables = {}
+    for table, df in generate(rows, seed):
+        tables.setdefault(table, []).append(df)
+    tables = {table: pd.concat(dfs, ignore_index=True) for table, dfs in tables.items()}
+
+    frame = (
+        tables["transactions"]
+        .merge(tables["time_dimension"][["date_key", "year", "month", "festival_name"]], on="date_key")
+        .merge(tables["customers"][["customer_id", "state"]], on="customer_id", how="left")
+        .merge(tables["products"][["product_id", "category", "subcategory"]], on="product_id", how="left")
+    )
+    frame["date_key"] = pd.to_datetime(frame["date_key"])
+    return frame
+
+
+def last_days(df, days):
+    latest = df["date_key"].max()
+    return period(f"Last {days} days", date_from=(latest - timedelta(days=days - 1)).date(),
+                  date_to=(latest + timedelta(days=1)).date())
+
+
+# name -> (exact(frame), estimate(sample), headline)
+CHECKS = {
+    "revenue": (
+        lambda df: df["corrected_price"].sum(),
+        lambda s: sampling.estimate_total(s, "corrected_price"),
+        True,
+    ),
+    "revenue by subcategory": (
+        lambda df: df.groupby("subcategory")["corrected_price"].sum(),
+        lambda s: sampling.estimate_total(s, "corrected_price", by="subcategory"),
+        False,
+    ),
+    "revenue by year and month": (
+        lambda df: df.groupby(["year", "month"])["corrected_price"].sum(),
+        lambda s: sampling.estimate_total(s, "corrected_price", by=["year", "month"]),
+        False,
+    ),
+    "UPI revenue by state": (
+        lambda df: df[df["payment_method"] == "UPI"].groupby("state")["corrected_price"].sum(),
+        lambda s: sampling.estimate_total(s, "corrected_price", by="state",
+                                          domain=s["payment_method"] == "UPI"),
+        False,
+    ),
+    "revenue, last 90 days": (
+        lambda df: df.loc[sampling.period_domain(df, last_days(df, 90)), "corrected_price"].sum(),
+        lambda s: sampling.estimate_total(s, "corrected_price",
+                                          domain=sampling.period_domain(s, last_days(s, 90))),
+        False,
+    ),
+    "avg delivery days": (
+        lambda df: df["delivery_days"].mean(),
+        lambda s: sampling.estimate_mean(s, "delivery_days"),
+        True,
+    ),
+    "avg delivery days by state": (
+        lambda df: df.groupby("state")["delivery_days"].mean(),
+        lambda s: sampling.estimate_mean(s, "delivery_days", by="state"),
+        False,
+    ),
+    "return rate by year": (
+        lambda df: (df["return_status"] == "Returned").groupby(df["year"]).mean(),
+        lambda s: sampling.estimate_mean(s, (s["return_status"] == "Returned").to_numpy(float), by="year"),
+        False,
+    ),
+    "avg rating": (
+        lambda df: df["customer_rating"].mean(),
+        lambda s: sampling.estimate_mean(s, "customer_rating"),
+        True,
+    ),
+    "payment method share": (
+        lambda df: df["payment_method"].value_counts(normalize=True),
+        lambda s: sampling.estimate_shares(s, "payment_method"),
+        False,
+    ),
+}
+
+
+def compare(exact, estimates):
+    """Estimates aligned with the exact values; one row per group."""
+    if not isinstance(exact, pd.Series):
+        return estimates.assign(exact=float(exact))
+    keys = [c for c in estimates.columns if c not in ("estimate", "std_error", "low", "high", "sample_rows")]
+    exact = exact.rename("exact").reset_index()
+    exact.columns = keys + ["exact"]
+    return estimates.merge(exact, on=keys, how="inner")
+
+
+def run(frame, seeds, sample_rows, min_rows):
+    start = time.perf_counter()
+    exact = {name: check[0](frame) for name, check in CHECKS.items()}
+    exact_seconds = time.perf_counter() - start
+
+    rows = {name: [] for name in CHECKS}
+    estimate_seconds = []
+    for seed in range(seeds):
+        sample = sampling.draw_sample(frame, target_rows=sample_rows, min_rows=min_rows, seed=seed)
+        start = time.perf_counter()
+        for name, (_, estimate, _) in CHECKS.items():
+            rows[name].append(compare(exact[name], estimate(sample)))
+        estimate_seconds.append(time.perf_counter() - start)
+    print(f"Sample of {len(sample):,} rows; all aggregations: exact {exact_seconds:.2f}s, "
+          f"estimated {np.median(estimate_seconds):.2f}s")
+
+    results = []
+    for name, frames in rows.items():
+        df = pd.concat(frames, ignore_index=True)
+        error = (df["estimate"] - df["exact"]).abs() / df["exact"].abs()
+        results.append({
+            "aggregation": name,
+            "groups": len(df) // seeds,
+            "coverage": ((df["low"] <= df["exact"]) & (df["exact"] <= df["high"])).mean(),
+            "median error": error.median(),
+            "max error": error.max(),
+            "half-width": ((df["high"] - df["estimate"]) / df["exact"].abs()).median(),
+            "headline": CHECKS[name][2],
+        })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check approximate-mode error bounds on synthetic data.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sample-rows", type=int, default=100_000)
+    parser.add_argument("--min-rows", type=int, default=sampling.MIN_STRATUM_ROWS)
+    parser.add_argument("--seeds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic transactions...")
+    frame = synthetic_frame(args.rows)
+    results = run(frame, args.seeds, args.sample_rows, args.min_rows)
+
+    print(f"{'aggregation':<28} {'groups':>6} {'coverage':>9} {'median err':>11} "
+          f"{'max err':>8} {'half-width':>11}")
+    for r in results.itertuples(index=False):
+        print(f"{r.aggregation:<28} {r.groups:>6} {r.coverage:>9.1%} {r[3]:>11.2%} "
+              f"{r[4]:>8.2%} {r[5]:>11.2%}")
+
+    failures = [f"{r.aggregation}: coverage {r.coverage:.1%} < {MIN_COVERAGE:.0%}"
+                for r in results.itertuples(index=False) if r.coverage < MIN_COVERAGE]
+    failures += [f"{r.aggregation}: error {r[4]:.2%} > {HEADLINE_ERROR:.0%}"
+                 for r in results.itertuples(index=False) if r.headline and r[4] > HEADLINE_ERROR]
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("All error bounds hold.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# benchmarks/synthetic_data.py
+"""
+Synthetic star-schema data matching DB_schema.sql.
+
+Dimensions are generated in full; transactions are generated in chunks so
+50M rows never have to be in memory at once. All values are drawn with a
+seeded NumPy generator, so a given scale always produces the same data.
+"""
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from utils import sketches, partitions, alerts, analytics_backend, geo_cube, sampling
+from utils.db_connection import DB_CONFIG, new_connection
+from utils.load_runs import record_load_run
+
+SCALES = {"1M": 1_000_000, "10M": 10_000_000, "50M": 50_000_000}
+CHUNK_ROWS = 1_000_000
+FIRST_DATE, LAST_DATE = date(2015, 1, 1), date(2025, 12, 31)
+
+CATEGORIES = {
+    "Electronics": ["Smartphones", "Laptops", "Tablets", "Audio", "TV & Entertainment", "Smart Watch"],
+}
+BRANDS = ["Samsung", "Apple", "OnePlus", "Xiaomi", "Sony", "LG", "HP", "Dell", "Lenovo", "boAt"]
+STATES = {
+    "Maharashtra": ["Mumbai", "Pune", "Nagpur"],
+    "Karnataka": ["Bengaluru", "Mysuru"],
+    "Delhi": ["Delhi"],
+    "Tamil Nadu": ["Chennai", "Coimbatore"],
+    "West Bengal": ["Kolkata"],
+    "Telangana": ["Hyderabad"],
+    "Gujarat": ["Ahmedabad", "Surat"],
+    "Uttar Pradesh": ["Lucknow", "Kanpur"],
+    "Rajasthan": ["Jaipur"],
+    "Kerala": ["Kochi"],
+}
+TIERS = ["Metro", "Tier1", "Tier2", "Rural"]
+SEGMENTS = ["Budget", "Standard", "Premium"]
+AGE_RANGES = ["18-25", "26-35", "36-45", "46-55", "55+"]
+PAYMENT_METHODS = ["UPI", "Card", "Cash", "Net Banking"]
+RETURN_STATUS = ["Delivered", "Returned", "Cancelled"]
+FESTIVALS = {(10, 24): "Diwali", (10, 5): "Dussehra", (12, 25): "Christmas",
+             (8, 15): "Independence Day", (1, 26): "Republic Day", (3, 8): "Holi"}
+
+
+def sizes(n_transactions):
+    """Dimension sizes for a given number of transactions."""
+    return {
+        "customers": max(n_transactions // 10, 100),
+        "products": min(max(n_transactions // 500, 200), 20_000),
+    }
+
+
+def make_products(n, rng):
+    subcategories = [(c, s) for c, subs in CATEGORIES.items() for s in subs]
+    pick = rng.integers(0, len(subcategories), n)
+    brand = pd.Series(np.asarray(BRANDS)[rng.integers(0, len(BRANDS), n)])
+    ids = pd.Series(np.arange(n)).map("PROD{:07d}".format)
+    return pd.DataFrame({
+        "product_id": ids,
+        "product_name": brand + " " + ids.str[-4:],
+        "category": [subcategories[i][0] for i in pick],
+        "subcategory": [subcategories[i][1] for i in pick],
+        "brand": brand,
+        "model": "M" + ids.str[-4:],
+        "launch_year": rng.integers(2012, 2025, n),
+        "base_price_2015": np.round(rng.lognormal(9.5, 0.9, n), 2),
+        "weight_kg": np.round(rng.uniform(0.1, 25, n), 2),
+        "product_rating": np.round(rng.uniform(2.5, 5.0, n), 1),
+        "is_prime_eligible": rng.integers(0, 2, n),
+    })
+
+
+def make_customers(n, rng):
+    states = list(STATES)
+    state = np.asarray(states)[rng.integers(0, len(states), n)]
+    city = np.empty(n, dtype=object)
+    for s, cities in STATES.items():
+        in_state = state == s
+        city[in_state] = np.asarray(cities)[rng.integers(0, len(cities), in_state.sum())]
+    return pd.DataFrame({
+        "customer_id": pd.Series(np.arange(n)).map("CUST{:08d}".format),
+        "customer_segment": np.asarray(SEGMENTS)[rng.choice(3, n, p=[0.3, 0.5, 0.2])],
+        "city": city,
+        "state": state,
+        "tier": np.asarray(TIERS)[rng.integers(0, len(TIERS), n)],
+        "age_range": np.asarray(AGE_RANGES)[rng.integers(0, len(AGE_RANGES), n)],
+        "is_prime_member": rng.integers(0, 2, n),
+    })
+
+
+def make_time_dimension():
+    days = pd.date_range(FIRST_DATE, LAST_DATE, freq="D")
+    return pd.DataFrame({
+        "date_key": days.date,
+        "day_of_week": days.dayofweek + 1,
+        "day_name": days.day_name(),
+        "day_of_month": days.day,
+        "month": days.month,
+        "month_name": days.month_name(),
+        "quarter": days.quarter,
+        "year": days.year,
+        "is_weekend": (days.dayofweek >= 5).astype(int),
+        "festival_name": [FESTIVALS.get((d.month, d.day), "No Festival") for d in days],
+    })
+
+
+def make_transactions(start, n, products, customers, days, rng):
+    """Transactions start .. start + n - 1, with seasonal (Q4-heavy) dates."""
+    day_weight = np.where(pd.DatetimeIndex(days).month >= 10, 1.6, 1.0)
+    day_idx = rng.choice(len(days), n, p=day_weight / day_weight.sum())
+    product_idx = rng.integers(0, len(products), n)
+    price = products["base_price_2015"].to_numpy()[product_idx]
+    discount = np.round(rng.choice([0, 5, 10, 20, 30], n, p=[0.5, 0.2, 0.15, 0.1, 0.05]), 2)
+
+    return pd.DataFrame({
+        "transaction_id": pd.Series(np.arange(start, start + n)).map("TXN{:010d}".format),
+        "date_key": np.asarray(days)[day_idx],
+        "customer_id": customers["customer_id"].to_numpy()[rng.integers(0, len(customers), n)],
+        "product_id": products["product_id"].to_numpy()[product_idx],
+        "original_price_inr": price,
+        "discount_percent": discount,
+        "delivery_days": np.clip(rng.poisson(3.5, n), 0, 15),
+        "payment_method": np.asarray(PAYMENT_METHODS)[rng.choice(4, n, p=[0.5, 0.25, 0.2, 0.05])],
+        "corrected_price": np.round(price * (1 - discount / 100), 2),
+        "return_status": np.asarray(RETURN_STATUS)[rng.choice(3, n, p=[0.9, 0.07, 0.03])],
+        "customer_rating": np.round(np.clip(rng.normal(4.1, 0.6, n), 1, 5) * 2) / 2,
+    })
+
+
+def generate(n_transactions, seed=0):
+    """Yields (table_name, DataFrame) chunks: dimensions first, then transactions."""
+    rng = np.random.default_rng(seed)
+    n = sizes(n_transactions)
+    products = make_products(n["products"], rng)
+    customers = make_customers(n["customers"], rng)
+    time_dimension = make_time_dimension()
+    yield "products", products
+    yield "customers", customers
+    yield "time_dimension", time_dimension
+
+    days = time_dimension["date_key"].to_numpy()
+    for start in range(0, n_transactions, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, n_transactions - start)
+        yield "transactions", make_transactions(start, size, products, customers, days, rng)
+
+
+def _load_data_infile(cursor, table, df):
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="") as f:
+        df.to_csv(f, index=False, header=False, na_rep="\\N")
+        path = f.name
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            ({", ".join(df.columns)})
+        """)
+    finally:
+        os.remove(path)
+
+
+def load_mysql(n_transactions, seed=0):
+    """
+    Loads a synthetic dataset into the database configured by AMAZONDB_* (which
+    should be a scratch database created from DB_schema.sql), then builds the
+    derived tables the pages read and, with DASHBOARD_BACKEND=duckdb, the
+    analytics replica.
+    """
+    if DB_CONFIG["database"] == "amazondb":
+        raise SystemExit("Refusing to overwrite amazondb: set AMAZONDB_DATABASE to a scratch database.")
+
+    conn = new_connection(allow_local_infile=True)
+    cursor = conn.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in ("transactions", "customers", "products", "time_dimension"):
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    partitions.ensure_year_partitions(conn, range(FIRST_DATE.year, LAST_DATE.year + 1))
+
+    for table, df in generate(n_transactions, seed):
+        print(f"Loading {len(df):,} rows into {table}...")
+        _load_data_infile(cursor, table, df)
+        conn.commit()
+    cursor.close()
+
+    sketches.refresh_sketches(conn, FIRST_DATE, LAST_DATE)
+    alerts.refresh_daily_aggregates(conn, FIRST_DATE, date(LAST_DATE.year + 1, 1, 1))
+    alerts.evaluate_alerts(conn)
+    geo_cube.refresh_cube(conn)
+    sampling.refresh_sample(conn)
+    record_load_run(conn, n_transactions)
+    if analytics_backend.BACKEND == "duckdb":
+        analytics_backend.replicate(conn)
+    conn.close()
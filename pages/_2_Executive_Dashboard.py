@@ -1,39 +1,29 @@
 import streamlit as st
 import pandas as pd
-from datetime import date
 from millify import millify 
 
-from utils.db_connection import get_connection 
-
-st.set_page_config(layout="wide")
+from utils.analytics_backend import get_analytics_connection, read_sql
+from utils import period_kpis, snapshots
 
 def fetch_data(conn, query, params=None):
 
     try:
-        return pd.read_sql(query, conn, params=params)
+        return read_sql(query, conn, params)
     except Exception as e:
         st.error(f"Error executing query: {e}")
         return pd.DataFrame()
 
 def get_executive_summary(conn):
 
-    current_year = date.today().year
-    previous_year = current_year - 1
-    
-    # 1. Query to get Revenue, Customer Count, Orders, and Average order value for current and previous year
-    summary_query = f"""
-    SELECT
-        t.year,
-        SUM(txn.corrected_price) AS TotalRevenue,
-        COUNT(DISTINCT txn.customer_id) AS ActiveCustomers,
-        COUNT(DISTINCT txn.transaction_id) AS TotalOrders,
-        SUM(txn.corrected_price) / COUNT(DISTINCT txn.transaction_id) AS AOV
-    FROM transactions txn
-    JOIN time_dimension t ON txn.date_key = t.date_key
-    WHERE t.year IN ({current_year}, {previous_year})
-    GROUP BY t.year
-    ORDER BY t.year DESC;
-    """
+    # Year to date is measured up to the latest loaded day, not today,
+    # so the page is not empty on 1 January or when loads lag behind
+    as_of = period_kpis.latest_data_date(conn)
+    if as_of is None:
+        return None, None
+
+    # 1. Revenue, Customer Count, Orders, and Average order value, this year to date
+    # against the same days last year, from one scan of the period KPI engine
+    # (active customers are merged from the customer sketches)
     
     # 2. Query to get Top Performing Categories (Lifetime Revenue)
  
@@ -48,52 +38,59 @@ def get_executive_summary(conn):
     LIMIT 5;
     """
     
-    summary_df = fetch_data(conn, summary_query)
+    current, previous = period_kpis.comparison_periods(period_kpis.COMPARISONS[0], as_of)
+    try:
+        summary_df = period_kpis.compute_kpis(conn, [current, previous])
+    except Exception as e:
+        st.error(f"Error computing period KPIs: {e}")
+        return None, None
     categories_df = fetch_data(conn, top_categories_query)
-    
-    if summary_df.empty:
+
+    cp_data = summary_df.loc[current["label"]]
+    if not cp_data['orders']:
         return None, None
-        
-    # calculate YoY Growth
-    cp_data = summary_df[summary_df['year'] == current_year].iloc[0] if current_year in summary_df['year'].values else None
-    pp_data = summary_df[summary_df['year'] == previous_year].iloc[0] if previous_year in summary_df['year'].values else None
-    
-    kpis = {}
-    if cp_data is not None:
-        kpis['Total Revenue'] = cp_data['TotalRevenue']
-        kpis['Active Customers'] = cp_data['ActiveCustomers']
-        kpis['Total Orders'] = cp_data['TotalOrders']
-        kpis['AOV'] = cp_data['AOV']
-        
-        # Calculate Growth Rate
-        if pp_data is not None and pp_data['TotalRevenue'] and pp_data['ActiveCustomers'] and pp_data['AOV']:
-            kpis['Revenue Growth'] = ((cp_data['TotalRevenue'] - pp_data['TotalRevenue']) / pp_data['TotalRevenue']) 
-            kpis['Customer Growth'] = ((cp_data['ActiveCustomers'] - pp_data['ActiveCustomers']) / pp_data['ActiveCustomers'])
-            kpis['AOV Growth'] = ((cp_data['AOV'] - pp_data['AOV']) / pp_data['AOV'])
-        else:
-            # Set to 0 if previous period data is missing
-            kpis['Revenue Growth'] = 0
-            kpis['Customer Growth'] = 0
-            kpis['AOV Growth'] = 0
-            
+    growth = period_kpis.compare(summary_df, current["label"], previous["label"])
+
+    kpis = {
+        'As Of': as_of,
+        'Total Revenue': cp_data['revenue'],
+        'Active Customers': cp_data['customers'],
+        'Total Orders': cp_data['orders'],
+        'AOV': cp_data['aov'],
+        # Set to 0 if previous period data is missing
+        'Revenue Growth': growth['revenue'][2] or 0,
+        'Customer Growth': growth['customers'][2] or 0,
+        'AOV Growth': growth['aov'][2] or 0,
+    }
     return kpis, categories_df
 
-def display_executive_summary():
+def load_executive_summary():
+    """The published snapshot of the executive summary, or a live query without one."""
+    kpis_df = snapshots.read_snapshot("executive_kpis")
+    categories_df = snapshots.read_snapshot("executive_top_categories")
+    if kpis_df is not None and categories_df is not None:
+        kpis = kpis_df.iloc[0].to_dict() if not kpis_df.empty else None
+        return kpis, categories_df
 
-    conn = get_connection()
+    conn = get_analytics_connection()
     if conn is None:
         st.warning("Database connection is not available. Please check the main application file for configuration errors.")
-        return
-        
+        return None, None
+    return get_executive_summary(conn)
+
+def display_executive_summary():
+
     st.header("Executive Summary Dashboard (Q1)")
     st.markdown("##### Key Business Metrics with Year-over-Year Comparison")
     
-    kpis, categories_df = get_executive_summary(conn)
+    kpis, categories_df = load_executive_summary()
 
-    if not kpis or categories_df.empty:
+    if not kpis or categories_df is None or categories_df.empty:
         st.info("No data found for the Executive Summary. Ensure your MySQL tables are populated, especially 'transactions'.")
         return
 
+    st.caption(f"Year to date through {kpis['As Of']}, against the same days last year.")
+
     # Create four columns for the KPI metrics
     col1, col2, col3, col4 = st.columns(4)
 
@@ -1,86 +1,184 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-from utils.db_connection import get_connection
-
-@st.cache_data
-def load_geographic_revenue():
-    conn = get_connection()
-    query = """
-        SELECT 
-            c.state,
-            c.customer_segment AS segment,
-            SUM(t.corrected_price) AS revenue,
-            COUNT(t.transaction_id) AS total_transactions,
-            COUNT(DISTINCT t.customer_id) AS unique_customers
-        FROM transactions t
-        JOIN customers c ON t.customer_id = c.customer_id
-        GROUP BY c.state, c.customer_segment
-        ORDER BY revenue DESC;
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-
-def app():
-
-    st.title("Geographic Revenue Analysis (State + Segment)")
-
-    df = load_geographic_revenue()
-
-    st.subheader("Raw Data")
-    st.dataframe(df)
-
- 
-    # KPI Summary (Total Revenue, Total Customers, Total Transactions)
-  
-    total_rev = df["revenue"].sum()
-    total_customers = df["unique_customers"].sum()
-    total_txn = df["total_transactions"].sum()
-
-    col1, col2, col3 = st.columns(3)
-
-    col1.metric("Total Revenue", f"₹{total_rev:,.0f}")
-    col2.metric("Total Customers", f"{total_customers:,}")
-    col3.metric("Total Transactions", f"{total_txn:,}")
-
-    st.subheader("Filters")
-    states = st.multiselect("Filter by State", df["state"].unique())
-    segments = st.multiselect("Filter by Customer Segment", df["segment"].unique())
-
-    filtered = df.copy()
-    if states:
-        filtered = filtered[filtered["state"].isin(states)]
-    if segments:
-        filtered = filtered[filtered["segment"].isin(segments)]
-
-   
-    # BAR CHART — Revenue by State
-   
-    st.subheader("Revenue by State")
-    fig1 = px.bar(
-        filtered.groupby("state")["revenue"].sum().reset_index(),
-        x="state",
-        y="revenue",
-        text_auto=".2s",
-        labels={"revenue": "Revenue"},
-    )
-    st.plotly_chart(fig1, use_container_width=True)
-
-    
-    # PIE CHART — Segment Contribution
-  
-    st.subheader("Segment Contribution")
-    fig2 = px.pie(
-        filtered.groupby("segment")["revenue"].sum().reset_index(),
-        names="segment",
-        values="revenue",
-        title="Revenue Share by Customer Segment"
-    )
-    st.plotly_chart(fig2, use_container_width=True)
-
- 
-    # TABLE — Detailed Drilldown
-
-    st.subheader("State + Segment Drilldown")
-    st.dataframe(filtered.sort_values("revenue", ascending=False))
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.analytics_backend import get_analytics_connection
+from utils.paginated_table import paginated_frame
+from utils import cache_manager, geo_cube, period_kpis, sampling, snapshots
+from utils.load_runs import get_data_version
+
+GEO_COLUMNS = {
+    "customer_segment": "segment",
+    "transactions": "total_transactions",
+    "customers": "unique_customers",
+}
+DRILLDOWN_LABELS = {
+    "state": "State",
+    "city": "City",
+    "tier": "Tier",
+    "customer_segment": "Customer Segment",
+    "age_range": "Age Range",
+    "is_prime_member": "Prime Member",
+}
+
+def query_geographic_cube():
+    # Lifetime measures over every customer attribute combination, precomputed by the loader
+    conn = get_analytics_connection()
+    cube = geo_cube.query_cube(conn)
+    conn.close()
+    return cube
+
+@cache_manager.cached()
+def load_geographic_cube():
+    df = snapshots.read_snapshot("geo_cube")
+    return df if df is not None else query_geographic_cube()
+
+def geo_slice(cube, by, filters=None):
+    df = geo_cube.slice_cube(cube, by, filters).rename(columns=GEO_COLUMNS)
+    return df.sort_values("revenue", ascending=False).reset_index(drop=True)
+
+def load_period_comparison(name):
+    # Cached per period by the KPI engine until the next load
+    conn = get_analytics_connection()
+    as_of = period_kpis.latest_data_date(conn)
+    if as_of is None:
+        return None, None
+    current, previous = period_kpis.comparison_periods(name, as_of)
+    kpis = period_kpis.compute_kpis(conn, [current, previous])
+    return as_of, period_kpis.compare(kpis, current["label"], previous["label"])
+
+def load_approximate_comparison(name):
+    # Revenue, orders and AOV estimated from the stratified sample, with 95% intervals
+    conn = get_analytics_connection()
+    as_of = period_kpis.latest_data_date(conn)
+    if as_of is None:
+        return None, None
+    sample = sampling.load_sample(get_data_version(conn))
+    estimates = {}
+    for p in period_kpis.comparison_periods(name, as_of):
+        domain = sampling.period_domain(sample, p)
+        estimates[p["label"]] = {
+            "revenue": sampling.estimate_total(sample, "corrected_price", domain=domain).iloc[0],
+            "orders": sampling.estimate_total(sample, domain=domain).iloc[0],
+            "aov": sampling.estimate_mean(sample, "corrected_price", domain=domain).iloc[0],
+        }
+    return as_of, estimates
+
+def app():
+
+    st.title("Geographic Revenue Analysis (State + Segment)")
+
+    cube = load_geographic_cube()
+    df = geo_slice(cube, ["state", "customer_segment"])
+
+    st.subheader("Raw Data")
+    st.dataframe(df, use_container_width=True)
+
+ 
+    # KPI Summary (Total Revenue, Total Customers, Total Transactions)
+  
+    totals = geo_slice(cube, [])
+    total_rev = totals["revenue"].sum()
+    total_customers = int(totals["unique_customers"].sum())
+    total_txn = int(totals["total_transactions"].sum())
+
+    col1, col2, col3 = st.columns(3)
+
+    col1.metric("Total Revenue", f"₹{total_rev:,.0f}")
+    col2.metric("Total Customers", f"{total_customers:,}")
+    col3.metric("Total Transactions", f"{total_txn:,}")
+
+    # Period-over-period comparison
+
+    st.subheader("Period Comparison")
+    comparison = st.selectbox("Compare", period_kpis.COMPARISONS)
+    approximate = sampling.approximate_toggle("revenue_approximate")
+    if approximate:
+        as_of, estimates = load_approximate_comparison(comparison)
+        growth = None
+    else:
+        as_of, growth = load_period_comparison(comparison)
+    if approximate and as_of is not None:
+        st.caption(f"Through {as_of}, estimated from the transactions sample.")
+        (_, current), (previous_label, previous) = estimates.items()
+        cols = st.columns(4)
+        for col, (metric, label, fmt) in zip(cols, [
+            ("revenue", "Revenue", "₹{:,.0f}"),
+            ("orders", "Orders", "{:,.0f}"),
+            ("aov", "AOV", "₹{:,.0f}"),
+        ]):
+            cur, prev = current[metric]["estimate"], previous[metric]["estimate"]
+            change = (cur - prev) / prev if prev and not pd.isna(prev) and not pd.isna(cur) else None
+            col.metric(
+                label,
+                fmt.format(cur) if not pd.isna(cur) else "N/A",
+                delta=f"{change:.2%}" if change is not None else "N/A",
+                help=f"{previous_label}: {fmt.format(prev)}" if not pd.isna(prev) else None
+            )
+            col.caption(sampling.interval_text(current[metric], fmt))
+        cols[3].metric("Customers", "N/A",
+                       help="Distinct customers cannot be scaled up from a sample; recompute exactly.")
+    elif growth is None:
+        st.info("No transactions loaded yet.")
+    else:
+        st.caption(f"Through {as_of}, the latest day with data.")
+        cols = st.columns(4)
+        for col, (metric, label, fmt) in zip(cols, [
+            ("revenue", "Revenue", "₹{:,.0f}"),
+            ("orders", "Orders", "{:,}"),
+            ("customers", "Customers", "{:,}"),
+            ("aov", "AOV", "₹{:,.0f}"),
+        ]):
+            current, previous, change = growth[metric]
+            col.metric(
+                label,
+                fmt.format(current) if current is not None else "N/A",
+                delta=f"{change:.2%}" if change is not None else "N/A",
+                help=f"Previous: {fmt.format(previous)}" if previous is not None else None
+            )
+
+    st.subheader("Filters")
+    states = st.multiselect("Filter by State", geo_cube.dimension_values(cube, "state"))
+    segments = st.multiselect("Filter by Customer Segment", geo_cube.dimension_values(cube, "customer_segment"))
+    filters = {"state": states, "customer_segment": segments}
+
+   
+    # BAR CHART — Revenue by State
+   
+    st.subheader("Revenue by State")
+    fig1 = px.bar(
+        geo_slice(cube, ["state"], filters),
+        x="state",
+        y="revenue",
+        text_auto=".2s",
+        labels={"revenue": "Revenue"},
+    )
+    st.plotly_chart(fig1, use_container_width=True)
+
+    
+    # PIE CHART — Segment Contribution
+  
+    st.subheader("Segment Contribution")
+    fig2 = px.pie(
+        geo_slice(cube, ["customer_segment"], filters),
+        names="segment",
+        values="revenue",
+        title="Revenue Share by Customer Segment"
+    )
+    st.plotly_chart(fig2, use_container_width=True)
+
+ 
+    # TABLE — Detailed Drilldown
+
+    st.subheader("Customer Drilldown")
+    drill_by = st.multiselect(
+        "Drill down by", list(DRILLDOWN_LABELS), default=["state", "customer_segment"],
+        format_func=DRILLDOWN_LABELS.get
+    )
+    with st.expander("Slice"):
+        for dimension in ["city", "tier", "age_range", "is_prime_member"]:
+            filters[dimension] = st.multiselect(
+                DRILLDOWN_LABELS[dimension], geo_cube.dimension_values(cube, dimension),
+                key=f"geo_slice_{dimension}"
+            )
+    # A fine drilldown has a row per base cell: only one page goes to the browser
+    paginated_frame("geo_drilldown", geo_slice(cube, drill_by, filters), default_sort="revenue")
@@ -1,162 +1,198 @@
-import streamlit as st
-import pandas as pd
-from utils.db_connection import get_connection
-import plotly.express as px
-
-
-@st.cache_data
-def load_data():
-    conn = get_connection()
-
-    customers = pd.read_sql("SELECT * FROM customers", conn)
-    transactions = pd.read_sql("""
-        SELECT t.*, c.state, c.customer_segment, c.is_prime_member
-        FROM transactions t
-        JOIN customers c ON t.customer_id = c.customer_id
-    """, conn)
-
-    conn.close()
-    return customers, transactions
-
-
-
-# Marketing Recommendation Logic
-
-def generate_recommendation(row):
-    if row["is_prime_member"] == 1:
-        if row["avg_spend"] > 50000:
-            return "Promote high-value Prime bundles, premium gadgets, loyalty upgrades."
-        else:
-            return "Push Prime-exclusive deals, cashback, and personalized coupons."
-    else:
-        if row["avg_spend"] > 30000:
-            return "Suggest Prime membership with savings calculator & free delivery benefits."
-        else:
-            return "Offer low-cost trial Prime membership & budget product bundles."
-
-def app():
-
-    # Streamlit UI
-
-    st.set_page_config(page_title="Customer Analytics Dashboard", layout="wide")
-    st.title("Customer Analytics Dashboard")
-
-    customers, transactions = load_data()
-
-    # Sidebar Interactive Customer Profile
-  
-    st.sidebar.header("🔍 Search Customer")
-
-    selected_customer = st.sidebar.selectbox(
-        "Select Customer ID", 
-        customers["customer_id"].unique()
-    )
-
-    cust_df = customers[customers["customer_id"] == selected_customer]
-    cust_txn = transactions[transactions["customer_id"] == selected_customer]
-
-    st.sidebar.subheader("Customer Profile Summary")
-    st.sidebar.write(cust_df)
-
-    # Personalized statistics
-    if not cust_txn.empty:
-        total_spend = cust_txn["corrected_price"].sum()
-        avg_spend = cust_txn["corrected_price"].mean()
-        orders = len(cust_txn)
-
-        st.sidebar.metric("Total Spend", f"₹{total_spend:,.0f}")
-        st.sidebar.metric("Avg Order Value", f"₹{avg_spend:,.0f}")
-        st.sidebar.metric("Orders Count", orders)
-    else:
-        st.sidebar.warning("No transaction data found.")
-
-   
-    # Main Dashboard Layout
-  
-    tab1, tab2, tab3 = st.tabs(["Prime vs Non-Prime Behavior", 
-                                "Membership Value Analysis", 
-                                "Customer Marketing Recommendations"])
-
-   
-    # Tab 1 — PRIME VS NON-PRIME BEHAVIOR
-  
-    with tab1:
-        st.header("👑 Prime vs Non-Prime Behavior Overview")
-
-        prime_grp = transactions.groupby("is_prime_member").agg({
-            "corrected_price": "mean",
-            "transaction_id": "count"
-        }).rename(columns={"transaction_id": "order_count"})
-
-        prime_grp["type"] = prime_grp.index.map({1: "Prime Members", 0: "Non-Prime Members"})
-
-        fig = px.bar(
-            prime_grp, 
-            x="type",
-            y="corrected_price",
-            color="type",
-            title="Average Spend Comparison",
-            labels={"corrected_price": "Avg Spend (₹)"}
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        fig2 = px.pie(
-            prime_grp, 
-            names="type",
-            values="order_count",
-            title="Order Share: Prime vs Non-Prime"
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-
-
-
-    # Tab 2 — MEMBERSHIP VALUE ANALYSIS
-
-    with tab2:
-        st.header("📊 Membership Value Analysis")
-
-        # Avg spend by customer segment
-        seg_data = transactions.groupby(["customer_segment", "is_prime_member"])["corrected_price"].mean().reset_index()
-
-        seg_data["Member_Type"] = seg_data["is_prime_member"].map({1: "Prime", 0: "Non-Prime"})
-
-        fig3 = px.bar(
-            seg_data,
-            x="customer_segment",
-            y="corrected_price",
-            color="Member_Type",
-            barmode="group",
-            title="Avg Spend by Segment (Prime vs Non-Prime)"
-        )
-        st.plotly_chart(fig3, use_container_width=True)
-
-
-
-    # Tab 3 — CUSTOMER TARGETED MARKETING RECOMMENDATIONS
-
-    with tab3:
-        st.header("🎯 Customer Targeted Marketing Recommendations")
-
-        # Prepare profile table
-        profile = transactions.groupby("customer_id").agg(
-            total_spend=("corrected_price", "sum"),
-            avg_spend=("corrected_price", "mean"),
-            orders=("transaction_id", "count"),
-            is_prime_member=("is_prime_member", "max")
-        ).reset_index()
-
-        profile["recommendation"] = profile.apply(generate_recommendation, axis=1)
-
-        # Show for selected customer
-        selected = profile[profile["customer_id"] == selected_customer]
-
-        if not selected.empty:
-            st.subheader("📌 Recommendation for Selected Customer")
-            st.success(selected["recommendation"].values[0])
-
-        # Full table
-        st.subheader("📋 Full Customer Marketing Recommendation Table")
-        st.dataframe(profile)
-
-
-
+import streamlit as st
+import pandas as pd
+from utils.analytics_backend import get_analytics_connection, read_frame, read_sql
+from utils.paginated_table import paginated_table
+from utils import cache_manager, snapshots, shared_snapshot
+import plotly.express as px
+
+CUSTOMER_PROFILE_QUERY = """
+    SELECT
+        t.customer_id,
+        SUM(t.corrected_price) AS total_spend,
+        AVG(t.corrected_price) AS avg_spend,
+        COUNT(t.transaction_id) AS orders,
+        MAX(c.is_prime_member) AS is_prime_member
+    FROM transactions t
+    JOIN customers c ON t.customer_id = c.customer_id
+    GROUP BY t.customer_id
+"""
+CUSTOMER_PROFILE_COLUMNS = ["customer_id", "total_spend", "avg_spend", "orders", "is_prime_member"]
+
+
+def query_data():
+    customers = read_frame("SELECT * FROM customers", label="customers")
+    transactions = read_frame("""
+        SELECT t.*, c.state, c.customer_segment, c.is_prime_member
+        FROM transactions t
+        JOIN customers c ON t.customer_id = c.customer_id
+    """, label="customer transactions")
+    return customers, transactions
+
+
+@cache_manager.cached()
+def load_process_copy():
+    customers = snapshots.read_snapshot("customers")
+    transactions = snapshots.read_snapshot("customer_transactions")
+    if customers is None or transactions is None:
+        return query_data()
+    return customers, transactions
+
+
+def load_data():
+    # Worker processes share the memory-mapped snapshot; without one, each keeps its own copy
+    shared = shared_snapshot.load_shared("customers", "customer_transactions")
+    return shared if shared is not None else load_process_copy()
+
+
+def load_customer(customer_id):
+    """Fetches a single customer's profile row and transactions from the server."""
+    conn = get_analytics_connection()
+
+    cust_df = read_sql("SELECT * FROM customers WHERE customer_id = %s", conn,
+                       params=[customer_id])
+    cust_txn = read_sql("SELECT * FROM transactions WHERE customer_id = %s", conn,
+                        params=[customer_id])
+    return cust_df, cust_txn
+
+
+def add_recommendations(profile):
+    profile = profile.copy()
+    profile["recommendation"] = profile.apply(generate_recommendation, axis=1)
+    return profile
+
+
+
+# Marketing Recommendation Logic
+
+def generate_recommendation(row):
+    if row["is_prime_member"] == 1:
+        if row["avg_spend"] > 50000:
+            return "Promote high-value Prime bundles, premium gadgets, loyalty upgrades."
+        else:
+            return "Push Prime-exclusive deals, cashback, and personalized coupons."
+    else:
+        if row["avg_spend"] > 30000:
+            return "Suggest Prime membership with savings calculator & free delivery benefits."
+        else:
+            return "Offer low-cost trial Prime membership & budget product bundles."
+
+def app():
+
+    # Streamlit UI (page config is set once by the entry point)
+
+    st.title("Customer Analytics Dashboard")
+
+    customers, transactions = load_data()
+
+    # Sidebar Interactive Customer Profile
+  
+    st.sidebar.header("🔍 Search Customer")
+
+    # Look the customer up on the server instead of shipping every ID to the browser
+    selected_customer = st.sidebar.text_input(
+        "Enter Customer ID",
+        value=customers["customer_id"].iloc[0] if not customers.empty else ""
+    ).strip()
+
+    cust_df, cust_txn = load_customer(selected_customer)
+
+    st.sidebar.subheader("Customer Profile Summary")
+    st.sidebar.write(cust_df)
+
+    # Personalized statistics
+    if not cust_txn.empty:
+        total_spend = cust_txn["corrected_price"].sum()
+        avg_spend = cust_txn["corrected_price"].mean()
+        orders = len(cust_txn)
+
+        st.sidebar.metric("Total Spend", f"₹{total_spend:,.0f}")
+        st.sidebar.metric("Avg Order Value", f"₹{avg_spend:,.0f}")
+        st.sidebar.metric("Orders Count", orders)
+    else:
+        st.sidebar.warning("No transaction data found.")
+
+   
+    # Main Dashboard Layout
+  
+    tab1, tab2, tab3 = st.tabs(["Prime vs Non-Prime Behavior", 
+                                "Membership Value Analysis", 
+                                "Customer Marketing Recommendations"])
+
+   
+    # Tab 1 — PRIME VS NON-PRIME BEHAVIOR
+  
+    with tab1:
+        st.header("👑 Prime vs Non-Prime Behavior Overview")
+
+        prime_grp = transactions.groupby("is_prime_member").agg({
+            "corrected_price": "mean",
+            "transaction_id": "count"
+        }).rename(columns={"transaction_id": "order_count"})
+
+        prime_grp["type"] = prime_grp.index.map({1: "Prime Members", 0: "Non-Prime Members"})
+
+        fig = px.bar(
+            prime_grp, 
+            x="type",
+            y="corrected_price",
+            color="type",
+            title="Average Spend Comparison",
+            labels={"corrected_price": "Avg Spend (₹)"}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        fig2 = px.pie(
+            prime_grp, 
+            names="type",
+            values="order_count",
+            title="Order Share: Prime vs Non-Prime"
+        )
+        st.plotly_chart(fig2, use_container_width=True)
+
+
+
+    # Tab 2 — MEMBERSHIP VALUE ANALYSIS
+
+    with tab2:
+        st.header("📊 Membership Value Analysis")
+
+        # Avg spend by customer segment
+        seg_data = transactions.groupby(["customer_segment", "is_prime_member"], observed=True)["corrected_price"].mean().reset_index()
+
+        seg_data["Member_Type"] = seg_data["is_prime_member"].map({1: "Prime", 0: "Non-Prime"})
+
+        fig3 = px.bar(
+            seg_data,
+            x="customer_segment",
+            y="corrected_price",
+            color="Member_Type",
+            barmode="group",
+            title="Avg Spend by Segment (Prime vs Non-Prime)"
+        )
+        st.plotly_chart(fig3, use_container_width=True)
+
+
+
+    # Tab 3 — CUSTOMER TARGETED MARKETING RECOMMENDATIONS
+
+    with tab3:
+        st.header("🎯 Customer Targeted Marketing Recommendations")
+
+        # Show for selected customer
+        if not cust_txn.empty:
+            selected = pd.DataFrame([{
+                "avg_spend": cust_txn["corrected_price"].mean(),
+                "is_prime_member": cust_df["is_prime_member"].max() if not cust_df.empty else 0
+            }])
+            st.subheader("📌 Recommendation for Selected Customer")
+            st.success(generate_recommendation(selected.iloc[0]))
+
+        # Full table, one page at a time
+        st.subheader("📋 Full Customer Marketing Recommendation Table")
+        paginated_table(
+            "customer_profiles", CUSTOMER_PROFILE_QUERY, CUSTOMER_PROFILE_COLUMNS,
+            default_sort="total_spend", transform=add_recommendations, key_column="customer_id"
+        )
+
+
+
@@ -1,13 +1,12 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils.db_connection import get_connection
+from utils.analytics_backend import get_analytics_connection, read_frame
+from utils import cache_manager, chart_data, forecasting, sampling, snapshots, shared_snapshot
+from utils.load_runs import get_data_version
 
 
-@st.cache_data
-def load_data():
-    conn = get_connection()
-
+def query_data():
     query = """
         SELECT 
             t.transaction_id,
@@ -28,17 +27,99 @@ def load_data():
         JOIN products p ON t.product_id = p.product_id
     """
 
-    df = pd.read_sql(query, conn)
+    return read_frame(query, label="inventory")
+
+
+@cache_manager.cached()
+def load_process_copy():
+    df = snapshots.read_snapshot("inventory")
+    return df if df is not None else query_data()
+
+
+def load_data():
+    # Worker processes share the memory-mapped snapshot; without one, each keeps its own copy
+    df = shared_snapshot.load_shared("inventory")
+    return df if df is not None else load_process_copy()
+
+
+@cache_manager.cached(show_spinner="Fitting demand forecasts...")
+def load_forecasts(level, data_version, horizon=3):
+    # data_version is only part of the cache key: forecasts are kept until the next load
+    conn = get_analytics_connection()
+    matrix, series, months = forecasting.build_demand_matrix(conn, level=level)
     conn.close()
-    return df
 
+    forecasts, errors, best = forecasting.forecast_all(matrix, horizon=horizon)
+    best_fc = forecasting.best_forecasts(forecasts, best)
 
-def app():
-    st.set_page_config(page_title="Product Performance Dashboard",
-                       layout="wide")
+    summary = pd.DataFrame({
+        "series": series,
+        "best_model": best,
+        "mae": errors.min(axis=1).to_numpy(),
+        "last_month": matrix[:, -1] if matrix.size else [],
+    })
+    for h in range(horizon):
+        summary[f"forecast_m{h + 1}"] = best_fc[:, h]
+    return summary, matrix, months, best_fc
+
+
+def approximate_view():
+    # Estimated from the stratified sample; every figure carries its 95% interval
+    sample = sampling.load_sample(get_data_version(get_analytics_connection()))
+
+    category = st.sidebar.selectbox("Filter by Category:",
+                                    ["All"] + sorted(sample["category"].dropna().unique().tolist()))
+    # Category is not a stratum: restrict the estimates to it instead of filtering the sample
+    domain = None if category == "All" else (sample["category"] == category).to_numpy()
+
+    records = sampling.estimate_total(sample, domain=domain).iloc[0]
+    st.sidebar.write(f"**Estimated Records: {records['estimate']:,.0f}**")
+
+    st.subheader("Category-wise Revenue Analysis")
 
+    cat_df = sampling.estimate_total(sample, "corrected_price", by="subcategory", domain=domain)
+    st.image(chart_data.render_bar(
+        cat_df["subcategory"].to_numpy(), cat_df["estimate"].to_numpy(),
+        title="Revenue by Category (estimated)", figsize=(8, 4), rotation=45,
+        errors=sampling.error_bars(cat_df)
+    ))
+    total = sampling.estimate_total(sample, "corrected_price", domain=domain).iloc[0]
+    st.caption(f"Total revenue ₹{total['estimate']:,.0f}, {sampling.interval_text(total, '₹{:,.0f}')}")
+
+    st.subheader(" Seasonal Trends (Monthly Sales)")
+
+    seasonal_df = sampling.estimate_total(sample, "corrected_price", by=["year", "month"], domain=domain)
+    seasonal_df["index_date"] = pd.to_datetime(
+        seasonal_df["year"].astype(int).astype(str) + "-" + seasonal_df["month"].astype(int).astype(str) + "-01"
+    )
+    seasonal_df = seasonal_df.sort_values("index_date")
+    x = seasonal_df["index_date"].to_numpy()
+    st.image(chart_data.render_lines(
+        x, {"Revenue": seasonal_df["estimate"].to_numpy()},
+        title="Monthly Revenue Trend (estimated, 95% band)", xlabel="Year-Month", ylabel="Revenue",
+        bands={"Revenue": (seasonal_df["low"].to_numpy(), seasonal_df["high"].to_numpy())}
+    ))
+    st.caption("Each month is a small slice of the sample, so its interval is wider than the totals'.")
+
+    st.subheader("Demand Forecasting (3-Month Moving Average)")
+
+    st.image(chart_data.render_lines(
+        x,
+        {"Actual": seasonal_df["estimate"].to_numpy(),
+         "Forecast (3-month MA)": seasonal_df["estimate"].rolling(window=3).mean().to_numpy()}
+    ))
+
+    st.info("Product rankings, demand patterns, per-product forecasts and the rating correlation "
+            "need every transaction: use **Recompute exactly** in the sidebar.")
+
+
+def app():
     st.title("Product Performance Dashboard")
 
+    if sampling.approximate_toggle("inventory_approximate"):
+        approximate_view()
+        return
+
     df = load_data()
 
     # Sidebar Filters
@@ -56,7 +137,7 @@ def app():
     st.subheader("Top Products by Revenue")
 
     revenue_df = (
-        df.groupby(["product_id", "product_name"])
+        df.groupby(["product_id", "product_name"], observed=True)
         ["corrected_price"]
         .sum()
         .sort_values(ascending=False)
@@ -66,24 +147,23 @@ def app():
     st.dataframe(revenue_df.head(10))
 
     # Plot Top 10 Revenue Products
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.bar(revenue_df.head(10)["product_name"], revenue_df.head(10)["corrected_price"])
-    ax.set_title("Top 10 Revenue Products")
-    plt.xticks(rotation=45, ha="right")
-    st.pyplot(fig)
+    top10 = revenue_df.head(10)
+    st.image(chart_data.render_bar(
+        top10["product_name"].to_numpy(), top10["corrected_price"].to_numpy(),
+        title="Top 10 Revenue Products", figsize=(10, 4), rotation=45
+    ))
 
    
     # 2️ Category-wise Revenue Analysis
  
     st.subheader("Category-wise Revenue Analysis")
 
-    cat_df = df.groupby("subcategory")["corrected_price"].sum().reset_index()
+    cat_df = df.groupby("subcategory", observed=True)["corrected_price"].sum().reset_index()
 
-    fig, ax = plt.subplots(figsize=(8, 4))
-    ax.bar(cat_df["subcategory"], cat_df["corrected_price"])
-    ax.set_title("Revenue by Category")
-    plt.xticks(rotation=45)
-    st.pyplot(fig)
+    st.image(chart_data.render_bar(
+        cat_df["subcategory"].to_numpy(), cat_df["corrected_price"].to_numpy(),
+        title="Revenue by Category", figsize=(8, 4), rotation=45
+    ))
 
   
     #  Product Demand Patterns
@@ -91,7 +171,7 @@ def app():
     st.subheader("Product Demand Patterns")
 
     demand_df = (
-        df.groupby(["product_id", "product_name"])
+        df.groupby(["product_id", "product_name"], observed=True)
         ["transaction_id"]
         .count()
         .sort_values(ascending=False)
@@ -118,12 +198,11 @@ def app():
     seasonal_df = seasonal_df.sort_values("index_date")
     seasonal_df = seasonal_df.set_index("index_date")
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(seasonal_df.index, seasonal_df["corrected_price"])
-    ax.set_title("Monthly Revenue Trend")
-    ax.set_xlabel("Year-Month")
-    ax.set_ylabel("Revenue")
-    st.pyplot(fig)
+    x, y = chart_data.downsample_line(seasonal_df.index.to_numpy(), seasonal_df["corrected_price"].to_numpy())
+    st.image(chart_data.render_lines(
+        x, {"Revenue": y},
+        title="Monthly Revenue Trend", xlabel="Year-Month", ylabel="Revenue"
+    ))
 
     
     # Inventory Turnover (Sales Frequency)
@@ -146,28 +225,60 @@ def app():
     forecast_df = seasonal_df.copy()
     forecast_df["forecast"] = forecast_df["corrected_price"].rolling(window=3).mean()
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(forecast_df["corrected_price"], label="Actual")
-    ax.plot(forecast_df["forecast"], label="Forecast (3-month MA)")
-    ax.legend()
-    st.pyplot(fig)
+    st.image(chart_data.render_lines(
+        forecast_df.index.to_numpy(),
+        {"Actual": forecast_df["corrected_price"].to_numpy(),
+         "Forecast (3-month MA)": forecast_df["forecast"].to_numpy()}
+    ))
+
+    
+    # Per-product / per-subcategory demand forecast (batched engine)
+
+    st.subheader("Demand Forecast by Product / Subcategory")
+
+    level = st.selectbox("Forecast level", ["subcategory", "product"])
+    conn = get_analytics_connection()
+    data_version = get_data_version(conn)
+    fc_summary, fc_matrix, fc_months, fc_values = load_forecasts(level, data_version)
+
+    if fc_summary.empty:
+        st.info("Not enough sales history to forecast.")
+    else:
+        fc_table = fc_summary.copy()
+        if level == "product":
+            names = df.drop_duplicates("product_id").set_index("product_id")["product_name"]
+            fc_table.insert(1, "product_name", fc_table["series"].map(names))
+        st.dataframe(fc_table.sort_values("forecast_m1", ascending=False).head(20))
+
+        selected_series = st.selectbox("Show forecast for", fc_table["series"].tolist())
+        row = fc_summary.index[fc_summary["series"] == selected_series][0]
+        history = fc_matrix[row, -24:]
+        history_x = fc_months[-24:].to_timestamp().to_numpy()
+        future_x = pd.period_range(fc_months[-1] + 1, periods=fc_values.shape[1], freq="M").to_timestamp().to_numpy()
+
+        st.image(chart_data.render_lines(
+            np.concatenate([history_x, future_x]),
+            {"Actual": np.concatenate([history, np.full(len(future_x), np.nan)]),
+             f"Forecast ({fc_summary.at[row, 'best_model']})": np.concatenate(
+                 [np.full(len(history) - 1, np.nan), history[-1:], fc_values[row]])},
+            title=f"Monthly Demand: {selected_series}", xlabel="Month", ylabel="Units"
+        ))
 
     
     # 7 Product Rating vs Sales Correlation
     
     st.subheader("Product Rating vs Sales Correlation")
 
-    rating_df = df.groupby(["product_id", "product_name"]).agg(
+    rating_df = df.groupby(["product_id", "product_name"], observed=True).agg(
         avg_rating=("customer_rating", "mean"),
         total_sales=("transaction_id", "count")
     ).reset_index()
 
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.scatter(rating_df["avg_rating"], rating_df["total_sales"])
-    ax.set_xlabel("Average Rating")
-    ax.set_ylabel("Sales Count")
-    ax.set_title("Rating vs Sales")
-    st.pyplot(fig)
+    # Every product is one point; plot a fixed subset once there are too many
+    x, y = chart_data.downsample_scatter(rating_df["avg_rating"].to_numpy(), rating_df["total_sales"].to_numpy())
+    st.image(chart_data.render_scatter(
+        x, y, title="Rating vs Sales", xlabel="Average Rating", ylabel="Sales Count"
+    ))
 
     # correlation value
     corr = rating_df["avg_rating"].corr(rating_df["total_sales"])
@@ -1,58 +1,195 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils.db_connection import get_connection
-
-
-@st.cache_data(show_spinner=True, ttl=1800)
-def load_ops_data():
-    conn = get_connection()
-
-    query = """
-        SELECT 
-            t.transaction_id,
-            t.customer_id,
-            t.product_id,
-            t.corrected_price,
-            t.delivery_days,
-            t.payment_method,
-            t.return_status,
-            t.customer_rating,
-            td.date_key,
-            td.month,
-            td.year,
-            c.state
-        FROM transactions t
-        LEFT JOIN time_dimension td ON t.date_key = td.date_key
-        LEFT JOIN customers c ON t.customer_id = c.customer_id;
-    """
-
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+from utils.analytics_backend import get_analytics_connection, read_sql
+from utils import cache_manager, chart_data, progressive, sampling
+from utils.load_runs import get_data_version
+from utils.partitions import year_bounds
+
+
+@cache_manager.cached(ttl=1800)
+def load_years():
+    conn = get_analytics_connection()
+    years = read_sql("SELECT DISTINCT year FROM time_dimension WHERE year IS NOT NULL ORDER BY year", conn)
+    return years["year"].tolist()
+
+
+@cache_manager.cached(ttl=1800)
+def load_states():
+    conn = get_analytics_connection()
+    states = read_sql("SELECT DISTINCT state FROM customers WHERE state IS NOT NULL AND state <> '' ORDER BY state", conn)
+    return states["state"].tolist()
+
+
+def ops_source(year=None, state=None):
+    """FROM clause, conditions and params of the transactions selected by the filters."""
+    from_sql = "FROM transactions t"
+    conditions, params = [], []
+    if year is not None:
+        # Filter on date_key directly so MySQL only reads that year's partition
+        # (and DuckDB can skip row groups by their date_key min/max)
+        conditions += ["t.date_key >= %s", "t.date_key < %s"]
+        params += list(year_bounds(year))
+    if state is not None:
+        from_sql += " JOIN customers c ON t.customer_id = c.customer_id"
+        conditions.append("c.state = %s")
+        params.append(state)
+    return from_sql, conditions, params
+
+
+# Every figure is aggregated in SQL: only counts and bins leave the database
+
+@cache_manager.cached(ttl=1800)
+def load_ops_summary(year=None, state=None):
+    from_sql, conditions, params = ops_source(year, state)
+    where_sql = "WHERE " + " AND ".join(conditions) if conditions else ""
+    df = read_sql(f"""
+        SELECT
+            COUNT(*) AS records,
+            AVG(t.delivery_days) AS avg_delivery_days,
+            AVG(CASE WHEN t.return_status = 'Returned' THEN 1 ELSE 0 END) * 100 AS return_rate,
+            AVG(t.customer_rating) AS avg_rating
+        {from_sql}
+        {where_sql}
+    """, get_analytics_connection(), params)
+    return {column: float(value) if pd.notna(value) else 0.0 for column, value in df.iloc[0].items()}
+
+
+@cache_manager.cached(ttl=1800)
+def load_status_counts(year=None, state=None):
+    from_sql, conditions, params = ops_source(year, state)
+    return chart_data.sql_value_counts(get_analytics_connection(), from_sql, "t.return_status", conditions, params)
+
+
+@cache_manager.cached(ttl=1800)
+def load_payment_counts(year=None, state=None):
+    from_sql, conditions, params = ops_source(year, state)
+    return chart_data.sql_value_counts(get_analytics_connection(), from_sql, "t.payment_method", conditions, params)
+
+
+@cache_manager.cached(ttl=1800)
+def load_rating_histogram(year=None, state=None):
+    from_sql, conditions, params = ops_source(year, state)
+    return chart_data.sql_histogram(get_analytics_connection(), from_sql, "t.customer_rating", bins=5,
+                                    conditions=conditions, params=params)
+
+
+def approximate_view(sample):
+    # Estimated from the stratified sample; every figure carries its 95% interval
+    st.sidebar.write(f"Sampled Records: **{len(sample)}**")
+
+    st.subheader("Delivery Performance")
+
+    delivery = sampling.estimate_mean(sample, "delivery_days").iloc[0]
+    st.metric("Avg Delivery Days", round(delivery["estimate"], 2))
+    st.caption(sampling.interval_text(delivery))
+
+    status = sampling.estimate_total(sample, by="return_status").sort_values("estimate", ascending=False)
+    st.image(chart_data.render_bar(
+        status["return_status"].to_numpy(), status["estimate"].to_numpy(),
+        title="Delivery Status Distribution (estimated)", errors=sampling.error_bars(status)
+    ))
+
+    st.subheader("Return Rate Analysis")
+
+    returned = (sample["return_status"] == "Returned").to_numpy(dtype=float) * 100
+    return_rate = sampling.estimate_mean(sample, returned).iloc[0]
+    st.metric("Return Rate (%)", f"{return_rate['estimate']:.2f}%")
+    st.caption(sampling.interval_text(return_rate, "{:.2f}%"))
+    st.markdown("---")
+
+    st.subheader("Payment Method Preferences")
+
+    shares = sampling.estimate_shares(sample, "payment_method").sort_values("estimate", ascending=False)
+    st.image(chart_data.render_pie(
+        shares["payment_method"].to_numpy(), shares["estimate"].to_numpy(), title="Payment Method Share"
+    ))
+    st.caption("; ".join(
+        f"{row['payment_method']}: {row['estimate']:.1%} ({sampling.interval_text(row, '{:.1%}')})"
+        for _, row in shares.iterrows()
+    ))
+    st.markdown("---")
+
+    st.subheader("Customer Satisfaction Score")
+
+    rating = sampling.estimate_mean(sample, "customer_rating").iloc[0]
+    st.metric("Average Rating", round(rating["estimate"], 2))
+    st.caption(sampling.interval_text(rating))
+
+    # Same 5 bins as the exact histogram, each with its estimated count
+    ratings = sample["customer_rating"].to_numpy(dtype=float)
+    _, edges = chart_data.histogram(ratings, bins=5)
+    if len(edges):
+        bins = np.clip(np.searchsorted(edges, ratings, side="right") - 1, 0, len(edges) - 2)
+        bins = np.where(np.isnan(ratings), np.nan, bins)
+        counts = sampling.estimate_total(sample.assign(rating_bin=bins), by="rating_bin")
+        labels = [f"{edges[int(b)]:.1f}-{edges[int(b) + 1]:.1f}" for b in counts["rating_bin"]]
+        st.image(chart_data.render_bar(
+            labels, counts["estimate"].to_numpy(),
+            title="Rating Distribution (estimated)", errors=sampling.error_bars(counts)
+        ))
+
+    st.markdown("---")
+
+
+def render_status(status):
+    st.image(chart_data.render_bar(
+        status["value"].to_numpy(), status["count"].to_numpy(), title="Delivery Status Distribution"
+    ))
+
+
+def render_payments(payments):
+    st.image(chart_data.render_pie(
+        payments["value"].to_numpy(), payments["count"].to_numpy(), title="Payment Method Share"
+    ))
+
+
+def render_ratings(histogram):
+    counts, edges = histogram
+    st.image(chart_data.render_hist(
+        counts, edges, title="Rating Distribution", xlabel="Rating", ylabel="Count"
+    ))
 
 
 def app():
     st.title("Operations & Logistics Analytics Dashboard")
 
-    df = load_ops_data()
-
     st.sidebar.header("Filters")
+    approximate = sampling.approximate_toggle("logistics_approximate")
     year_filter = st.sidebar.selectbox(
-        "Select Year", ["All"] + sorted(df["year"].dropna().unique().tolist())
-    )
-    state_filter = st.sidebar.selectbox(
-        "Select State", ["All"] + sorted(df["state"].dropna().unique().tolist())
+        "Select Year", ["All"] + load_years()
     )
 
-    # Apply Filters
-    if year_filter != "All":
-        df = df[df["year"] == year_filter]
-
-    if state_filter != "All":
-        df = df[df["state"] == state_filter]
-
-    st.sidebar.write(f"Total Records: **{len(df)}**")
+    if approximate:
+        # Year and state are strata of the sample, so filtering it on them stays unbiased
+        sample = sampling.load_sample(get_data_version(get_analytics_connection()))
+        if year_filter != "All":
+            sample = sample[sample["year"] == int(year_filter)]
+        state_filter = st.sidebar.selectbox(
+            "Select State", ["All"] + sorted(s for s in sample["state"].dropna().unique() if s)
+        )
+        if state_filter != "All":
+            sample = sample[sample["state"] == state_filter]
+        # The sample is in memory: nothing of an exact run is needed any more
+        progressive.cancel()
+        approximate_view(sample)
+        return
+
+    # Both filters are applied in SQL; the year one prunes partitions
+    state_filter = st.sidebar.selectbox("Select State", ["All"] + load_states())
+    year = None if year_filter == "All" else int(year_filter)
+    state = None if state_filter == "All" else state_filter
+
+    # The charts start loading in the background first; changing a filter
+    # starts a new run, which cancels the queries still running for the old one
+    run = progressive.start("Logistics", year, state)
+    run.submit("status", load_status_counts, year, state)
+    run.submit("payments", load_payment_counts, year, state)
+    run.submit("ratings", load_rating_histogram, year, state)
+
+    # The metrics are one aggregate, shown while the charts are still loading
+    summary = load_ops_summary(year, state)
+    st.sidebar.write(f"Total Records: **{int(summary['records'])}**")
 
    
     #  1 -Delivery Performance Analysis
@@ -62,25 +199,16 @@ def app():
     col1, = st.columns(1)
 
     with col1:
-        avg_days = df["delivery_days"].mean()
-        st.metric("Avg Delivery Days", round(avg_days, 2))
+        st.metric("Avg Delivery Days", round(summary["avg_delivery_days"], 2))
+    run.first_metric()
 
     # Delivery Bar Chart
-    del_count = df["return_status"].value_counts()
-
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.bar(del_count.index, del_count.values)
-    ax.set_title("Delivery Status Distribution")
-    st.pyplot(fig)
+    pending = progressive.reserve(run, [("status", "delivery status", render_status)])
     
 
     st.subheader("Return Rate Analysis")
 
-    total_orders = len(df)
-    returned_orders = df[df["return_status"] == "Returned"].shape[0]
-    return_rate = (returned_orders / total_orders) * 100 if total_orders > 0 else 0
-
-    st.metric("Return Rate (%)", f"{return_rate:.2f}%")
+    st.metric("Return Rate (%)", f"{summary['return_rate']:.2f}%")
     st.markdown("---")
 
  
@@ -88,13 +216,7 @@ def app():
 
     st.subheader("Payment Method Preferences")
 
-    pay_df = df["payment_method"].value_counts().reset_index()
-    pay_df.columns = ["payment_method", "count"]
-
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.pie(pay_df["count"], labels=pay_df["payment_method"], autopct="%1.1f%%")
-    ax.set_title("Payment Method Share")
-    st.pyplot(fig)
+    progressive.reserve(run, [("payments", "payment methods", render_payments)], pending)
 
     st.markdown("---")
 
@@ -105,16 +227,12 @@ def app():
 
     st.subheader("Customer Satisfaction Score")
 
-    avg_rating = df["customer_rating"].mean()
-    st.metric("Average Rating", round(avg_rating, 2))
+    st.metric("Average Rating", round(summary["avg_rating"], 2))
 
     # Rating Distribution
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.hist(df["customer_rating"].dropna(), bins=5)
-    ax.set_title("Rating Distribution")
-    ax.set_xlabel("Rating")
-    ax.set_ylabel("Count")
-    st.pyplot(fig)
+    progressive.reserve(run, [("ratings", "rating distribution", render_ratings)], pending)
 
     st.markdown("---")
 
+    # Fill the chart placeholders as their queries finish
+    progressive.fill(run, pending)
@@ -1,137 +1,176 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils.db_connection import get_connection
-from millify import millify
-
-st.set_page_config(page_title="Advanced Analytics", layout="wide")
-
-
-@st.cache_data
-def load_data():
-    conn = get_connection()
-
-    query = """
-        SELECT
-            t.transaction_id,
-            t.corrected_price,
-            t.customer_rating,
-            t.payment_method,
-            t.delivery_days,
-            t.return_status,
-            td.date_key,
-            td.year,
-            td.month,
-            td.quarter,
-            td.day_of_week,
-            c.is_prime_member,
-            p.category,
-            p.product_name
-        FROM transactions t
-        JOIN time_dimension td ON t.date_key = td.date_key
-        JOIN customers c ON t.customer_id = c.customer_id
-        JOIN products p ON t.product_id = p.product_id;
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-
-
-def app():
-
-    st.title("Advanced Analytics Dashboard")
-
-    df = load_data()
-
-    # 1 Key Sales Metrics
-
-    st.header("Key Sales Metrics")
-    total_revenue = df['corrected_price'].sum()
-    readable_rev = millify(total_revenue, precision=2)
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Revenue", f"₹{readable_rev}")
-    col2.metric("Avg Delivery Days", round(df["delivery_days"].mean(), 2))
-    col3.metric("Return Rate (%)", round((df["return_status"] == "Returned").mean() * 100, 2))
-    col4.metric("Avg Customer Rating", round(df["customer_rating"].mean(), 2))
-
-
-    seasonal = df.groupby(["year", "month"])["corrected_price"].sum().reset_index()
-    seasonal["period"] = seasonal["year"].astype(str) + "-" + seasonal["month"].astype(str)
-
-   
-    # 3 Delivery Performance Analysis
-  
-    st.subheader("Delivery Performance Analysis")
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.write("### Delivery Time Distribution")
-        fig, ax = plt.subplots(figsize=(5, 4))
-        ax.hist(df["delivery_days"].dropna())
-        st.pyplot(fig)
-
-    with col2:
-        st.write("### Delivery Issues (Returns)")
-        issue_df = df["return_status"].value_counts()
-        st.bar_chart(issue_df)
-
-   
-    #  PAYMENT METHOD PERFORMANCE
-    
-    st.subheader("Payment Method Preferences")
-
-    pay_df = df["payment_method"].value_counts()
-    st.bar_chart(pay_df)
-
-
-    # Customer Satisfaction & Recommendation Effectiveness
-    
-    st.subheader("Customer Satisfaction & Recommendation Effectiveness")
-
-    rating_rev = df.groupby("customer_rating")["corrected_price"].mean()
-
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.plot(rating_rev.index, rating_rev.values)
-    ax.set_title("Rating vs Avg Spending")
-    st.pyplot(fig)
-
- 
-    # Automated Alerts
-
-    st.subheader("Automated Alerts")
-
-    alerts = []
-
-    if df["delivery_days"].mean() > 7:
-        alerts.append("⚠ Average delivery time has increased above 7 days.")
-
-    if (df["return_status"] == "Returned").mean() > 0.10:
-        alerts.append("⚠ Return rate is above 10%.")
-
-    if df["customer_rating"].mean() < 3.5:
-        alerts.append("⚠ Drop in customer satisfaction score.")
-
-    if len(alerts) == 0:
-        st.success(" No alerts! Performance looks healthy.")
-    else:
-        for a in alerts:
-            st.error(a)
-
-    # Strategic Recommendations
-
-    st.subheader("Strategic Recommendations")
-
-    st.write("""
-    - Increase warehouse capacity in high-delay regions  
-    - Add faster delivery options for premium customers  
-    - Promote high-rated products in marketing campaigns  
-    - Monitor high-return categories for quality issues  
-    - Use seasonal forecasting to plan inventory ahead  
-    """)
-
-
-# Run in Streamlit
-if __name__ == "__main__":
-    app()
+import streamlit as st
+import pandas as pd
+from utils.analytics_backend import get_analytics_connection, read_sql
+from utils import cache_manager, chart_data, alerts, progressive
+from millify import millify
+
+
+@cache_manager.cached(ttl=300)
+def load_kpis():
+    # The four headline aggregates need no joins, so they come back long before the charts
+    df = read_sql("""
+        SELECT
+            SUM(corrected_price) AS total_revenue,
+            AVG(delivery_days) AS avg_delivery_days,
+            AVG(CASE WHEN return_status = 'Returned' THEN 1 ELSE 0 END) * 100 AS return_rate,
+            AVG(customer_rating) AS avg_rating
+        FROM transactions
+    """)
+    return {column: float(value) if pd.notna(value) else 0.0 for column, value in df.iloc[0].items()}
+
+
+# The chart sections are binned and counted in SQL: only the aggregates leave the database
+
+@cache_manager.cached(ttl=300)
+def load_delivery():
+    conn = get_analytics_connection()
+    return {
+        "histogram": chart_data.sql_histogram(conn, "FROM transactions t", "t.delivery_days"),
+        "returns": chart_data.sql_value_counts(conn, "FROM transactions t", "t.return_status"),
+    }
+
+
+@cache_manager.cached(ttl=300)
+def load_payments():
+    return chart_data.sql_value_counts(get_analytics_connection(), "FROM transactions t", "t.payment_method")
+
+
+@cache_manager.cached(ttl=300)
+def load_satisfaction():
+    return read_sql("""
+        SELECT customer_rating, AVG(corrected_price) AS avg_spending
+        FROM transactions
+        WHERE customer_rating IS NOT NULL
+        GROUP BY customer_rating
+        ORDER BY customer_rating
+    """, get_analytics_connection())
+
+
+@cache_manager.cached(ttl=300)
+def load_alert_state():
+    conn = get_analytics_connection()
+    state = alerts.load_alert_state(conn)
+    conn.close()
+    return state
+
+
+def render_kpis(kpis):
+    st.header("Key Sales Metrics")
+    readable_rev = millify(kpis["total_revenue"], precision=2)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Revenue", f"₹{readable_rev}")
+    col2.metric("Avg Delivery Days", round(kpis["avg_delivery_days"], 2))
+    col3.metric("Return Rate (%)", round(kpis["return_rate"], 2))
+    col4.metric("Avg Customer Rating", round(kpis["avg_rating"], 2))
+
+
+def render_delivery(delivery):
+   
+    # 3 Delivery Performance Analysis
+  
+    st.subheader("Delivery Performance Analysis")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("### Delivery Time Distribution")
+        counts, edges = delivery["histogram"]
+        st.image(chart_data.render_hist(counts, edges, figsize=(5, 4)))
+
+    with col2:
+        st.write("### Delivery Issues (Returns)")
+        issue_df = delivery["returns"].set_index("value")["count"]
+        st.bar_chart(issue_df)
+
+
+def render_payments(payments):
+   
+    #  PAYMENT METHOD PERFORMANCE
+    
+    st.subheader("Payment Method Preferences")
+
+    pay_df = payments.set_index("value")["count"]
+    st.bar_chart(pay_df)
+
+
+def render_satisfaction(rating_rev):
+
+    # Customer Satisfaction & Recommendation Effectiveness
+    
+    st.subheader("Customer Satisfaction & Recommendation Effectiveness")
+
+    st.image(chart_data.render_lines(
+        rating_rev["customer_rating"].to_numpy(), {"Avg Spending": rating_rev["avg_spending"].to_numpy(dtype=float)},
+        title="Rating vs Avg Spending", figsize=(6, 4)
+    ))
+
+
+def render_alerts(state):
+ 
+    # Automated Alerts
+
+    st.subheader("Automated Alerts")
+
+    # Alerts are evaluated over recent sliding windows by the loader / alert job
+    if state.empty:
+        st.info("No alert state yet. Run `python -m utils.alerts` after loading data.")
+    else:
+        st.caption(f"Windows ending {state['as_of'].iloc[0]} (evaluated {state['evaluated_at'].iloc[0]})")
+        fired = state[state["triggered"] == 1]
+        overall = fired[fired["dimension"] == "all"].sort_values("window_days")
+
+        if fired.empty:
+            st.success(" No alerts! Performance looks healthy.")
+        for a in overall.itertuples(index=False):
+            st.error(f"⚠ Last {a.window_days} days: {a.message} ({a.value:.2f})")
+
+        by_slice = fired[fired["dimension"] != "all"]
+        if not by_slice.empty:
+            with st.expander(f"⚠ {len(by_slice)} alerts by state / category"):
+                st.dataframe(by_slice[["window_days", "dimension", "dim_value", "rule", "value", "threshold"]]
+                             .sort_values(["window_days", "dimension", "dim_value"]))
+
+
+def app():
+
+    st.title("Advanced Analytics Dashboard")
+
+    # Expensive: the full-table aggregates behind the charts start in the background first
+    run = progressive.start("Advanced Analytics")
+    run.submit("delivery", load_delivery)
+    run.submit("payments", load_payments)
+    run.submit("satisfaction", load_satisfaction)
+
+    # 1 Key Sales Metrics (cheap: shown while the charts are still loading)
+
+    render_kpis(load_kpis())
+    run.first_metric()
+
+    pending = progressive.reserve(run, [
+        ("delivery", "delivery performance", render_delivery),
+        ("payments", "payment methods", render_payments),
+        ("satisfaction", "customer satisfaction", render_satisfaction),
+    ])
+
+    render_alerts(load_alert_state())
+
+    # Strategic Recommendations
+
+    st.subheader("Strategic Recommendations")
+
+    st.write("""
+    - Increase warehouse capacity in high-delay regions  
+    - Add faster delivery options for premium customers  
+    - Promote high-rated products in marketing campaigns  
+    - Monitor high-return categories for quality issues  
+    - Use seasonal forecasting to plan inventory ahead  
+    """)
+
+    # Fill the chart sections as their aggregates arrive
+    progressive.fill(run, pending)
+
+
+# Run in Streamlit
+if __name__ == "__main__":
+    app()
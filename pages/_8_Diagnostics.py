@@ -0,0 +1,41 @@
+import streamlit as st
+from utils import cache_manager
+from utils.profiling import summary, uptime
+
+
+def app():
+
+    st.title("Diagnostics")
+
+    # Page loader cache of this process (utils/cache_manager.py)
+
+    st.subheader("Loader Cache")
+
+    usage = cache_manager.usage()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Memory Used", f"{usage['used_mb']:.0f} MB",
+                f"{usage['used_mb'] / usage['budget_mb']:.0%} of {usage['budget_mb']:.0f} MB budget",
+                delta_color="off")
+    col2.metric("Cached Results", usage["entries"])
+    col3.metric("Process Uptime", f"{uptime() / 60:.0f} min")
+
+    stats = cache_manager.stats()
+    if stats:
+        st.write("Per loader (evictions make room within the budget, expirations are TTLs):")
+        st.dataframe(stats, use_container_width=True)
+    else:
+        st.info("No loader has run in this process yet.")
+
+    entries = cache_manager.entries()
+    if entries:
+        st.write("Cached results, in eviction order (lowest recompute time per byte first):")
+        st.dataframe(entries, use_container_width=True)
+
+    if st.button("Clear loader cache"):
+        cache_manager.clear()
+        st.rerun()
+
+    # Timings
+
+    st.subheader("Timings")
+    st.dataframe(summary(), use_container_width=True)
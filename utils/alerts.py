@@ -0,0 +1,188 @@
+# utils/alerts.py
+"""
+Sliding-window operational alerts.
+
+The loader keeps per-day running totals (orders, returns, delivery days,
+ratings) for the whole business and per state and category in
+daily_ops_aggregates, rebuilding only the days it loaded. Window totals
+for the last N days are sums of at most N daily rows per slice, and each
+threshold rule is then evaluated in constant time from those totals. The
+result is written to alert_state, which pages and headless jobs just read.
+
+Run headless after a load with:  python -m utils.alerts
+"""
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.analytics_backend import read_sql
+
+WINDOWS = (7, 30)
+DIMENSIONS = {
+    "all": None,
+    "state": "c.state",
+    "category": "p.category",
+}
+# Slices with fewer orders than this in a window are too noisy to alert on
+MIN_ORDERS = 20
+
+RULES = [
+    {"name": "delivery_days", "metric": "avg_delivery_days", "op": ">", "threshold": 7,
+     "message": "Average delivery time has increased above 7 days."},
+    {"name": "return_rate", "metric": "return_rate", "op": ">", "threshold": 0.10,
+     "message": "Return rate is above 10%."},
+    {"name": "customer_rating", "metric": "avg_rating", "op": "<", "threshold": 3.5,
+     "message": "Drop in customer satisfaction score."},
+]
+
+
+# Loader maintenance
+
+def refresh_daily_aggregates(conn, date_from, date_to):
+    """Rebuilds the daily rows of every dimension for date_key in [date_from, date_to)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "DELETE FROM daily_ops_aggregates WHERE date_key >= %s AND date_key < %s",
+        (date_from, date_to)
+    )
+    for dimension, column in DIMENSIONS.items():
+        print(f"Refreshing daily ops aggregates by {dimension}...")
+        value_sql = f"COALESCE({column}, '')" if column else "''"
+        cursor.execute(f"""
+            INSERT INTO daily_ops_aggregates (
+                date_key, dimension, dim_value, orders, returned,
+                delivery_sum, delivery_n, rating_sum, rating_n
+            )
+            SELECT
+                t.date_key,
+                %s,
+                {value_sql},
+                COUNT(*),
+                SUM(t.return_status = 'Returned'),
+                COALESCE(SUM(t.delivery_days), 0),
+                COUNT(t.delivery_days),
+                COALESCE(SUM(t.customer_rating), 0),
+                COUNT(t.customer_rating)
+            FROM transactions t
+            LEFT JOIN customers c ON t.customer_id = c.customer_id
+            LEFT JOIN products p ON t.product_id = p.product_id
+            WHERE t.date_key >= %s AND t.date_key < %s
+            GROUP BY t.date_key, {value_sql}
+        """, (dimension, date_from, date_to))
+    conn.commit()
+    cursor.close()
+
+
+# Evaluation
+
+def window_totals(conn, as_of, windows=WINDOWS):
+    """Summed daily rows per (window, dimension, dim_value) for windows ending at as_of."""
+    daily = pd.read_sql("""
+        SELECT date_key, dimension, dim_value, orders, returned,
+               delivery_sum, delivery_n, rating_sum, rating_n
+        FROM daily_ops_aggregates
+        WHERE date_key > %s AND date_key <= %s
+    """, conn, params=[as_of - timedelta(days=max(windows)), as_of])
+    daily["date_key"] = pd.to_datetime(daily["date_key"])
+
+    totals = []
+    for days in windows:
+        in_window = daily[daily["date_key"] > pd.Timestamp(as_of - timedelta(days=days))]
+        summed = in_window.groupby(["dimension", "dim_value"], as_index=False)[
+            ["orders", "returned", "delivery_sum", "delivery_n", "rating_sum", "rating_n"]
+        ].sum()
+        summed.insert(0, "window_days", days)
+        totals.append(summed)
+    return pd.concat(totals, ignore_index=True)
+
+
+def add_metrics(totals):
+    totals = totals.copy()
+    totals["avg_delivery_days"] = totals["delivery_sum"].astype(float) / totals["delivery_n"].where(totals["delivery_n"] > 0)
+    totals["return_rate"] = totals["returned"].astype(float) / totals["orders"].where(totals["orders"] > 0)
+    totals["avg_rating"] = totals["rating_sum"].astype(float) / totals["rating_n"].where(totals["rating_n"] > 0)
+    return totals
+
+
+def evaluate_rules(totals, rules=RULES, min_orders=MIN_ORDERS):
+    """One row per (rule, window, slice) with its value and whether it fired."""
+    totals = add_metrics(totals)
+    totals = totals[totals["orders"] >= min_orders]
+
+    out = []
+    for rule in rules:
+        values = totals[rule["metric"]]
+        fired = values > rule["threshold"] if rule["op"] == ">" else values < rule["threshold"]
+        out.append(pd.DataFrame({
+            "rule": rule["name"],
+            "window_days": totals["window_days"],
+            "dimension": totals["dimension"],
+            "dim_value": totals["dim_value"],
+            "value": values,
+            "threshold": rule["threshold"],
+            "triggered": fired.fillna(False).astype(int),
+            "message": rule["message"],
+        }))
+    return pd.concat(out, ignore_index=True) if out else pd.DataFrame()
+
+
+def latest_date(conn):
+    df = pd.read_sql("SELECT MAX(date_key) AS as_of FROM daily_ops_aggregates", conn)
+    as_of = df["as_of"].iloc[0]
+    return None if pd.isna(as_of) else pd.Timestamp(as_of).date()
+
+
+def evaluate_alerts(conn, as_of=None, write=True):
+    """
+    Evaluates every rule over every window ending at as_of (default: the
+    latest loaded day) and, if write is set, replaces alert_state with it.
+    """
+    as_of = as_of or latest_date(conn)
+    if as_of is None:
+        return pd.DataFrame()
+
+    state = evaluate_rules(window_totals(conn, as_of))
+    state["as_of"] = as_of
+    state["evaluated_at"] = datetime.now()
+
+    if write:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM alert_state")
+        cursor.executemany("""
+            INSERT INTO alert_state (
+                rule, window_days, dimension, dim_value, value, threshold,
+                triggered, message, as_of, evaluated_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (r.rule, int(r.window_days), r.dimension, r.dim_value,
+             None if pd.isna(r.value) else float(r.value), float(r.threshold),
+             int(r.triggered), r.message, r.as_of, r.evaluated_at)
+            for r in state.itertuples(index=False)
+        ])
+        conn.commit()
+        cursor.close()
+    return state
+
+
+def load_alert_state(conn):
+    """The alert state written by the last evaluation."""
+    return read_sql("""
+        SELECT rule, window_days, dimension, dim_value, value, threshold,
+               triggered, message, as_of, evaluated_at
+        FROM alert_state
+    """, conn)
+
+
+if __name__ == "__main__":
+    from utils.db_connection import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    state = evaluate_alerts(conn)
+    fired = state[state["triggered"] == 1] if not state.empty else state
+    print(f"Evaluated {len(state)} rule/window/slice combinations, {len(fired)} alerts firing.")
+    for r in fired.itertuples(index=False):
+        print(f"  [{r.window_days}d {r.dimension}={r.dim_value or 'all'}] {r.message} ({r.value:.2f})")
+    conn.close()
@@ -0,0 +1,325 @@
+# utils/analytics_backend.py
+"""
+Pluggable analytics backend for the dashboard's read queries.
+
+MySQL stays the system of record: Data_Loader.py writes there and all
+derived tables are maintained there. Pages read through read_sql(), which
+runs their SQL against the backend selected by DASHBOARD_BACKEND:
+
+    mysql   (default)  the live MySQL database
+    duckdb             an embedded DuckDB file replicated from MySQL
+
+DuckDB stores the star schema column by column, so the full-scan aggregates
+the pages run only read the columns they touch. The replica is rebuilt after
+every load (or with `python -m utils.analytics_backend`) into a new file that
+atomically replaces the old one; readers reopen it when it changes.
+
+Queries run inside query_group() can be interrupted from another thread
+with QueryGroup.cancel(), e.g. when a page rerun makes them obsolete.
+
+Every query can also be logged (DASHBOARD_QUERY_LOG=queries.jsonl, or
+capture_queries() in-process) as the workload for utils/index_advisor.py.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from utils.db_connection import DB_CONFIG, get_connection, new_connection
+
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "mysql").lower()
+DUCKDB_PATH = Path(os.environ.get(
+    "DASHBOARD_DUCKDB_PATH", Path(__file__).resolve().parent.parent / "analytics.duckdb"
+))
+
+# Base tables plus the derived tables the pages read
+REPLICATED_TABLES = [
+    "products", "customers", "time_dimension", "transactions",
+    "customer_sketches", "daily_ops_aggregates", "alert_state", "geo_cube", "load_runs",
+    "sample_strata", "transactions_sample",
+]
+DUCKDB_ALIAS = "replica"
+REPLICATION_CHUNK_ROWS = 500_000
+QUERY_LOG = os.environ.get("DASHBOARD_QUERY_LOG")
+
+_duckdb_conn = None
+_duckdb_stat = None
+_duckdb_lock = threading.Lock()
+_captured = None
+_log_lock = threading.Lock()
+_group = threading.local()
+
+
+# Reading
+
+def _open_duckdb():
+    """The shared read-only DuckDB connection, reopened if the replica was replaced."""
+    global _duckdb_conn, _duckdb_stat
+    import duckdb
+
+    stat = DUCKDB_PATH.stat()
+    stat = (stat.st_ino, stat.st_mtime_ns)
+    with _duckdb_lock:
+        if _duckdb_conn is None or stat != _duckdb_stat:
+            # The previous connection is not closed: sessions and background
+            # workers may still be reading through its cursors, which keep its
+            # (replaced) file open until they are released. The replica is
+            # attached to a fresh in-memory database because duckdb.connect()
+            # on the same path would hand back the old, still open database.
+            conn = duckdb.connect(":memory:")
+            conn.execute(f"ATTACH '{DUCKDB_PATH}' AS {DUCKDB_ALIAS} (READ_ONLY)")
+            _duckdb_conn = conn
+            _duckdb_stat = stat
+        return _duckdb_conn
+
+
+def get_analytics_connection():
+    """
+    A connection to the configured backend. For DuckDB this is a cursor of
+    the shared connection, which may be used (and closed) by one thread.
+    """
+    if BACKEND != "duckdb":
+        return get_connection()
+    try:
+        cursor = _open_duckdb().cursor()
+        cursor.execute(f"USE {DUCKDB_ALIAS}")
+        return cursor
+    except Exception as e:
+        print(f" Analytics replica not available ({e}), reading from MySQL")
+        return get_connection()
+
+
+def is_duckdb(conn):
+    # The connection class lives in "_duckdb" in recent DuckDB releases
+    return type(conn).__module__.lstrip("_").startswith("duckdb")
+
+
+def to_duckdb_sql(query):
+    """Rewrites the MySQL dialect the pages use: %s parameters and `quoted` names."""
+    return query.replace("%s", "?").replace("`", '"')
+
+
+def read_sql(query, conn=None, params=None):
+    """Runs a read query on conn (default: the configured backend) into a DataFrame."""
+    if conn is None:
+        conn = get_analytics_connection()
+    start = time.perf_counter()
+    with _tracked(conn):
+        if is_duckdb(conn):
+            df = conn.execute(to_duckdb_sql(query), list(params or [])).df()
+        else:
+            df = pd.read_sql(query, conn, params=params)
+    if _captured is not None or QUERY_LOG:
+        _log_query(query, params, time.perf_counter() - start)
+    return df
+
+
+def read_frame(query, params=None, label="query"):
+    """
+    Like read_sql() for the large page datasets: the result is streamed into
+    typed columns (see utils/typed_fetch.py) and its throughput is reported.
+    """
+    from utils import typed_fetch
+
+    start = time.perf_counter()
+    conn = get_analytics_connection() if BACKEND == "duckdb" else None
+    if conn is not None and is_duckdb(conn):
+        with _tracked(conn):
+            df = typed_fetch.categorize(conn.execute(to_duckdb_sql(query), list(params or [])).df())
+    else:
+        # A dedicated connection: an unbuffered cursor holds it until the last row
+        conn = new_connection()
+        try:
+            with _tracked(conn):
+                df = typed_fetch.stream_mysql(conn, query, params)
+        finally:
+            conn.close()
+    seconds = time.perf_counter() - start
+
+    typed_fetch.report(label, df, seconds)
+    if _captured is not None or QUERY_LOG:
+        _log_query(query, params, seconds)
+    return df
+
+
+# Cancellation
+
+class QueryCancelled(Exception):
+    """Raised in place of a query whose group was cancelled."""
+
+
+class QueryGroup:
+    """
+    The queries run on behalf of one unit of work (such as a page render),
+    so another thread can interrupt all of them at once.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._running = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def running(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled()
+            self._running.add(conn)
+        try:
+            yield
+        except Exception as e:
+            if self.cancelled:
+                raise QueryCancelled() from e
+            raise
+        finally:
+            with self._lock:
+                self._running.discard(conn)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            running = list(self._running)
+        for conn in running:
+            _interrupt(conn)
+
+
+def _interrupt(conn):
+    try:
+        if is_duckdb(conn):
+            conn.interrupt()
+        else:
+            # KILL QUERY stops the statement but keeps the connection usable
+            killer = new_connection()
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(conn.connection_id)}")
+            cursor.close()
+            killer.close()
+    except Exception as e:
+        print(f"Could not interrupt query: {e}")
+
+
+@contextmanager
+def query_group(group):
+    """Queries run by the calling thread inside the block belong to group."""
+    previous = getattr(_group, "current", None)
+    _group.current = group
+    try:
+        yield group
+    finally:
+        _group.current = previous
+
+
+@contextmanager
+def _tracked(conn):
+    group = getattr(_group, "current", None)
+    if group is None:
+        yield
+    else:
+        with group.running(conn):
+            yield
+
+
+# Workload logging
+
+@contextmanager
+def capture_queries():
+    """Collects {sql, params, seconds} for every read_sql() call inside the block."""
+    global _captured
+    _captured = []
+    try:
+        yield _captured
+    finally:
+        _captured = None
+
+
+def _log_query(query, params, seconds):
+    entry = {"sql": query, "params": list(params or []), "seconds": seconds, "backend": BACKEND}
+    with _log_lock:
+        if _captured is not None:
+            _captured.append(entry)
+        if QUERY_LOG:
+            with open(QUERY_LOG, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+
+# Replication
+
+DUCKDB_TYPES = {
+    "tinyint": "INTEGER", "smallint": "INTEGER", "mediumint": "INTEGER",
+    "int": "BIGINT", "bigint": "BIGINT",
+    "float": "DOUBLE", "double": "DOUBLE",
+    "date": "DATE", "datetime": "TIMESTAMP", "timestamp": "TIMESTAMP",
+    "blob": "BLOB", "mediumblob": "BLOB", "longblob": "BLOB", "varbinary": "BLOB",
+}
+
+
+def table_schema(conn, table):
+    """[(column, DuckDB type)] for a MySQL table, in column order."""
+    columns = pd.read_sql("""
+        SELECT COLUMN_NAME AS name, DATA_TYPE AS data_type,
+               NUMERIC_PRECISION AS num_precision, NUMERIC_SCALE AS num_scale
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, conn, params=[DB_CONFIG["database"], table])
+
+    schema = []
+    for c in columns.itertuples(index=False):
+        data_type = c.data_type.lower()
+        if data_type == "decimal":
+            duck_type = f"DECIMAL({int(c.num_precision)}, {int(c.num_scale)})"
+        else:
+            duck_type = DUCKDB_TYPES.get(data_type, "VARCHAR")
+        schema.append((c.name, duck_type))
+    return schema
+
+
+def replicate_table(conn, duck, table):
+    schema = table_schema(conn, table)
+    columns = ", ".join(f'"{name}"' for name, _ in schema)
+    definitions = ", ".join(f'"{name}" {duck_type}' for name, duck_type in schema)
+    duck.execute(f"CREATE TABLE {table} ({definitions})")
+
+    rows = 0
+    for chunk in pd.read_sql(f"SELECT * FROM {table}", conn, chunksize=REPLICATION_CHUNK_ROWS):
+        duck.register("chunk", chunk)
+        # DuckDB casts each column to the declared type on insert
+        duck.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM chunk")
+        duck.unregister("chunk")
+        rows += len(chunk)
+    print(f"  -> {table}: {rows} rows")
+    return rows
+
+
+def replicate(conn, path=None):
+    """Copies every replicated table from MySQL into a fresh DuckDB file and swaps it in."""
+    import duckdb
+
+    path = Path(path or DUCKDB_PATH)
+    staging = path.with_name(path.name + ".tmp")
+    if staging.exists():
+        staging.unlink()
+
+    print(f"Replicating {len(REPLICATED_TABLES)} tables into {path}...")
+    duck = duckdb.connect(str(staging))
+    try:
+        for table in REPLICATED_TABLES:
+            replicate_table(conn, duck, table)
+        duck.execute("CHECKPOINT")
+    finally:
+        duck.close()
+    os.replace(staging, path)
+    return path
+
+
+if __name__ == "__main__":
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    replicate(conn)
+    conn.close()
@@ -0,0 +1,271 @@
+# utils/cache_manager.py
+"""
+Memory-budgeted cache for the page loaders.
+
+@st.cache_data has no notion of memory: without max_entries every filter
+combination stays cached, and nothing says how big the entries are. Page
+loaders use @cached instead:
+
+    @cache_manager.cached(ttl=1800, show_spinner="Loading...")
+    def load_process_copy(year=None): ...
+
+Every result is measured (deep memory size) when it is stored, and all
+loaders of the process share one byte budget (DASHBOARD_CACHE_BUDGET_MB).
+When a new result does not fit, entries are evicted by GreedyDual-Size:
+an entry's priority is L + recompute seconds / bytes, refreshed on every
+hit, and the lowest priority goes first, so large results that are cheap
+to recompute leave before small expensive ones, and entries nobody asks
+for age out as L rises to the last evicted priority. Results larger than
+the whole budget are returned without being stored.
+
+Unlike st.cache_data, results are not copied on every hit: like the shared
+snapshot frames, they are shared by all sessions and must not be modified.
+Concurrent calls with the same arguments compute the result once and all
+get it, stored or not; if the computation fails, the waiting calls retry
+it one at a time.
+stats() and entries() feed the Diagnostics page.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+BUDGET_BYTES = int(float(os.environ.get("DASHBOARD_CACHE_BUDGET_MB", 1024)) * 2 ** 20)
+# Floor for the recompute cost, so instant results still get a priority
+MIN_COST_SECONDS = 0.001
+
+_lock = threading.Lock()
+_entries = {}       # (loader, key) -> entry dict
+_computing = {}     # (loader, key) -> in-flight computation: lock, callers and result
+_loaders = {}       # loader -> statistics dict
+_inflation = 0.0    # GreedyDual-Size L
+_used_bytes = 0
+_MISSING = object()
+
+
+# Sizes
+
+def sizeof(value, _seen=None):
+    """Deep memory size of a cached result in bytes."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    # DataFrame / Series / Index (duck-typed, so pandas is not imported here)
+    if hasattr(value, "memory_usage") and hasattr(value, "ndim"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(v, seen) for v in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """A hashable cache key for loader arguments (lists and dicts included)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Bookkeeping (callers hold _lock)
+
+def _stats(loader):
+    return _loaders.setdefault(loader, {
+        "hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "oversize": 0, "compute_seconds": 0.0,
+    })
+
+
+def _drop(entry_key):
+    global _used_bytes
+    entry = _entries.pop(entry_key)
+    _used_bytes -= entry["bytes"]
+    return entry
+
+
+def _evict_for(size):
+    """Evicts lowest-priority entries until size more bytes fit in the budget."""
+    global _inflation
+    while _entries and _used_bytes + size > BUDGET_BYTES:
+        victim = min(_entries, key=lambda k: _entries[k]["priority"])
+        _inflation = _entries[victim]["priority"]
+        _drop(victim)
+        _stats(victim[0])["evictions"] += 1
+        print(f"Cache evicted {victim[0]}{victim[1]} to stay within {BUDGET_BYTES / 2 ** 20:.0f} MB")
+
+
+def _lookup(entry_key, now):
+    entry = _entries.get(entry_key)
+    if entry is None:
+        return None
+    if entry["expires"] is not None and now >= entry["expires"]:
+        _drop(entry_key)
+        _stats(entry_key[0])["expirations"] += 1
+        return None
+    entry["hits"] += 1
+    entry["last_used"] = now
+    entry["priority"] = _inflation + entry["cost"] / max(entry["bytes"], 1)
+    return entry
+
+
+def _store(entry_key, value, size, seconds, ttl):
+    global _used_bytes
+    stats = _stats(entry_key[0])
+    stats["misses"] += 1
+    stats["compute_seconds"] += seconds
+    if size > BUDGET_BYTES:
+        stats["oversize"] += 1
+        return
+    _evict_for(size)
+    now = time.time()
+    cost = max(seconds, MIN_COST_SECONDS)
+    _entries[entry_key] = {
+        "value": value,
+        "bytes": size,
+        "cost": cost,
+        "priority": _inflation + cost / max(size, 1),
+        "created": now,
+        "last_used": now,
+        "expires": now + ttl if ttl else None,
+        "hits": 0,
+    }
+    _used_bytes += size
+
+
+# Decorator
+
+def cached(ttl=None, show_spinner=False):
+    """
+    Caches a loader's results under the process budget, keyed by its
+    arguments. show_spinner is False, True or a message, as for st.cache_data.
+    """
+    def decorate(fn):
+        loader = f"{fn.__module__.split('.')[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            entry_key = (loader, _freeze(args) + _freeze(kwargs))
+            with _lock:
+                entry = _lookup(entry_key, time.time())
+                if entry is not None:
+                    _stats(loader)["hits"] += 1
+                    return entry["value"]
+                flight = _computing.get(entry_key)
+                if flight is None:
+                    flight = _computing[entry_key] = {"lock": threading.Lock(), "callers": 0, "value": _MISSING}
+                flight["callers"] += 1
+
+            try:
+                with flight["lock"]:
+                    # Computed by the caller before us: handed over even if it
+                    # was too large to store
+                    if flight["value"] is not _MISSING:
+                        with _lock:
+                            _stats(loader)["hits"] += 1
+                        return flight["value"]
+                    # Another session may have computed it while we waited
+                    with _lock:
+                        entry = _lookup(entry_key, time.time())
+                        if entry is not None:
+                            _stats(loader)["hits"] += 1
+                            return entry["value"]
+                    # If this raises, the next caller waiting on the lock tries in turn
+                    start = time.perf_counter()
+                    if show_spinner and _in_script():
+                        message = show_spinner if isinstance(show_spinner, str) else f"Running {fn.__name__}(...)."
+                        with st.spinner(message):
+                            value = fn(*args, **kwargs)
+                    else:
+                        value = fn(*args, **kwargs)
+                    seconds = time.perf_counter() - start
+                    # Measured outside the lock: deep sizes of string columns take a while
+                    size = sizeof(value)
+                    with _lock:
+                        _store(entry_key, value, size, seconds, ttl)
+                    flight["value"] = value
+                    return value
+            finally:
+                # The computation stays registered until its last waiter has
+                # run, so later arrivals queue behind it instead of starting another
+                with _lock:
+                    flight["callers"] -= 1
+                    if flight["callers"] == 0:
+                        _computing.pop(entry_key, None)
+
+        wrapper.clear = lambda: clear(loader)
+        wrapper.loader = loader
+        return wrapper
+    return decorate
+
+
+def _in_script():
+    # Loaders also run on the warm-up and background query threads, which have no page to draw on
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def clear(loader=None):
+    """Drops every cached result, or only those of one loader."""
+    with _lock:
+        for entry_key in [k for k in _entries if loader is None or k[0] == loader]:
+            _drop(entry_key)
+
+
+# Diagnostics
+
+def usage():
+    with _lock:
+        return {
+            "budget_mb": BUDGET_BYTES / 2 ** 20,
+            "used_mb": _used_bytes / 2 ** 20,
+            "entries": len(_entries),
+            "inflation": _inflation,
+        }
+
+
+def stats():
+    """One row per loader: entries, MB, hits, misses, hit rate, evictions, expirations."""
+    with _lock:
+        rows = []
+        for loader, s in _loaders.items():
+            mine = [e for k, e in _entries.items() if k[0] == loader]
+            calls = s["hits"] + s["misses"]
+            rows.append({
+                "loader": loader,
+                "entries": len(mine),
+                "mb": round(sum(e["bytes"] for e in mine) / 2 ** 20, 2),
+                "hits": s["hits"],
+                "misses": s["misses"],
+                "hit_rate": round(s["hits"] / calls, 3) if calls else None,
+                "evictions": s["evictions"],
+                "expirations": s["expirations"],
+                "oversize": s["oversize"],
+                "compute_s": round(s["compute_seconds"], 2),
+            })
+    return sorted(rows, key=lambda row: -row["mb"])
+
+
+def entries():
+    """One row per cached result, in eviction order (first to go first)."""
+    now = time.time()
+    with _lock:
+        rows = [{
+            "loader": loader,
+            "arguments": repr(key),
+            "mb": round(e["bytes"] / 2 ** 20, 3),
+            "recompute_s": round(e["cost"], 3),
+            "priority": e["priority"],
+            "hits": e["hits"],
+            "age_s": round(now - e["created"]),
+            "idle_s": round(now - e["last_used"]),
+            "expires_in_s": round(e["expires"] - now) if e["expires"] is not None else None,
+        } for (loader, key), e in _entries.items()]
+    return sorted(rows, key=lambda row: row["priority"])
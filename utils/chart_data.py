@@ -0,0 +1,179 @@
+# utils/chart_data.py
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from utils.analytics_backend import read_sql
+
+MAX_SCATTER_POINTS = 2000
+MAX_LINE_POINTS = 1000
+
+
+# Chart data reduction (vectorized, no per-row Python work)
+
+def histogram(values, bins=10):
+    """Returns (counts, edges) for values, ignoring NaNs."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    return np.histogram(values, bins=bins)
+
+
+def value_counts(values):
+    """Returns (labels, counts) sorted by count descending, ignoring NaNs."""
+    labels, counts = np.unique(pd.Series(values).dropna().to_numpy(), return_counts=True)
+    order = np.argsort(counts)[::-1]
+    return labels[order], counts[order]
+
+
+def downsample_scatter(x, y, max_points=MAX_SCATTER_POINTS, seed=0):
+    """Keeps a fixed random subset of at most max_points (x, y) pairs."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= max_points:
+        return x, y
+    rng = np.random.default_rng(seed)
+    keep = np.sort(rng.choice(len(x), size=max_points, replace=False))
+    return x[keep], y[keep]
+
+
+def downsample_line(x, y, max_points=MAX_LINE_POINTS):
+    """
+    Reduces a line series to at most max_points by keeping the min and max
+    of each bucket, so peaks and dips survive the downsampling.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max_points:
+        return x, y
+
+    buckets = max_points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lengths = np.diff(edges)
+    bucket_of = np.repeat(np.arange(buckets), lengths)
+
+    # argmin/argmax per bucket via a stable sort on (bucket, value)
+    order = np.lexsort((y, bucket_of))
+    mins = order[starts]
+    maxs = order[starts + lengths - 1]
+    keep = np.unique(np.concatenate([mins, maxs]))
+    return x[keep], y[keep]
+
+
+# Server-side variants: only the binned result leaves the database
+
+def _where(column, conditions):
+    return "WHERE " + " AND ".join(list(conditions or []) + [f"{column} IS NOT NULL"])
+
+
+def sql_value_counts(conn, from_sql, column, conditions=None, params=None):
+    """Counts each value of column over from_sql, e.g. "FROM transactions t"."""
+    query = f"""
+        SELECT {column} AS value, COUNT(*) AS count
+        {from_sql}
+        {_where(column, conditions)}
+        GROUP BY {column}
+        ORDER BY count DESC
+    """
+    return read_sql(query, conn, params)
+
+
+def sql_histogram(conn, from_sql, column, bins=10, conditions=None, params=None):
+    """Returns (counts, edges) for column over from_sql, binned in SQL."""
+    where_sql = _where(column, conditions)
+    bounds = read_sql(f"SELECT MIN({column}) AS lo, MAX({column}) AS hi {from_sql} {where_sql}",
+                      conn, params)
+    lo, hi = bounds["lo"].iloc[0], bounds["hi"].iloc[0]
+    if pd.isna(lo) or pd.isna(hi):
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    lo, hi = float(lo), float(hi)
+    width = (hi - lo) / bins if hi > lo else 1.0
+    # The top edge belongs to the last bin, as in np.histogram
+    query = f"""
+        SELECT LEAST(FLOOR(({column} - %s) / %s), %s) AS bin, COUNT(*) AS count
+        {from_sql}
+        {where_sql}
+        GROUP BY bin
+    """
+    binned = read_sql(query, conn, [lo, width, bins - 1] + list(params or []))
+
+    counts = np.zeros(bins, dtype=np.int64)
+    counts[binned["bin"].astype(np.int64).to_numpy()] = binned["count"].to_numpy()
+    return counts, lo + width * np.arange(bins + 1)
+
+
+# Cached rendering: figures are keyed by their (already reduced) input data
+
+def _to_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_bar(labels, values, title="", figsize=(6, 4), rotation=0, errors=None):
+    """errors: optional (2, n) lower / upper error bar lengths."""
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.bar([str(label) for label in labels], values, yerr=errors, capsize=3 if errors is not None else 0)
+    ax.set_title(title)
+    if rotation:
+        plt.setp(ax.get_xticklabels(), rotation=rotation, ha="right")
+    return _to_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_hist(counts, edges, title="", xlabel="", ylabel="", figsize=(6, 4)):
+    fig, ax = plt.subplots(figsize=figsize)
+    if len(counts):
+        ax.stairs(counts, edges, fill=True)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return _to_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_pie(labels, values, title="", figsize=(6, 4)):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.pie(values, labels=[str(label) for label in labels], autopct="%1.1f%%")
+    ax.set_title(title)
+    return _to_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_scatter(x, y, title="", xlabel="", ylabel="", figsize=(6, 4)):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.scatter(x, y, s=10, alpha=0.6)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return _to_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_lines(x, series, title="", xlabel="", ylabel="", figsize=(10, 4), bands=None):
+    """
+    series is a dict of label -> y values sharing the x axis; bands an
+    optional dict of label -> (low, high) shaded around that series.
+    """
+    fig, ax = plt.subplots(figsize=figsize)
+    for label, y in series.items():
+        line, = ax.plot(x, y, label=label)
+        if bands and label in bands:
+            ax.fill_between(x, *bands[label], color=line.get_color(), alpha=0.2)
+    if len(series) > 1:
+        ax.legend()
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return _to_png(fig)
@@ -2,24 +2,55 @@
 import mysql.connector
 
 import atexit
+import os
+import threading
+
+# Environment variables override the defaults, e.g. to point a benchmark at its own database
+DB_CONFIG = {
+    "host": os.environ.get("AMAZONDB_HOST", "localhost"),
+    "user": os.environ.get("AMAZONDB_USER", "root4782"),
+    "password": os.environ.get("AMAZONDB_PASSWORD", "root@July4782"),
+    "database": os.environ.get("AMAZONDB_DATABASE", "amazondb"),
+}
 
 conn = None
+_thread = threading.local()
 
 
 def get_connection():
     global conn
+    # Worker threads that asked for their own connection never share the global one
+    if getattr(_thread, "dedicated", False):
+        return _thread_connection()
     if conn is None or not conn.is_connected():
         try:
-            conn = mysql.connector.connect(
-                host="localhost",
-                user="root4782",
-                password="root@July4782",
-                database="amazondb"
-            )           
+            conn = mysql.connector.connect(**DB_CONFIG)           
         except mysql.connector.Error as err:
             print(f" Database connection failed: {err}")
             return None
     return conn
+
+
+def dedicate_thread():
+    """Makes get_connection() in the calling thread return a connection of its own."""
+    _thread.dedicated = True
+
+
+def _thread_connection():
+    thread_conn = getattr(_thread, "conn", None)
+    if thread_conn is None or not thread_conn.is_connected():
+        try:
+            thread_conn = mysql.connector.connect(**DB_CONFIG)
+        except mysql.connector.Error as err:
+            print(f" Database connection failed: {err}")
+            return None
+        _thread.conn = thread_conn
+    return thread_conn
+
+
+def new_connection(**options):
+    """A separate connection (not the shared one), with extra connector options."""
+    return mysql.connector.connect(**{**DB_CONFIG, **options})
     
 
 def cleanup_connections():
@@ -0,0 +1,127 @@
+# utils/forecasting.py
+"""
+Batched demand forecasting.
+
+build_demand_matrix() turns transactions into a dense (series x month)
+matrix with one grouped query. Every model below then forecasts all series
+at once with NumPy operations over the series axis, so thousands of SKUs
+cost about the same Python overhead as one.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.analytics_backend import read_sql
+
+SERIES_KEYS = {
+    "product": "t.product_id",
+    "subcategory": "p.subcategory",
+    "category": "p.category",
+}
+MEASURES = {
+    "units": "COUNT(*)",
+    "revenue": "SUM(t.corrected_price)",
+}
+SEASON = 12
+
+
+def build_demand_matrix(conn, level="product", measure="units"):
+    """
+    Returns (matrix, series, months): matrix[i, j] is the demand of series[i]
+    in months[j]. Months without sales are zero, so every row is a complete
+    monthly history.
+    """
+    query = f"""
+        SELECT
+            td.year,
+            td.month,
+            {SERIES_KEYS[level]} AS series,
+            {MEASURES[measure]} AS demand
+        FROM transactions t
+        JOIN time_dimension td ON t.date_key = td.date_key
+        JOIN products p ON t.product_id = p.product_id
+        GROUP BY td.year, td.month, {SERIES_KEYS[level]}
+    """
+    df = read_sql(query, conn)
+    return demand_matrix_from_frame(df)
+
+
+def demand_matrix_from_frame(df):
+    """Pivots long (year, month, series, demand) rows into the dense matrix."""
+    df = df.dropna(subset=["year", "month", "series"])
+    if df.empty:
+        return np.zeros((0, 0)), np.array([], dtype=object), pd.PeriodIndex([], freq="M")
+
+    month_no = df["year"].astype(np.int64).to_numpy() * 12 + df["month"].astype(np.int64).to_numpy() - 1
+    first = month_no.min()
+    n_months = month_no.max() - first + 1
+    codes, series = pd.factorize(df["series"], sort=True)
+
+    matrix = np.zeros((len(series), n_months), dtype=np.float64)
+    matrix[codes, month_no - first] = df["demand"].astype(np.float64).to_numpy()
+
+    months = pd.period_range(
+        pd.Period(year=int(first // 12), month=int(first % 12) + 1, freq="M"),
+        periods=n_months, freq="M"
+    )
+    return matrix, np.asarray(series), months
+
+
+# Models: each takes the (series x months) history and returns (series x horizon)
+
+def moving_average(history, horizon, window=3):
+    level = history[:, -window:].mean(axis=1)
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def exponential_smoothing(history, horizon, alpha=0.3):
+    level = history[:, 0].copy()
+    for t in range(1, history.shape[1]):
+        level += alpha * (history[:, t] - level)
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def seasonal_naive(history, horizon, season=SEASON):
+    if history.shape[1] < season:
+        # Not a full season of history yet: fall back to the last value
+        return np.repeat(history[:, -1:], horizon, axis=1)
+    steps = np.arange(horizon) % season
+    return history[:, -season:][:, steps]
+
+
+MODELS = {
+    "Moving Average (3M)": moving_average,
+    "Exponential Smoothing": exponential_smoothing,
+    "Seasonal Naive": seasonal_naive,
+}
+
+
+def forecast_all(matrix, horizon=3, holdout=3):
+    """
+    Fits every model to every series. Each model is scored on the last
+    holdout months (mean absolute error), then refit on the full history.
+    Returns (forecasts, errors, best): forecasts[model] is (series x horizon),
+    errors is a (series x model) frame and best names the lowest-error model
+    per series.
+    """
+    names = list(MODELS)
+    n_series, n_months = matrix.shape
+    errors = np.full((n_series, len(names)), np.nan)
+
+    if n_months > holdout:
+        train, test = matrix[:, :-holdout], matrix[:, -holdout:]
+        for i, name in enumerate(names):
+            errors[:, i] = np.abs(MODELS[name](train, holdout) - test).mean(axis=1)
+
+    forecasts = {name: MODELS[name](matrix, horizon) for name in names}
+    if n_series and not np.isnan(errors).all():
+        best = np.asarray(names, dtype=object)[np.nanargmin(errors, axis=1)]
+    else:
+        best = np.asarray([names[0]] * n_series, dtype=object)
+    return forecasts, pd.DataFrame(errors, columns=names), best
+
+
+def best_forecasts(forecasts, best):
+    """Per series, the forecast row of its best model."""
+    stacked = np.stack([forecasts[name] for name in MODELS], axis=0)
+    model_idx = pd.Index(list(MODELS)).get_indexer(best)
+    return stacked[model_idx, np.arange(len(best))]
@@ -0,0 +1,117 @@
+# utils/geo_cube.py
+"""
+Geographic / customer-segment cube.
+
+Revenue, transactions and distinct customers over every combination of the
+customer attributes in DIMENSIONS, precomputed by the loader into geo_cube
+with GROUP BY ... WITH ROLLUP:
+
+    grouping_level = 6   one row per (state, city, tier, segment, age, prime)
+    grouping_level = k   subtotals over the first k dimensions
+    grouping_level = 0   the grand total
+
+Every customer falls in exactly one base cell, so distinct customers add up
+across cells like the other measures. Any drilldown or slice is therefore
+answered exactly from the cube (a few thousand rows) without touching
+transactions: hierarchy prefixes straight from their rollup rows, anything
+else by summing base cells.
+"""
+import sys
+
+from utils.analytics_backend import read_sql
+
+DIMENSIONS = ["state", "city", "tier", "customer_segment", "age_range", "is_prime_member"]
+MEASURES = ["revenue", "transactions", "customers"]
+# Stored in place of missing attributes, so NULL only ever means "rolled up"
+MISSING = {"is_prime_member": -1}
+
+
+# Loader maintenance
+
+def refresh_cube(conn):
+    """Rebuilds geo_cube from transactions pre-aggregated per customer."""
+    print("Refreshing geographic cube...")
+    attributes = ",\n".join(
+        f"COALESCE(c.{d}, {MISSING.get(d, repr(''))}) AS {d}" for d in DIMENSIONS
+    )
+    grouping_level = " + ".join(f"(1 - GROUPING({d}))" for d in DIMENSIONS)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM geo_cube")
+    cursor.execute(f"""
+        INSERT INTO geo_cube (grouping_level, {", ".join(DIMENSIONS)}, revenue, transactions, customers)
+        SELECT
+            {grouping_level},
+            {", ".join(DIMENSIONS)},
+            SUM(revenue),
+            SUM(transactions),
+            COUNT(*)
+        FROM (
+            SELECT
+                {attributes},
+                s.revenue,
+                s.transactions
+            FROM (
+                SELECT customer_id, SUM(corrected_price) AS revenue, COUNT(*) AS transactions
+                FROM transactions
+                GROUP BY customer_id
+            ) s
+            JOIN customers c ON s.customer_id = c.customer_id
+        ) per_customer
+        GROUP BY {", ".join(DIMENSIONS)} WITH ROLLUP
+    """)
+    conn.commit()
+    print(f"  -> {cursor.rowcount} cube rows")
+    cursor.close()
+
+
+# Reading
+
+def query_cube(conn=None):
+    df = read_sql(f"""
+        SELECT grouping_level, {", ".join(DIMENSIONS)}, {", ".join(MEASURES)}
+        FROM geo_cube
+    """, conn)
+    df["revenue"] = df["revenue"].astype(float)
+    return df
+
+
+def slice_cube(cube, by=(), filters=None):
+    """
+    Measures grouped by the dimensions in by, over the cells matching
+    filters {dimension: [values]}. Unfiltered prefixes of DIMENSIONS are
+    read from their rollup rows; everything else is summed from base cells.
+    """
+    by = list(by)
+    filters = {d: v for d, v in (filters or {}).items() if v is not None and len(v)}
+    unknown = set(by) | set(filters)
+    unknown -= set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown cube dimensions: {sorted(unknown)}")
+
+    if not filters and by == DIMENSIONS[:len(by)]:
+        rows = cube[cube["grouping_level"] == len(by)]
+        return rows[by + MEASURES].reset_index(drop=True)
+
+    rows = cube[cube["grouping_level"] == len(DIMENSIONS)]
+    for dimension, values in filters.items():
+        rows = rows[rows[dimension].isin(values)]
+    if not by:
+        return rows[MEASURES].sum().to_frame().T
+    return rows.groupby(by, as_index=False)[MEASURES].sum()
+
+
+def dimension_values(cube, dimension):
+    """Distinct values of a dimension, for filter widgets."""
+    level = DIMENSIONS.index(dimension) + 1
+    values = cube.loc[cube["grouping_level"] >= level, dimension].dropna().unique()
+    return sorted(values)
+
+
+if __name__ == "__main__":
+    from utils.db_connection import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    refresh_cube(conn)
+    conn.close()
@@ -0,0 +1,331 @@
+# utils/index_advisor.py
+"""
+Workload-driven index advisor for the MySQL star schema.
+
+The workload is the SQL the pages issue: either a query log written with
+DASHBOARD_QUERY_LOG=queries.jsonl while using the dashboard, or captured by
+rendering every page headless. Each distinct query is EXPLAINed, then the
+advisor reports
+
+  - redundant indexes: a left prefix of (or equal to) another index,
+  - unused indexes: never chosen by the workload (with the server's own
+    read counts from performance_schema when available),
+  - covering indexes for tables the workload scans or reads row by row,
+    with each query's time before and after the index is built (--measure).
+
+Run it against a scratch copy (see benchmarks/synthetic_data.py), since
+--measure builds every proposed index and drops it again unless --apply:
+    python -m utils.index_advisor --workload queries.jsonl --measure
+"""
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils import analytics_backend
+from utils.db_connection import DB_CONFIG, get_connection
+
+# Wider indexes cost more on every load than they save on reads
+MAX_INDEX_COLUMNS = 5
+REPEATS = 3
+
+TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|RIGHT|INNER|GROUP|ORDER|LIMIT)\b)(\w+))?",
+    re.IGNORECASE
+)
+CLAUSE_END = r"(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\)|$)"
+
+
+# Workload
+
+def normalize(sql):
+    return " ".join(sql.split()).rstrip(";").strip()
+
+
+def load_workload(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def capture_workload():
+    """Renders every page headless (Streamlit bare mode) and returns the SQL it issued."""
+    from utils import page_registry, snapshots
+
+    # Query the database rather than published snapshots
+    snapshots.SNAPSHOT_DIR = Path(tempfile.mkdtemp(prefix="index-advisor-"))
+    with analytics_backend.capture_queries() as captured:
+        for name in page_registry.PAGES:
+            try:
+                page_registry.render(name)
+            except Exception as e:
+                print(f"Could not render {name}: {e}")
+    return captured
+
+
+def distinct_queries(entries):
+    """One entry per distinct statement, with how often it ran."""
+    queries = {}
+    for entry in entries:
+        sql = normalize(entry["sql"])
+        if sql not in queries:
+            queries[sql] = {"sql": sql, "params": entry.get("params") or [], "calls": 0}
+        queries[sql]["calls"] += 1
+    return list(queries.values())
+
+
+# Catalog
+
+def index_catalog(conn):
+    """{(table, index): {"columns": [...], "unique": bool}} for the configured schema."""
+    stats = pd.read_sql("""
+        SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name,
+               SEQ_IN_INDEX AS seq, COLUMN_NAME AS column_name, NON_UNIQUE AS non_unique
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """, conn, params=[DB_CONFIG["database"]])
+
+    catalog = {}
+    for (table, index), rows in stats.groupby(["table_name", "index_name"], sort=False):
+        catalog[(table, index)] = {
+            "columns": rows["column_name"].tolist(),
+            "unique": not bool(rows["non_unique"].iloc[0]),
+        }
+    return catalog
+
+
+def primary_key(catalog, table):
+    return catalog.get((table, "PRIMARY"), {"columns": []})["columns"]
+
+
+def redundant_indexes(catalog):
+    """[(table, index, covered_by)] for indexes that are a left prefix of another one."""
+    redundant = []
+    for (table, index), info in catalog.items():
+        if index == "PRIMARY":
+            continue
+        columns = info["columns"]
+        for (other_table, other), other_info in catalog.items():
+            if other_table != table or other == index:
+                continue
+            other_columns = other_info["columns"]
+            if other_columns[:len(columns)] != columns:
+                continue
+            # Of two identical indexes keep the unique one, else the first by name
+            if len(other_columns) == len(columns):
+                if info["unique"] and not other_info["unique"]:
+                    continue
+                if info["unique"] == other_info["unique"] and other != "PRIMARY" and index < other:
+                    continue
+            elif info["unique"]:
+                # A unique index enforces a constraint the longer one does not
+                continue
+            redundant.append((table, index, other))
+            break
+    return redundant
+
+
+def server_index_reads(conn):
+    """{(table, index): rows read} since server start, if performance_schema is enabled."""
+    try:
+        usage = pd.read_sql("""
+            SELECT OBJECT_NAME AS table_name, INDEX_NAME AS index_name, COUNT_READ AS reads
+            FROM performance_schema.table_io_waits_summary_by_index_usage
+            WHERE OBJECT_SCHEMA = %s AND INDEX_NAME IS NOT NULL
+        """, conn, params=[DB_CONFIG["database"]])
+    except Exception as e:
+        print(f"performance_schema index usage not available: {e}")
+        return {}
+    return {(r.table_name, r.index_name): int(r.reads) for r in usage.itertuples(index=False)}
+
+
+# Plans
+
+def table_aliases(sql):
+    """{alias: table} for every table referenced in FROM / JOIN clauses."""
+    return {(alias or table): table for table, alias in TABLE_REF.findall(sql)}
+
+
+def explain(conn, query):
+    plan = pd.read_sql("EXPLAIN " + query["sql"], conn, params=query["params"] or None)
+    plan.columns = [c.lower() for c in plan.columns]
+    return plan
+
+
+def _clause(sql, keyword):
+    match = re.search(rf"\b{keyword}\b(.*?){CLAUSE_END}", sql, re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def _columns(text, alias):
+    return list(dict.fromkeys(re.findall(rf"\b{re.escape(alias)}\.`?(\w+)`?", text)))
+
+
+def covering_columns(sql, alias, pk_columns):
+    """
+    Columns an index on alias needs to answer sql by itself: filtered columns
+    first, then join and grouping columns, then everything else it reads.
+    Primary key columns are left out unless filtered on, because InnoDB
+    appends them to every secondary index.
+    """
+    if re.search(rf"\b{re.escape(alias)}\.\*", sql):
+        return None
+    ordered = []
+    for text in (_clause(sql, "WHERE"),
+                 " ".join(re.findall(r"\bON\b(.*?)(?=\bJOIN\b|\bLEFT\b|\bWHERE\b|\bGROUP\b|$)", sql, re.I)),
+                 _clause(sql, "GROUP BY"),
+                 sql):
+        for column in _columns(text, alias):
+            if column not in ordered:
+                ordered.append(column)
+    filtered = set(_columns(_clause(sql, "WHERE"), alias))
+    return [c for c in ordered if c not in pk_columns or c in filtered]
+
+
+def is_covered(catalog, table, columns):
+    """True if an existing index starts with columns[0] and contains all of columns."""
+    pk = primary_key(catalog, table)
+    for (index_table, index), info in catalog.items():
+        if index_table != table or index == "PRIMARY":
+            continue
+        available = info["columns"] + pk
+        if info["columns"][0] == columns[0] and set(columns) <= set(available):
+            return True
+    return False
+
+
+def analyse(conn, queries, catalog):
+    """EXPLAINs every query; returns (used indexes, {(table, columns): [queries]})."""
+    used = set()
+    proposals = {}
+    for query in queries:
+        try:
+            plan = explain(conn, query)
+        except Exception as e:
+            print(f"Could not EXPLAIN query: {e}\n  {query['sql'][:120]}")
+            continue
+        query["plan"] = plan
+        aliases = table_aliases(query["sql"])
+        for step in plan.itertuples(index=False):
+            table = aliases.get(step.table)
+            if table is None:
+                continue
+            if step.key:
+                used.add((table, step.key))
+
+            reads_rows = step.type == "ALL" or (
+                step.key not in (None, "PRIMARY") and "Using index" not in str(step.extra or "")
+            )
+            if not reads_rows:
+                continue
+            columns = covering_columns(query["sql"], step.table, primary_key(catalog, table))
+            if not columns or len(columns) > MAX_INDEX_COLUMNS or is_covered(catalog, table, columns):
+                continue
+            proposals.setdefault((table, tuple(columns)), []).append(query)
+    return used, proposals
+
+
+# Measurement
+
+def time_query(conn, query, repeats=REPEATS):
+    """Best wall time of running query and fetching all rows."""
+    timings = []
+    for _ in range(repeats):
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        cursor.execute(query["sql"], query["params"] or None)
+        cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+        cursor.close()
+    return min(timings)
+
+
+def index_name(table, columns):
+    return f"idx_cover_{table}_" + "_".join(columns)[:40]
+
+
+def measure_proposal(conn, table, columns, queries, keep=False):
+    """Times queries before and after building the index; drops it again unless keep."""
+    name = index_name(table, columns)
+    before = [time_query(conn, q) for q in queries]
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE INDEX `{name}` ON `{table}` ({', '.join(f'`{c}`' for c in columns)})")
+    try:
+        after = [time_query(conn, q) for q in queries]
+        chosen = [name in set(explain(conn, q)["key"].dropna()) for q in queries]
+    finally:
+        if not keep:
+            cursor.execute(f"DROP INDEX `{name}` ON `{table}`")
+        cursor.close()
+    return pd.DataFrame({
+        "query": [q["sql"][:80] for q in queries],
+        "before_s": before,
+        "after_s": after,
+        "uses_index": chosen,
+    })
+
+
+# Report
+
+def advise(conn, entries, measure=False, apply=False):
+    queries = distinct_queries(entries)
+    catalog = index_catalog(conn)
+    print(f"Analysing {len(queries)} distinct queries against {len(catalog)} indexes...\n")
+
+    used, proposals = analyse(conn, queries, catalog)
+
+    redundant = redundant_indexes(catalog)
+    print("Redundant indexes:")
+    for table, index, covered_by in redundant:
+        print(f"  {table}.{index} is covered by {covered_by}")
+        print(f"    DROP INDEX `{index}` ON `{table}`;")
+    if not redundant:
+        print("  none")
+
+    reads = server_index_reads(conn)
+    redundant_names = {(t, i) for t, i, _ in redundant}
+    unused = [
+        key for key, info in catalog.items()
+        if key[1] != "PRIMARY" and not info["unique"] and key not in used and key not in redundant_names
+    ]
+    print("\nIndexes not used by the workload:")
+    for table, index in unused:
+        server = f", {reads[(table, index)]} reads since server start" if (table, index) in reads else ""
+        print(f"  {table}.{index} ({', '.join(catalog[(table, index)]['columns'])}{server})")
+    if not unused:
+        print("  none")
+
+    print("\nProposed covering indexes:")
+    if not proposals:
+        print("  none")
+    for (table, columns), motivating in proposals.items():
+        print(f"  CREATE INDEX `{index_name(table, columns)}` ON `{table}` ({', '.join(columns)});"
+              f"  -- {len(motivating)} queries")
+        if measure:
+            timings = measure_proposal(conn, table, columns, motivating, keep=apply)
+            for r in timings.itertuples(index=False):
+                print(f"    {r.before_s:8.3f}s -> {r.after_s:8.3f}s  "
+                      f"{'uses index' if r.uses_index else 'index not chosen'}  {r.query}")
+    return redundant, unused, proposals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suggest index changes for the dashboard workload.")
+    parser.add_argument("--workload", help="Query log (JSON lines) written with DASHBOARD_QUERY_LOG. "
+                                           "Without one, every page is rendered headless to capture it.")
+    parser.add_argument("--measure", action="store_true",
+                        help="Build each proposed index and time its queries before and after.")
+    parser.add_argument("--apply", action="store_true", help="With --measure, keep the built indexes.")
+    args = parser.parse_args()
+
+    entries = load_workload(args.workload) if args.workload else capture_workload()
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    advise(conn, entries, measure=args.measure, apply=args.apply)
+    conn.close()
@@ -0,0 +1,30 @@
+# utils/load_runs.py
+from datetime import datetime
+
+import pandas as pd
+
+from utils.analytics_backend import read_sql
+
+
+def record_load_run(conn, transactions_loaded):
+    """Marks a completed Data_Loader.py run; returns the new data version."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO load_runs (finished_at, transactions_loaded) VALUES (%s, %s)",
+        (datetime.now(), int(transactions_loaded))
+    )
+    conn.commit()
+    version = cursor.lastrowid
+    cursor.close()
+    return version
+
+
+def get_data_version(conn):
+    """The load_id of the latest completed load, or 0 before the first one."""
+    try:
+        df = read_sql("SELECT MAX(load_id) AS version FROM load_runs", conn)
+    except Exception as e:
+        print(f"Could not read load_runs: {e}")
+        return 0
+    version = df["version"].iloc[0]
+    return 0 if pd.isna(version) else int(version)
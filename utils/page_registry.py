@@ -0,0 +1,99 @@
+# utils/page_registry.py
+"""
+Lazy page registry for the Streamlit entry points.
+
+Page modules (and the pandas / plotly / matplotlib / millify imports they
+pull in) are only imported the first time a page is shown. warm_up() does
+those imports and fills the page caches on a background thread once per
+server process, so the first visitor does not pay for them.
+"""
+import importlib
+import sys
+import threading
+
+from utils.profiling import timed
+
+PAGES = {
+    "Home": "pages._1_HOME",
+    "Executive Dashboard": "pages._2_Executive_Dashboard",
+    "Revenue Analytics": "pages._3_Revenue_Analytics",
+    "Customer Analytics": "pages._4_Customer_Analytics",
+    "Inventory Analytics": "pages._5_Inventory_Analytics",
+    "Logistics": "pages._6_Logistics",
+    "Advanced Analytics": "pages._7_Advanced_Analytics",
+    "Diagnostics": "pages._8_Diagnostics",
+}
+
+# Cached loaders (without arguments) to fill during warm-up, per page
+WARM_UP_LOADERS = {
+    "Executive Dashboard": [],
+    "Revenue Analytics": ["load_geographic_cube"],
+    "Customer Analytics": ["load_data"],
+    "Inventory Analytics": ["load_data"],
+    "Logistics": ["load_years", "load_states", "load_ops_summary", "load_status_counts",
+                  "load_payment_counts", "load_rating_histogram"],
+    "Advanced Analytics": ["load_kpis", "load_delivery", "load_payments", "load_satisfaction", "load_alert_state"],
+}
+
+HEAVY_MODULES = ["pandas", "numpy", "plotly.express", "matplotlib.pyplot", "millify", "pyarrow"]
+
+_import_lock = threading.Lock()
+# Modules whose import has finished: a module is in sys.modules while it is
+# still executing, so sys.modules alone would hand out half-initialized pages
+_imported = set()
+
+
+def load_page(name):
+    """Imports the page module on first use, recording the import time."""
+    module_name = PAGES[name]
+    if module_name in _imported:
+        return sys.modules[module_name]
+    with _import_lock:
+        if module_name not in _imported:
+            with timed(name, "import"):
+                importlib.import_module(module_name)
+            _imported.add(module_name)
+    return sys.modules[module_name]
+
+
+def render(name):
+    module = load_page(name)
+    # Leaving a page cancels its background queries; if utils.progressive was
+    # never imported, no page has any
+    progressive = sys.modules.get("utils.progressive")
+    if progressive is not None:
+        progressive.enter_page(name)
+    with timed(name, "render"):
+        module.app()
+
+
+def warm_up(prefill=True):
+    """Pre-imports heavy modules and pages, then fills their caches."""
+    from utils.db_connection import dedicate_thread
+
+    # The warm-up runs next to page scripts, so it must not share their connection
+    dedicate_thread()
+    for module_name in HEAVY_MODULES:
+        try:
+            with timed("warm-up", f"import {module_name}"):
+                importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Warm-up could not import {module_name}: {e}")
+
+    for name in PAGES:
+        try:
+            module = load_page(name)
+            if not prefill:
+                continue
+            for loader in WARM_UP_LOADERS.get(name, []):
+                with timed(name, f"warm-up {loader}"):
+                    getattr(module, loader)()
+        except Exception as e:
+            print(f"Warm-up failed for {name}: {e}")
+
+
+def start_warm_up(prefill=True):
+    thread = threading.Thread(target=warm_up, kwargs={"prefill": prefill},
+                              name="dashboard-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,137 @@
+# utils/paginated_table.py
+import math
+
+import streamlit as st
+
+from utils import cache_manager
+from utils.analytics_backend import read_sql
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def build_where(filters):
+    """Builds a parameterized WHERE clause from {column: [values]} filters."""
+    clauses = []
+    params = []
+    for column, values in (filters or {}).items():
+        if values is None or len(values) == 0:
+            continue
+        placeholders = ", ".join(["%s"] * len(values))
+        clauses.append(f"q.`{column}` IN ({placeholders})")
+        params.extend(values)
+
+    if not clauses:
+        return "", []
+    return "WHERE " + " AND ".join(clauses), params
+
+
+@cache_manager.cached(ttl=600)
+def fetch_total_count(base_query, filters=None):
+    """Counts the rows of base_query once per filter combination."""
+    where_sql, params = build_where(filters)
+    count_query = f"SELECT COUNT(*) AS total FROM ({base_query}) q {where_sql}"
+    df = read_sql(count_query, params=params)
+    return int(df["total"].iloc[0]) if not df.empty else 0
+
+
+@cache_manager.cached(ttl=600)
+def fetch_page(base_query, columns, page=1, page_size=DEFAULT_PAGE_SIZE,
+               sort_by=None, ascending=True, filters=None, key_column=None):
+    """
+    Fetches a single page of base_query from the server.
+
+    Sorting and filtering are applied in SQL on top of base_query, so only
+    page_size rows are ever transferred. Column names are checked against
+    columns because they cannot be bound as query parameters. Rows are
+    ordered by key_column (default: the first column) after sort_by, so ties
+    cannot move rows between pages. Pages are cached like the row count.
+    """
+    key_column = key_column or columns[0]
+    for column in list((filters or {}).keys()) + [c for c in (sort_by, key_column) if c]:
+        if column not in columns:
+            raise ValueError(f"Unknown column for paginated table: {column}")
+
+    where_sql, params = build_where(filters)
+    order = [f"q.`{sort_by}` {'ASC' if ascending else 'DESC'}"] if sort_by and sort_by != key_column else []
+    order.append(f"q.`{key_column}` {'DESC' if sort_by == key_column and not ascending else 'ASC'}")
+    order_sql = "ORDER BY " + ", ".join(order)
+    offset = max(page - 1, 0) * page_size
+
+    page_query = f"""
+        SELECT * FROM ({base_query}) q
+        {where_sql}
+        {order_sql}
+        LIMIT %s OFFSET %s
+    """
+    return read_sql(page_query, params=params + [page_size, offset])
+
+
+def _page_controls(key, columns, total, page_size, default_sort, default_ascending):
+    """Sort column, order and page widgets; returns (sort_by, ascending, page)."""
+    total_pages = max(math.ceil(total / page_size), 1)
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    sort_by = col1.selectbox(
+        "Sort by", columns,
+        index=columns.index(default_sort) if default_sort in columns else 0,
+        key=f"{key}_sort"
+    )
+    ascending = col2.selectbox(
+        "Order", ["Descending", "Ascending"],
+        index=1 if default_ascending else 0,
+        key=f"{key}_order"
+    ) == "Ascending"
+    page = col3.number_input(
+        f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, step=1,
+        key=f"{key}_page"
+    )
+    return sort_by, ascending, int(page)
+
+
+def _show_page(page_df, page, page_size, total):
+    st.dataframe(page_df, use_container_width=True)
+    if total:
+        first_row = (page - 1) * page_size + 1
+        st.caption(f"Showing rows {first_row:,}–{first_row + len(page_df) - 1:,} of {total:,}")
+    else:
+        st.caption("No rows found.")
+
+
+def paginated_table(key, base_query, columns, filters=None, page_size=DEFAULT_PAGE_SIZE,
+                    default_sort=None, default_ascending=False, transform=None, key_column=None):
+    """
+    Renders base_query as a server-side paginated table.
+
+    Only the visible page is fetched. Sorting is chosen by the user and
+    pushed to SQL together with the caller's filters, with key_column
+    (default: the first column) as the tiebreaker. transform, if given,
+    is applied to the fetched page before it is displayed.
+    """
+    total = fetch_total_count(base_query, filters)
+    sort_by, ascending, page = _page_controls(key, columns, total, page_size, default_sort, default_ascending)
+
+    page_df = fetch_page(base_query, columns, page=page, page_size=page_size,
+                         sort_by=sort_by, ascending=ascending, filters=filters, key_column=key_column)
+
+    if transform is not None and not page_df.empty:
+        page_df = transform(page_df)
+
+    _show_page(page_df, page, page_size, total)
+    return page_df
+
+
+def paginated_frame(key, df, page_size=DEFAULT_PAGE_SIZE, default_sort=None, default_ascending=False):
+    """
+    Renders an in-memory DataFrame one page at a time, with the same
+    controls as paginated_table(). The sort is stable, so rows that tie
+    keep their order in df.
+    """
+    columns = list(df.columns)
+    sort_by, ascending, page = _page_controls(key, columns, len(df), page_size, default_sort, default_ascending)
+
+    ordered = df.sort_values(sort_by, ascending=ascending, kind="mergesort")
+    offset = (page - 1) * page_size
+    page_df = ordered.iloc[offset:offset + page_size]
+
+    _show_page(page_df, page, page_size, len(df))
+    return page_df
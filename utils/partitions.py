@@ -0,0 +1,88 @@
+# utils/partitions.py
+"""
+Helpers for the year-partitioned transactions table.
+
+transactions is RANGE COLUMNS partitioned on date_key with one partition per
+year (p2015, p2016, ...) and a catch-all pmax. Queries that filter on a
+date_key range read only the partitions of that range, so pages should use
+year_bounds() instead of joining time_dimension to filter by year.
+"""
+from datetime import date
+
+import pandas as pd
+
+TABLE = "transactions"
+
+
+def year_bounds(year):
+    """Half-open date_key range [start, end) of a calendar year."""
+    return date(int(year), 1, 1), date(int(year) + 1, 1, 1)
+
+
+def partition_name(year):
+    return f"p{int(year)}"
+
+
+def existing_year_partitions(conn):
+    """Years that currently have their own partition."""
+    df = pd.read_sql("""
+        SELECT PARTITION_NAME AS name
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+    """, conn, params=[TABLE])
+    return sorted(int(name[1:]) for name in df["name"] if name != "pmax")
+
+
+def ensure_year_partitions(conn, years):
+    """
+    Splits pmax so every year in years after the last existing partition gets
+    its own partition. Years before the first partition stay in it.
+    """
+    existing = existing_year_partitions(conn)
+    if not existing:
+        print(f"WARNING: {TABLE} is not partitioned; skipping partition maintenance.")
+        return
+
+    missing = sorted(y for y in set(int(y) for y in years) if y > existing[-1])
+    if not missing:
+        return
+
+    # Fill gaps too, so each partition still covers exactly one year
+    new_years = range(existing[-1] + 1, missing[-1] + 1)
+    parts = ",\n".join(
+        f"PARTITION {partition_name(y)} VALUES LESS THAN ('{year_bounds(y)[1]:%Y-%m-%d}')"
+        for y in new_years
+    )
+    cursor = conn.cursor()
+    print(f"Adding {TABLE} partitions for {new_years[0]}-{new_years[-1]}...")
+    cursor.execute(f"""
+        ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO (
+            {parts},
+            PARTITION pmax VALUES LESS THAN (MAXVALUE)
+        )
+    """)
+    cursor.close()
+
+
+def report_orphans(conn, date_from, date_to):
+    """
+    Partitioned tables cannot carry foreign keys, so the loader checks the
+    references of the rows it loaded instead. Returns the orphan counts.
+    """
+    df = pd.read_sql("""
+        SELECT
+            SUM(td.date_key IS NULL) AS missing_dates,
+            SUM(c.customer_id IS NULL) AS missing_customers,
+            SUM(p.product_id IS NULL) AS missing_products
+        FROM transactions t
+        LEFT JOIN time_dimension td ON t.date_key = td.date_key
+        LEFT JOIN customers c ON t.customer_id = c.customer_id
+        LEFT JOIN products p ON t.product_id = p.product_id
+        WHERE t.date_key >= %s AND t.date_key < %s
+    """, conn, params=[date_from, date_to])
+
+    orphans = {column: int(df[column].iloc[0] or 0) for column in df.columns}
+    for column, count in orphans.items():
+        if count:
+            print(f"WARNING: {count} transactions between {date_from} and {date_to} have {column.replace('_', ' ')}.")
+    return orphans
@@ -0,0 +1,237 @@
+# utils/period_kpis.py
+"""
+Period-over-period KPIs in one scan.
+
+A period is a label plus filters on time_dimension attributes and/or a
+date_key range, e.g.
+
+    period("2025 YTD", date_from=date(2025, 1, 1), date_to=date(2025, 6, 1))
+    period("Festival days", year=2025, festival=True)
+
+compute_kpis() returns revenue, orders, distinct customers and AOV for any
+set of periods with a single parameterized query: every period becomes a
+CASE condition of a conditional aggregate, and the scan is limited to rows
+in at least one of them. Distinct customers of plain date ranges are merged
+from the customer sketches (utils/sketches.py) instead of a COUNT(DISTINCT).
+Results are cached per period and data version, so a page asking for two
+comparisons only scans the periods it has not seen since the last load.
+
+comparison_periods() builds the standard comparisons relative to the
+latest loaded day rather than today, so year-to-date figures do not go
+empty on 1 January or when loads lag behind.
+"""
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from utils import sketches
+from utils.analytics_backend import read_sql
+from utils.load_runs import get_data_version
+from utils.partitions import year_bounds
+
+ATTRIBUTES = {
+    "year": "td.year",
+    "quarter": "td.quarter",
+    "month": "td.month",
+    "festival_name": "td.festival_name",
+    "is_weekend": "td.is_weekend",
+}
+NO_FESTIVAL = "No Festival"
+MAX_CACHED_PERIODS = 512
+
+COMPARISONS = [
+    "Year to date vs last year",
+    "Quarter to date vs previous quarter",
+    "Month to date vs previous month",
+    "Month to date vs same month last year",
+    "Festival vs non-festival days (year to date)",
+]
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def period(label, **filters):
+    """
+    A period to compute KPIs for. Filters are time_dimension attributes
+    (a value or a list of values), festival=True/False, and a half-open
+    date_from / date_to range on date_key.
+    """
+    unknown = set(filters) - set(ATTRIBUTES) - {"festival", "date_from", "date_to"}
+    if unknown:
+        raise ValueError(f"Unknown period filters: {sorted(unknown)}")
+    return {"label": label, "filters": filters}
+
+
+def period_key(p):
+    return tuple(sorted(
+        (k, tuple(v) if isinstance(v, (list, tuple)) else v) for k, v in p["filters"].items()
+    ))
+
+
+def _condition(p):
+    """SQL condition and params selecting the rows of period p."""
+    filters = p["filters"]
+    clauses, params = [], []
+    for key, column in ATTRIBUTES.items():
+        if key not in filters:
+            continue
+        value = filters[key]
+        if isinstance(value, (list, tuple)):
+            clauses.append(f"{column} IN ({', '.join(['%s'] * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+    if "festival" in filters:
+        clauses.append(f"COALESCE(td.festival_name, %s) {'<>' if filters['festival'] else '='} %s")
+        params.extend([NO_FESTIVAL, NO_FESTIVAL])
+
+    date_from, date_to = filters.get("date_from"), filters.get("date_to")
+    if date_from is None and date_to is None and isinstance(filters.get("year"), int):
+        # Bound year periods on date_key too, so only their partitions are read
+        date_from, date_to = year_bounds(filters["year"])
+    if date_from is not None:
+        clauses.append("t.date_key >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        clauses.append("t.date_key < %s")
+        params.append(date_to)
+    return " AND ".join(clauses) or "1 = 1", params
+
+
+def _sketch_customers(conn, p):
+    """
+    Distinct customers of a period filtered on dates only, merged from the
+    customer sketches; None for other periods or when no sketch rows exist.
+    """
+    filters = p["filters"]
+    if set(filters) != {"date_from", "date_to"}:
+        return None
+    try:
+        rows = sketches.load_sketch_rows(conn, filters["date_from"], filters["date_to"])
+    except Exception as e:
+        print(f"Could not read customer sketches: {e}")
+        return None
+    if rows.empty:
+        return None
+    return int(round(sketches.count_distinct(rows)))
+
+
+def _scan(conn, periods):
+    """KPIs of every period in one grouped scan; {period_key: {metric: value}}."""
+    conditions = [_condition(p) for p in periods]
+    sketched = [_sketch_customers(conn, p) for p in periods]
+    select, select_params = [], []
+    for i, (condition, params) in enumerate(conditions):
+        select.append(f"""
+            SUM(CASE WHEN {condition} THEN t.corrected_price END) AS revenue_{i},
+            COUNT(CASE WHEN {condition} THEN 1 END) AS orders_{i}""")
+        select_params.extend(params * 2)
+        if sketched[i] is None:
+            select.append(f"""
+            COUNT(DISTINCT CASE WHEN {condition} THEN t.customer_id END) AS customers_{i}""")
+            select_params.extend(params)
+
+    query = f"""
+        SELECT {",".join(select)}
+        FROM transactions t
+        JOIN time_dimension td ON t.date_key = td.date_key
+        WHERE {" OR ".join(f"({condition})" for condition, _ in conditions)}
+    """
+    where_params = [param for _, params in conditions for param in params]
+    row = read_sql(query, conn, select_params + where_params).iloc[0]
+
+    results = {}
+    for i, p in enumerate(periods):
+        revenue = 0.0 if pd.isna(row[f"revenue_{i}"]) else float(row[f"revenue_{i}"])
+        orders = int(row[f"orders_{i}"])
+        results[period_key(p)] = {
+            "revenue": revenue,
+            "orders": orders,
+            "customers": sketched[i] if sketched[i] is not None else int(row[f"customers_{i}"]),
+            "aov": revenue / orders if orders else None,
+        }
+    return results
+
+
+def compute_kpis(conn, periods):
+    """One row per period (in order) with revenue, orders, customers and aov."""
+    version = get_data_version(conn)
+    # Cached periods are copied out here: another call may clear the cache before we are done
+    with _cache_lock:
+        known = {period_key(p): _cache[(version, period_key(p))]
+                 for p in periods if (version, period_key(p)) in _cache}
+    missing = [p for p in periods if period_key(p) not in known]
+
+    if missing:
+        # Dedupe, so the same filters under two labels are scanned once
+        unique = list({period_key(p): p for p in missing}.values())
+        scanned = _scan(conn, unique)
+        with _cache_lock:
+            if len(_cache) + len(scanned) > MAX_CACHED_PERIODS:
+                _cache.clear()
+            for key, kpis in scanned.items():
+                _cache[(version, key)] = kpis
+        known.update(scanned)
+
+    rows = [{"period": p["label"], **known[period_key(p)]} for p in periods]
+    return pd.DataFrame(rows).set_index("period")
+
+
+def compare(kpis, current, previous):
+    """{metric: (current value, previous value, growth)} between two labelled periods."""
+    out = {}
+    for metric in ["revenue", "orders", "customers", "aov"]:
+        cur, prev = kpis.loc[current, metric], kpis.loc[previous, metric]
+        growth = (cur - prev) / prev if cur is not None and prev else None
+        out[metric] = (cur, prev, growth)
+    return out
+
+
+# Standard comparisons
+
+def latest_data_date(conn):
+    """The last day with transactions, or None before the first load."""
+    df = read_sql("SELECT MAX(date_key) AS as_of FROM transactions", conn)
+    as_of = df["as_of"].iloc[0]
+    return None if pd.isna(as_of) else pd.Timestamp(as_of).date()
+
+
+def _add_months(d, months):
+    """d moved by whole months, clamped to the end of shorter months."""
+    month_no = d.year * 12 + d.month - 1 + months
+    year, month = divmod(month_no, 12)
+    next_month = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    return date(year, month + 1, min(d.day, (next_month - timedelta(days=1)).day))
+
+
+def _to_date(label, start, as_of, months_back, previous_label):
+    """[start, as_of] and the window of the same length months_back earlier."""
+    previous_start = _add_months(start, -months_back)
+    previous_end = min(_add_months(as_of, -months_back) + timedelta(days=1), start)
+    return (
+        period(label, date_from=start, date_to=as_of + timedelta(days=1)),
+        period(previous_label, date_from=previous_start, date_to=previous_end),
+    )
+
+
+def comparison_periods(name, as_of):
+    """(current, previous) periods of a named comparison, ending on as_of."""
+    year_start = date(as_of.year, 1, 1)
+    quarter_start = date(as_of.year, 3 * ((as_of.month - 1) // 3) + 1, 1)
+    month_start = as_of.replace(day=1)
+
+    if name == "Year to date vs last year":
+        return _to_date(f"{as_of.year} YTD", year_start, as_of, 12, f"{as_of.year - 1} YTD")
+    if name == "Quarter to date vs previous quarter":
+        return _to_date("Quarter to date", quarter_start, as_of, 3, "Previous quarter")
+    if name == "Month to date vs previous month":
+        return _to_date("Month to date", month_start, as_of, 1, "Previous month")
+    if name == "Month to date vs same month last year":
+        return _to_date("Month to date", month_start, as_of, 12, "Same month last year")
+    if name == "Festival vs non-festival days (year to date)":
+        ytd = {"date_from": year_start, "date_to": as_of + timedelta(days=1)}
+        return period("Festival days", festival=True, **ytd), period("Other days", festival=False, **ytd)
+    raise ValueError(f"Unknown comparison: {name}")
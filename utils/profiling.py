@@ -0,0 +1,58 @@
+# utils/profiling.py
+"""
+Lightweight timing for dashboard start-up and reruns.
+
+Timings are kept per process as (page, phase) -> recent durations, where
+phase is e.g. "import", "render" or "script". Set DASHBOARD_PROFILE=1 to
+also print every measurement to the server log.
+"""
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+MAX_SAMPLES = 200
+PROCESS_START = time.perf_counter()
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+
+def record(page, phase, seconds):
+    with _lock:
+        _samples[(page, phase)].append(seconds)
+    if os.environ.get("DASHBOARD_PROFILE"):
+        print(f"[profile] {page} {phase}: {seconds * 1000:.1f} ms")
+
+
+@contextmanager
+def timed(page, phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(page, phase, time.perf_counter() - start)
+
+
+def summary():
+    """One row per (page, phase): count, last, mean, p95 and max in milliseconds."""
+    with _lock:
+        items = [(key, [v * 1000 for v in values]) for key, values in _samples.items()]
+    rows = []
+    for (page, phase), ms in items:
+        ordered = sorted(ms)
+        rows.append({
+            "page": page,
+            "phase": phase,
+            "count": len(ms),
+            "last_ms": round(ms[-1], 1),
+            "mean_ms": round(sum(ms) / len(ms), 1),
+            "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 1),
+            "max_ms": round(ordered[-1], 1),
+        })
+    return sorted(rows, key=lambda row: (row["page"], row["phase"]))
+
+
+def uptime():
+    return time.perf_counter() - PROCESS_START
@@ -0,0 +1,174 @@
+# utils/progressive.py
+"""
+Progressive page rendering.
+
+A page declares its data dependencies as cheap or expensive. Cheap ones
+(a few aggregates for the headline metrics) run inline and render first;
+expensive ones (the scans behind the charts) are submitted to a shared
+thread pool as soon as the page starts, and their sections fill reserved
+placeholders as they finish:
+
+    run = progressive.start("Logistics", year, state)
+    run.submit("status", load_status_counts, year, state)   # starts in the background
+    summary = load_ops_summary(year, state)                 # cheap, shown immediately
+    pending = progressive.reserve(run, [("status", "delivery status", render_status), ...])
+    st.metric("Return Rate (%)", summary["return_rate"])    # cheap, below the placeholders
+    progressive.fill(run, pending)                          # sections appear as data arrives
+
+Each session has at most one run. Starting a run for other filters, or
+navigating to another page (enter_page), cancels the previous one: its
+queued work is dropped and its running queries are interrupted (see
+QueryGroup in utils/analytics_backend.py). Workers use their own database
+connections, never the process-wide one.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from utils.analytics_backend import QueryCancelled, QueryGroup, query_group
+from utils.db_connection import dedicate_thread
+from utils.profiling import record
+
+MAX_WORKERS = int(os.environ.get("DASHBOARD_QUERY_WORKERS", 4))
+# How often a waiting page refreshes its placeholders, which also lets
+# Streamlit stop the script as soon as the user changes something
+POLL_SECONDS = 0.25
+RUN_KEY = "_progressive_run"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dashboard-query")
+
+
+class Run:
+    """The background work of one page render for one set of filters."""
+
+    def __init__(self, key):
+        self.key = key
+        self.started = time.perf_counter()
+        self.futures = {}
+        self.queries = QueryGroup()
+        self._first_metric = False
+
+    @property
+    def page(self):
+        return self.key[0]
+
+    @property
+    def cancelled(self):
+        return self.queries.cancelled
+
+    def submit(self, name, fn, *args):
+        """Starts an expensive dependency in the background (once per run)."""
+        if name not in self.futures:
+            self.futures[name] = _executor.submit(_work, self, name, fn, args)
+        return self.futures[name]
+
+    def result(self, name):
+        return self.futures[name].result()
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def cancel(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.queries.cancel()
+
+    def first_metric(self):
+        """Records the time to the page's first metric, once per run."""
+        if not self._first_metric:
+            self._first_metric = True
+            record(self.page, "first metric", time.perf_counter() - self.started)
+
+
+def _work(run, name, fn, args):
+    # Like the warm-up thread, workers call the cached loaders without a
+    # script context: they share the cache but never draw on the page
+    dedicate_thread()
+    start = time.perf_counter()
+    try:
+        with query_group(run.queries):
+            if run.cancelled:
+                raise QueryCancelled()
+            return fn(*args)
+    finally:
+        record(run.page, f"background {name}", time.perf_counter() - start)
+
+
+def start(page, *filters):
+    """
+    The session's run for page and filters. A run still in flight for the
+    same page and filters is reused; any other one is cancelled.
+    """
+    key = (page, *filters)
+    current = st.session_state.get(RUN_KEY)
+    if current is not None and current.key == key and not current.cancelled and not current.done():
+        return current
+    if current is not None:
+        current.cancel()
+    run = Run(key)
+    st.session_state[RUN_KEY] = run
+    return run
+
+
+def enter_page(page):
+    """Called on navigation: cancels the session's run if it belongs to another page."""
+    current = st.session_state.get(RUN_KEY)
+    if current is not None and current.page != page:
+        current.cancel()
+        del st.session_state[RUN_KEY]
+
+
+def cancel():
+    """Cancels the session's run, e.g. when the page switches to a view without background work."""
+    current = st.session_state.get(RUN_KEY)
+    if current is not None:
+        current.cancel()
+        del st.session_state[RUN_KEY]
+
+
+def reserve(run, sections, pending=None):
+    """
+    sections: [(dependency, label, render)] in page order. Reserves a
+    placeholder per section where the page is now; fill() renders into them.
+    Pass the result of an earlier reserve() as pending to add sections
+    further down the page to it.
+    """
+    pending = {} if pending is None else pending
+    for name, label, render in sections:
+        placeholder = st.empty()
+        placeholder.info(f"Loading {label}...")
+        pending.setdefault(run.futures[name], []).append((placeholder, label, render))
+    return pending
+
+
+def fill(run, pending):
+    """
+    Calls each reserved section's render(result) inside its placeholder as
+    soon as its dependency finishes, whatever the order they finish in.
+    """
+    pending = dict(pending)
+    while pending:
+        done, _ = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            for placeholder, label, render in pending.pop(future):
+                _render(placeholder, future, label, render)
+        elapsed = time.perf_counter() - run.started
+        for entries in pending.values():
+            for placeholder, label, _ in entries:
+                placeholder.info(f"Loading {label}... {elapsed:.0f}s")
+
+
+def _render(placeholder, future, label, render):
+    try:
+        result = future.result()
+    except (QueryCancelled, CancelledError):
+        placeholder.warning(f"Loading {label} was cancelled.")
+        return
+    except Exception as e:
+        print(f"Could not load {label}: {e}")
+        placeholder.error(f"Could not load {label}.")
+        return
+    with placeholder.container():
+        render(result)
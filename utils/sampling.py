@@ -0,0 +1,306 @@
+# utils/sampling.py
+"""
+Stratified sample of transactions for approximate exploration.
+
+The loader redraws transactions_sample after every load. Strata are
+(year, state, subcategory); each stratum is sampled at the same rate
+(about TARGET_ROWS rows overall) but never fewer than MIN_STRATUM_ROWS
+rows, so small states and subcategories are still represented. Rows are
+picked by a seeded hash of transaction_id, i.e. a simple random sample
+within every stratum that stays stable between loads.
+
+Estimates weight each sampled row by N_h / n_h (stratum rows / sampled
+rows) and come with a normal-approximation confidence interval:
+
+    totals    sum over strata of N_h / n_h * sample sum
+    means     ratio of two totals, variance by linearization
+
+Filtering the sample on the STRATA columns is safe; any other restriction
+(category, payment method, ...) must be passed as domain=, so every
+stratum keeps its full sample size in the variance.
+"""
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import cache_manager, snapshots
+from utils.analytics_backend import read_frame
+
+STRATA = ["year", "state", "subcategory"]
+TARGET_ROWS = 500_000
+MIN_STRATUM_ROWS = 30
+SEED = 0
+# Hash buckets: a row is sampled if its bucket is below the stratum's threshold
+BUCKETS = 1_000_000
+Z = 1.96                                  # 95% confidence
+
+NO_FESTIVAL = "No Festival"
+
+
+# Loader maintenance
+
+def refresh_sample(conn, target_rows=TARGET_ROWS, min_rows=MIN_STRATUM_ROWS, seed=SEED):
+    """Recounts the strata and redraws transactions_sample from them."""
+    print("Refreshing stratified transactions sample...")
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM transactions")
+    total = cursor.fetchone()[0]
+    rate = min(1.0, target_rows / total) if total else 1.0
+
+    stratum = """
+        COALESCE(td.year, YEAR(t.date_key)) AS year,
+        COALESCE(c.state, '') AS state,
+        COALESCE(p.subcategory, '') AS subcategory"""
+    joins = """
+        FROM transactions t
+        JOIN time_dimension td ON t.date_key = td.date_key
+        LEFT JOIN customers c ON t.customer_id = c.customer_id
+        LEFT JOIN products p ON t.product_id = p.product_id"""
+
+    cursor.execute("DELETE FROM transactions_sample")
+    cursor.execute("DELETE FROM sample_strata")
+    cursor.execute(f"""
+        INSERT INTO sample_strata (year, state, subcategory, stratum_rows, threshold)
+        SELECT year, state, subcategory, COUNT(*),
+               CEIL(%s * LEAST(1, GREATEST(%s, %s / COUNT(*))))
+        FROM (SELECT {stratum} {joins}) strata
+        GROUP BY year, state, subcategory
+    """, (BUCKETS, rate, min_rows))
+
+    cursor.execute(f"""
+        INSERT INTO transactions_sample (
+            transaction_id, date_key, year, month, festival_name, state, category, subcategory,
+            corrected_price, delivery_days, payment_method, return_status, customer_rating
+        )
+        SELECT
+            t.transaction_id, t.date_key, s.year, td.month, td.festival_name, s.state,
+            p.category, s.subcategory, t.corrected_price, t.delivery_days, t.payment_method,
+            t.return_status, t.customer_rating
+        {joins}
+        JOIN sample_strata s
+          ON s.year = COALESCE(td.year, YEAR(t.date_key))
+         AND s.state = COALESCE(c.state, '')
+         AND s.subcategory = COALESCE(p.subcategory, '')
+        WHERE MOD(CRC32(CONCAT(%s, ':', t.transaction_id)), %s) < s.threshold
+    """, (str(seed), BUCKETS))
+    sampled = cursor.rowcount
+
+    cursor.execute("""
+        UPDATE sample_strata s
+        JOIN (
+            SELECT year, state, subcategory, COUNT(*) AS sample_rows
+            FROM transactions_sample
+            GROUP BY year, state, subcategory
+        ) x ON s.year = x.year AND s.state = x.state AND s.subcategory = x.subcategory
+        SET s.sample_rows = x.sample_rows
+    """)
+    conn.commit()
+    print(f"  -> {sampled} of {total} transactions sampled")
+    cursor.close()
+
+
+def draw_sample(frame, target_rows=TARGET_ROWS, min_rows=MIN_STRATUM_ROWS, seed=SEED):
+    """
+    The same design applied to an in-memory frame with transaction_id and
+    the STRATA columns, as refresh_sample() would draw it from the database.
+    """
+    strata = frame.groupby(STRATA, observed=True, sort=False)
+    stratum_rows = strata["transaction_id"].transform("size").to_numpy()
+    rate = min(1.0, target_rows / len(frame)) if len(frame) else 1.0
+    threshold = np.ceil(BUCKETS * np.minimum(1, np.maximum(rate, min_rows / stratum_rows)))
+    buckets = np.fromiter(
+        (zlib.crc32(f"{seed}:{t}".encode()) % BUCKETS for t in frame["transaction_id"]),
+        dtype=np.int64, count=len(frame)
+    )
+    sample = frame[buckets < threshold].copy()
+    sample["stratum_rows"] = stratum_rows[buckets < threshold]
+    return _with_stratum(sample)
+
+
+# Reading
+
+def _with_stratum(sample):
+    sample["stratum"] = sample.groupby(STRATA, observed=True, sort=False).ngroup().to_numpy()
+    return sample.reset_index(drop=True)
+
+
+def query_sample():
+    df = read_frame("""
+        SELECT
+            ts.transaction_id, ts.date_key, ts.year, ts.month, ts.festival_name, ts.state,
+            ts.category, ts.subcategory, ts.corrected_price, ts.delivery_days,
+            ts.payment_method, ts.return_status, ts.customer_rating, s.stratum_rows
+        FROM transactions_sample ts
+        JOIN sample_strata s
+          ON ts.year = s.year AND ts.state = s.state AND ts.subcategory = s.subcategory
+    """, label="transactions sample")
+    return _with_stratum(df)
+
+
+@cache_manager.cached(show_spinner="Loading sample...")
+def load_sample(data_version):
+    # data_version is only part of the cache key: the sample is redrawn by each load
+    df = snapshots.read_snapshot("transactions_sample")
+    return df if df is not None else query_sample()
+
+
+# Estimation
+
+def _estimate(sample, y, by, domain, ratio):
+    by = [by] if isinstance(by, str) else list(by or [])
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    if domain is not None:
+        keep &= np.asarray(domain, dtype=bool)
+
+    # Sample and population size of every stratum, over the whole sample
+    strata = pd.DataFrame({"stratum": sample["stratum"].to_numpy(),
+                           "N": sample["stratum_rows"].to_numpy(dtype=np.float64)})
+    strata = strata.groupby("stratum").agg(n=("N", "size"), N=("N", "first"))
+
+    cells = sample.loc[keep, by].reset_index(drop=True) if by else pd.DataFrame(index=range(keep.sum()))
+    group = by or ["all"]
+    if not by:
+        cells["all"] = 0
+    cells["stratum"] = sample["stratum"].to_numpy()[keep]
+    cells["y"] = y[keep]
+    cells["y2"] = y[keep] ** 2
+    cells = cells.groupby(group + ["stratum"], observed=True).agg(
+        c=("y", "size"), s=("y", "sum"), q=("y2", "sum")
+    ).reset_index().join(strata, on="stratum")
+
+    weight = cells["N"] / cells["n"]
+    cells["count"] = weight * cells["c"]
+    cells["total"] = weight * cells["s"]
+    groups = cells.groupby(group, observed=True)[["count", "total", "c"]].sum()
+
+    if ratio:
+        # Linearized residuals (y - R) / D, with R the group's mean and D its estimated rows
+        cells = cells.join(pd.DataFrame({"R": groups["total"] / groups["count"], "D": groups["count"]}), on=group)
+        sum_z = (cells["s"] - cells["R"] * cells["c"]) / cells["D"]
+        sum_z2 = (cells["q"] - 2 * cells["R"] * cells["s"] + cells["R"] ** 2 * cells["c"]) / cells["D"] ** 2
+        estimate = groups["total"] / groups["count"]
+    else:
+        sum_z, sum_z2 = cells["s"], cells["q"]
+        estimate = groups["total"]
+
+    n, N = cells["n"], cells["N"]
+    within = np.where(n > 1, (sum_z2 - sum_z ** 2 / n) / (n - 1).clip(lower=1), 0.0)
+    cells["variance"] = N ** 2 * (1 - n / N) / n * np.maximum(within, 0)
+    std_error = np.sqrt(cells.groupby(group, observed=True)["variance"].sum())
+
+    out = pd.DataFrame({
+        "estimate": estimate,
+        "std_error": std_error,
+        "low": estimate - Z * std_error,
+        "high": estimate + Z * std_error,
+        "sample_rows": groups["c"].astype(int),
+    })
+    if not by and out.empty:
+        # Nothing sampled in the domain: a zero total, an unknown mean
+        value = np.nan if ratio else 0.0
+        return pd.DataFrame([{"estimate": value, "std_error": 0.0, "low": value, "high": value,
+                              "sample_rows": 0}])
+    return out.reset_index(drop=not by)
+
+
+def _values(sample, value):
+    if value is None:
+        return np.ones(len(sample))
+    return sample[value] if isinstance(value, str) else value
+
+
+def estimate_total(sample, value=None, by=None, domain=None):
+    """
+    Estimated population total of value (a column or array; rows when None)
+    per group of by, with std_error and the low / high confidence bounds.
+    """
+    return _estimate(sample, _values(sample, value), by, domain, ratio=False)
+
+
+def estimate_mean(sample, value, by=None, domain=None):
+    """Estimated population mean of value per group of by; NaNs are ignored as in pandas."""
+    return _estimate(sample, _values(sample, value), by, domain, ratio=True)
+
+
+def estimate_shares(sample, column, domain=None):
+    """Share of the rows (in domain) taking each value of column."""
+    values = sample[column]
+    levels = pd.Series(values[domain] if domain is not None else values).dropna().unique()
+    rows = []
+    for level in levels:
+        share = estimate_mean(sample, (values == level).to_numpy(dtype=np.float64), domain=domain)
+        rows.append({column: level, **share.iloc[0].to_dict()})
+    return pd.DataFrame(rows, columns=[column, "estimate", "std_error", "low", "high", "sample_rows"])
+
+
+def period_domain(sample, p):
+    """Rows of the sample in a utils.period_kpis period."""
+    filters = p["filters"]
+    unknown = set(filters) - {"year", "month", "festival", "date_from", "date_to"}
+    if unknown:
+        raise ValueError(f"Periods filtered on {sorted(unknown)} cannot be estimated from the sample")
+
+    mask = np.ones(len(sample), dtype=bool)
+    dates = pd.to_datetime(sample["date_key"])
+    for key in ("year", "month"):
+        if key in filters:
+            values = filters[key] if isinstance(filters[key], (list, tuple)) else [filters[key]]
+            mask &= sample[key].isin(values).to_numpy()
+    if "festival" in filters:
+        festival = sample["festival_name"].astype(object).fillna(NO_FESTIVAL) != NO_FESTIVAL
+        mask &= (festival if filters["festival"] else ~festival).to_numpy()
+    if filters.get("date_from") is not None:
+        mask &= (dates >= pd.Timestamp(filters["date_from"])).to_numpy()
+    if filters.get("date_to") is not None:
+        mask &= (dates < pd.Timestamp(filters["date_to"])).to_numpy()
+    return mask
+
+
+# Display
+
+def interval_text(row, fmt="{:,.2f}"):
+    """'95% CI 3.41 – 3.47, relative error ±0.8%' for one estimate row."""
+    estimate, low, high = row["estimate"], row["low"], row["high"]
+    if pd.isna(estimate):
+        return "No sampled rows"
+    text = f"95% CI {fmt.format(low)} – {fmt.format(high)}"
+    if estimate:
+        text += f", relative error ±{(high - estimate) / abs(estimate):.1%}"
+    return text
+
+
+def error_bars(estimates):
+    """(2, n) lower / upper distances for matplotlib yerr."""
+    return np.vstack([
+        (estimates["estimate"] - estimates["low"]).clip(lower=0).to_numpy(),
+        (estimates["high"] - estimates["estimate"]).clip(lower=0).to_numpy(),
+    ])
+
+
+def _exact(key):
+    st.session_state[key] = False
+
+
+def approximate_toggle(key):
+    """Sidebar switch to answer from the sample; returns True when it is on."""
+    approximate = st.sidebar.toggle(
+        "Approximate (sample)", key=key,
+        help="Answer from a stratified sample of transactions, with 95% confidence intervals."
+    )
+    if approximate:
+        st.sidebar.button("Recompute exactly", on_click=_exact, args=(key,))
+    return approximate
+
+
+if __name__ == "__main__":
+    from utils.db_connection import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    refresh_sample(conn)
+    conn.close()
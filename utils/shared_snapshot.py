@@ -0,0 +1,71 @@
+# utils/shared_snapshot.py
+"""
+Memory-mapped snapshots shared by every Streamlit worker on a host.
+
+@st.cache_data keeps one copy of each dataset per process (and hands every
+session its own unpickled copy), so memory grows with the number of
+workers. Snapshot_Builder.py also writes the large page datasets as
+uncompressed Arrow IPC files next to their Parquet snapshots:
+
+    snapshots/v42-1718000000/customer_transactions.arrow, .../inventory.arrow, ...
+
+Pages attach to the published build read-only: the file is memory-mapped
+and turned into a DataFrame without copying numeric, date and string
+columns (strings stay Arrow-backed), so the data lives once in the OS page
+cache whatever the number of processes. The switch is the snapshots
+CURRENT pointer; old builds stay on disk for processes still attached to
+them, and a build of an older data version is not attached at all.
+"""
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from utils import snapshots
+
+# The joined fact frames behind the Customer and Inventory pages
+SHARED_DATASETS = ["customers", "customer_transactions", "inventory"]
+
+
+def write_shared(directory, name, df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Uncompressed, so readers can map the buffers instead of decoding them
+    with pa.OSFile(str(Path(directory) / f"{name}.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _arrow_strings(arrow_type):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+@st.cache_resource(max_entries=len(SHARED_DATASETS) * 2, show_spinner=False)
+def attach(name, build):
+    """
+    Read-only DataFrame over the memory-mapped snapshot of one build directory.
+    Cached as a resource: every session of the process gets the same object,
+    which must not be modified.
+    """
+    path = snapshots.SNAPSHOT_DIR / build / f"{name}.arrow"
+    if not path.exists():
+        return None
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_arrow_strings)
+
+
+def load_shared(*names):
+    """The published shared frames for names, or None if any is missing."""
+    directory = snapshots.published_dir()
+    if directory is None:
+        return None
+    try:
+        frames = [attach(name, directory.name) for name in names]
+    except Exception as e:
+        print(f"Could not attach shared snapshot {names}: {e}")
+        return None
+    if any(df is None for df in frames):
+        return None
+    return frames[0] if len(frames) == 1 else tuple(frames)
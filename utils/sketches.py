@@ -0,0 +1,275 @@
+# utils/sketches.py
+"""
+HyperLogLog distinct-count sketches for active customers.
+
+The loader keeps one sketch per (grain, period, state, customer_segment) in
+the customer_sketches table, at day, month and year grain. Any date range
+is answered by merging the coarsest rows that cover it, so active-customer
+counts cost a few hundred register merges instead of a COUNT(DISTINCT)
+over the transactions table, and totals across groups are deduplicated.
+"""
+import sys
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from utils.analytics_backend import read_sql
+
+PRECISION = 12                      # 4096 registers, ~1.6% standard error
+NUM_REGISTERS = 1 << PRECISION
+VALUE_BITS = 64 - PRECISION
+
+
+# Sketch primitives: a sketch is a uint8 numpy array of NUM_REGISTERS registers
+
+def new_sketch():
+    return np.zeros(NUM_REGISTERS, dtype=np.uint8)
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of values (identical across processes and runs)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(x):
+    """Exact bit length of each uint64 in x."""
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n[big] += shift
+        x[big] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+def _register_updates(values):
+    hashes = hash_values(values)
+    index = (hashes >> np.uint64(VALUE_BITS)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << VALUE_BITS) - 1)
+    rank = (VALUE_BITS - _bit_length(remainder) + 1).astype(np.uint8)
+    return index, rank
+
+
+def build_sketches(group_codes, values, num_groups):
+    """Builds one sketch per group code in a single vectorized pass."""
+    index, rank = _register_updates(values)
+    registers = np.zeros(num_groups * NUM_REGISTERS, dtype=np.uint8)
+    np.maximum.at(registers, np.asarray(group_codes, dtype=np.int64) * NUM_REGISTERS + index, rank)
+    return registers.reshape(num_groups, NUM_REGISTERS)
+
+
+def merge(sketches):
+    """Union of sketches: the register-wise maximum."""
+    sketches = list(sketches)
+    if not sketches:
+        return new_sketch()
+    return np.maximum.reduce(sketches)
+
+
+def estimate(sketch):
+    """Estimated number of distinct values added to sketch."""
+    m = float(NUM_REGISTERS)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.power(2.0, -sketch.astype(np.float64)))
+    zeros = int(np.count_nonzero(sketch == 0))
+    if raw <= 2.5 * m and zeros > 0:
+        # Small-range correction (linear counting)
+        return m * np.log(m / zeros)
+    return raw
+
+
+def to_bytes(sketch):
+    return zlib.compress(sketch.tobytes())
+
+
+def from_bytes(blob):
+    return np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+
+
+# Range decomposition: cover [date_from, date_to) with year, month and day rows
+
+def _next_month(d):
+    return date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+
+
+def covering_periods(date_from, date_to):
+    """Returns [(grain, lo, hi)] ranges of period keys covering [date_from, date_to)."""
+    ranges = []
+    d = date_from
+    while d < date_to:
+        if d.month == 1 and d.day == 1 and date(d.year + 1, 1, 1) <= date_to:
+            end = d
+            while date(end.year + 1, 1, 1) <= date_to:
+                end = date(end.year + 1, 1, 1)
+            ranges.append(("year", d, end))
+            d = end
+        elif d.day == 1 and _next_month(d) <= date_to:
+            end = d
+            while _next_month(end) <= date_to and not (end.month == 1 and end != d):
+                end = _next_month(end)
+            ranges.append(("month", d, end))
+            d = end
+        else:
+            end = min(_next_month(d), date_to)
+            ranges.append(("day", d, end))
+            d = end
+    return ranges
+
+
+def load_sketch_rows(conn, date_from, date_to, states=None, segments=None):
+    """
+    Reads the sketch rows covering [date_from, date_to), optionally restricted
+    to some states and customer segments.
+    """
+    clauses = []
+    params = []
+    for grain, lo, hi in covering_periods(date_from, date_to):
+        clauses.append("(grain = %s AND period_start >= %s AND period_start < %s)")
+        params.extend([grain, lo, hi])
+    if not clauses:
+        return pd.DataFrame(columns=["grain", "period_start", "state", "customer_segment",
+                                     "revenue", "orders", "customer_sketch"])
+
+    query = f"""
+        SELECT grain, period_start, state, customer_segment, revenue, orders, customer_sketch
+        FROM customer_sketches
+        WHERE ({" OR ".join(clauses)})
+    """
+    for column, values in (("state", states), ("customer_segment", segments)):
+        if values:
+            query += f" AND {column} IN ({', '.join(['%s'] * len(values))})"
+            params.extend(values)
+
+    df = read_sql(query, conn, params)
+    df["revenue"] = df["revenue"].astype(float)
+    return df
+
+
+def count_distinct(sketch_rows):
+    """Deduplicated distinct-customer estimate over all given sketch rows."""
+    return estimate(merge(from_bytes(blob) for blob in sketch_rows["customer_sketch"]))
+
+
+def summarize(sketch_rows, by):
+    """
+    Revenue, orders and deduplicated customers per group of sketch rows.
+    The merged sketch of each group is kept so groups can be combined later.
+    """
+    out = []
+    for key, group in sketch_rows.groupby(by, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        sketch = merge(from_bytes(blob) for blob in group["customer_sketch"])
+        out.append(dict(zip(by, key),
+                        revenue=group["revenue"].sum(),
+                        orders=int(group["orders"].sum()),
+                        customers=int(round(estimate(sketch))),
+                        customer_sketch=to_bytes(sketch)))
+    return pd.DataFrame(out, columns=list(by) + ["revenue", "orders", "customers", "customer_sketch"])
+
+
+# Loader maintenance
+
+def _rows_for(grain, keys, revenue, orders, sketches):
+    return [
+        (grain, period, state, segment, float(rev), int(n), to_bytes(sk))
+        for (period, state, segment), rev, n, sk in zip(keys, revenue, orders, sketches)
+    ]
+
+
+def _write_rows(conn, grain, date_from, date_to, rows):
+    cursor = conn.cursor()
+    cursor.execute(
+        "DELETE FROM customer_sketches WHERE grain = %s AND period_start >= %s AND period_start < %s",
+        (grain, date_from, date_to)
+    )
+    cursor.executemany("""
+        INSERT INTO customer_sketches
+            (grain, period_start, state, customer_segment, revenue, orders, customer_sketch)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    conn.commit()
+    cursor.close()
+
+
+def _refresh_month(conn, month_start):
+    month_end = _next_month(month_start)
+    df = pd.read_sql("""
+        SELECT t.date_key, c.state, c.customer_segment, t.customer_id, t.corrected_price
+        FROM transactions t
+        JOIN customers c ON t.customer_id = c.customer_id
+        WHERE t.date_key >= %s AND t.date_key < %s
+    """, conn, params=[month_start, month_end])
+    df[["state", "customer_segment"]] = df[["state", "customer_segment"]].fillna("")
+    df["corrected_price"] = df["corrected_price"].astype(float)
+
+    # Day grain: one sketch per (date, state, segment)
+    groups = df.groupby(["date_key", "state", "customer_segment"], sort=True)
+    sizes = groups.size()
+    keys = list(sizes.index)
+    day_sketches = build_sketches(groups.ngroup().to_numpy(), df["customer_id"].to_numpy(), len(keys))
+    revenue = groups["corrected_price"].sum().to_numpy()
+    orders = sizes.to_numpy()
+    _write_rows(conn, "day", month_start, month_end,
+                _rows_for("day", keys, revenue, orders, day_sketches))
+
+    # Month grain: merge the day sketches of each (state, segment)
+    slices = pd.DataFrame(keys, columns=["date_key", "state", "customer_segment"])
+    slices["revenue"] = revenue
+    slices["orders"] = orders
+    month_rows = []
+    for (state, segment), idx in slices.groupby(["state", "customer_segment"]).groups.items():
+        idx = np.asarray(idx)
+        month_rows.append(("month", month_start, state, segment,
+                           float(slices["revenue"].to_numpy()[idx].sum()),
+                           int(slices["orders"].to_numpy()[idx].sum()),
+                           to_bytes(np.maximum.reduce(day_sketches[idx]))))
+    _write_rows(conn, "month", month_start, month_end, month_rows)
+
+
+def _refresh_year(conn, year):
+    year_start, year_end = date(year, 1, 1), date(year + 1, 1, 1)
+    months = pd.read_sql("""
+        SELECT state, customer_segment, revenue, orders, customer_sketch
+        FROM customer_sketches
+        WHERE grain = 'month' AND period_start >= %s AND period_start < %s
+    """, conn, params=[year_start, year_end])
+    rows = []
+    for (state, segment), group in months.groupby(["state", "customer_segment"]):
+        sketch = merge(from_bytes(blob) for blob in group["customer_sketch"])
+        rows.append(("year", year_start, state, segment, float(group["revenue"].sum()),
+                     int(group["orders"].sum()), to_bytes(sketch)))
+    _write_rows(conn, "year", year_start, year_end, rows)
+
+
+def refresh_sketches(conn, date_from, date_to):
+    """
+    Rebuilds the sketches of every month touching [date_from, date_to] from
+    the transactions table, then the affected year rows. Rebuilding from the
+    table keeps re-runs of the loader idempotent.
+    """
+    month = date(date_from.year, date_from.month, 1)
+    years = set()
+    while month <= date_to:
+        print(f"Refreshing customer sketches for {month:%Y-%m}...")
+        _refresh_month(conn, month)
+        years.add(month.year)
+        month = _next_month(month)
+
+    for year in sorted(years):
+        _refresh_year(conn, year)
+
+
+if __name__ == "__main__":
+    # Backfill: python -m utils.sketches
+    from utils.db_connection import get_connection
+
+    conn = get_connection()
+    if conn is None:
+        sys.exit("ERROR: No database connection available.")
+    bounds = pd.read_sql("SELECT MIN(date_key) AS lo, MAX(date_key) AS hi FROM transactions", conn)
+    if pd.isna(bounds["lo"].iloc[0]):
+        sys.exit("No transactions to sketch.")
+    refresh_sketches(conn, pd.Timestamp(bounds["lo"].iloc[0]).date(), pd.Timestamp(bounds["hi"].iloc[0]).date())
+    conn.close()
@@ -0,0 +1,138 @@
+# utils/snapshots.py
+"""
+Versioned on-disk snapshots of the dashboard datasets.
+
+Snapshot_Builder.py runs each page's data preparation headless and
+publishes the results here as zstd-compressed Parquet files (plus
+memory-mapped Arrow copies of the large ones, see utils/shared_snapshot.py):
+
+    snapshots/
+        v42-1718000000/executive_kpis.parquet, .../inventory.parquet, .../inventory.arrow, ...
+        CURRENT            <- "v42-1718000000", replaced atomically after a full build
+
+Every build writes a new directory (data version plus build time), so
+rebuilding a version never touches the one readers are using.
+
+Pages call read_snapshot() first and only query the warehouse when no
+snapshot of the current data version is published: a cold start reads
+local files, and a load without a snapshot build falls back to live
+queries instead of serving the previous version.
+"""
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.analytics_backend import get_analytics_connection
+from utils.load_runs import get_data_version
+
+SNAPSHOT_DIR = Path(os.environ.get(
+    "DASHBOARD_SNAPSHOT_DIR", Path(__file__).resolve().parent.parent / "snapshots"
+))
+KEEP_VERSIONS = 3
+# How long a looked-up data version is trusted before load_runs is asked again
+VERSION_CHECK_SECONDS = 30
+
+_version_lock = threading.Lock()
+_checked = (None, 0.0)  # (data version, monotonic time of the lookup)
+
+
+def version_name(version):
+    return f"v{int(version)}"
+
+
+def directory_version(path):
+    """The data version of a snapshot directory name such as v42-1718000000."""
+    return int(Path(path).name[1:].split("-")[0])
+
+
+def staging_dir(version):
+    """A new directory for one build, published under its name without .tmp."""
+    path = SNAPSHOT_DIR / f"{version_name(version)}-{time.time_ns()}.tmp"
+    path.mkdir(parents=True)
+    return path
+
+
+def seed_from_current(directory):
+    """Copies the published snapshots into directory, for partial rebuilds."""
+    current = current_dir()
+    if current is None or not current.exists():
+        return
+    for pattern in ("*.parquet", "*.arrow"):
+        for path in current.glob(pattern):
+            shutil.copy2(path, Path(directory) / path.name)
+
+
+def write_snapshot(directory, name, df):
+    df.to_parquet(Path(directory) / f"{name}.parquet", compression="zstd", index=False)
+
+
+def publish(directory):
+    """Moves a finished staging directory into place and points CURRENT at it."""
+    directory = Path(directory)
+    final = directory.with_name(directory.name[:-len(".tmp")])
+    os.replace(directory, final)
+
+    pointer = SNAPSHOT_DIR / "CURRENT.tmp"
+    pointer.write_text(final.name)
+    os.replace(pointer, SNAPSHOT_DIR / "CURRENT")
+
+    # Keep a few old builds for processes still reading them
+    old = sorted(
+        (p for p in SNAPSHOT_DIR.glob("v*") if p.is_dir() and not p.name.endswith(".tmp")),
+        key=lambda p: (directory_version(p), p.name)
+    )
+    for path in old[:-KEEP_VERSIONS]:
+        if path != final:
+            shutil.rmtree(path, ignore_errors=True)
+    return final
+
+
+def current_dir():
+    pointer = SNAPSHOT_DIR / "CURRENT"
+    if not pointer.exists():
+        return None
+    return SNAPSHOT_DIR / pointer.read_text().strip()
+
+
+def current_version():
+    path = current_dir()
+    return directory_version(path) if path is not None else None
+
+
+def data_version():
+    """The latest loaded data version, looked up at most every VERSION_CHECK_SECONDS."""
+    global _checked
+    with _version_lock:
+        version, checked_at = _checked
+        if version is None or time.monotonic() - checked_at > VERSION_CHECK_SECONDS:
+            version = get_data_version(get_analytics_connection())
+            _checked = (version, time.monotonic())
+        return version
+
+
+def published_dir():
+    """The published directory if it holds the current data version, else None."""
+    path = current_dir()
+    if path is None:
+        return None
+    version = data_version()
+    # 0 means load_runs could not be read: serve the snapshot rather than nothing
+    if version and directory_version(path) != version:
+        return None
+    return path
+
+
+def read_snapshot(name):
+    """The published snapshot called name, or None if there is none for the current data."""
+    path = published_dir()
+    if path is None or not (path / f"{name}.parquet").exists():
+        return None
+    try:
+        return pd.read_parquet(path / f"{name}.parquet")
+    except Exception as e:
+        print(f"Could not read snapshot {name}: {e}")
+        return None
@@ -0,0 +1,159 @@
+# utils/typed_fetch.py
+"""
+Streaming, typed result fetch for the large page datasets.
+
+pd.read_sql on a mysql.connector connection buffers the whole result, turns
+every cell into a Python object (a Decimal for each price, a date for each
+date_key) and only then builds the frame, so peak memory is several times
+the final DataFrame. stream_mysql() reads with an unbuffered raw cursor in
+fetchmany() chunks and converts each chunk column by column from the wire
+bytes straight into NumPy arrays:
+
+    DECIMAL / FLOAT / DOUBLE   float64 (or nullable int64 cents, cents=True)
+    integer types              int64 (float64 with NaN for NULLs, as pd.read_sql)
+    DATE / DATETIME            datetime64
+    low-cardinality strings    categorical codes
+    other strings              str objects
+
+so at most one chunk of Python objects is alive at a time.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from mysql.connector.constants import FieldType
+
+from utils.profiling import record
+
+CHUNK_ROWS = 50_000
+# A string column becomes categorical if its first chunk has at most this
+# many distinct values, and they repeat (at most half the rows)
+MAX_CATEGORIES = 1000
+
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE}
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+INT_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG,
+             FieldType.INT24, FieldType.YEAR}
+DATE_TYPES = {FieldType.DATE: "datetime64[ns]", FieldType.DATETIME: "datetime64[ns]",
+              FieldType.TIMESTAMP: "datetime64[ns]"}
+BINARY_TYPES = {FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB, FieldType.BLOB}
+
+_stats = deque(maxlen=50)
+_stats_lock = threading.Lock()
+
+
+# Column conversion
+
+def _as_bytes(values):
+    """Object array of the raw cells; the pure-Python connector returns bytearrays."""
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, bytearray):
+        values = [None if v is None else bytes(v) for v in values]
+    return np.array(values, dtype=object)
+
+
+def _parse(raw, nulls, fill, dtype):
+    raw[nulls] = fill
+    return raw.astype("S").astype(dtype)
+
+
+def convert_column(values, type_code, categorical=None, cents=False):
+    """
+    Converts one chunk of raw cells. Returns (array, categorical), where
+    categorical is the string-column decision to reuse for later chunks.
+    """
+    raw = _as_bytes(values)
+    nulls = pd.isna(raw)
+
+    if type_code in DECIMAL_TYPES and cents:
+        amounts = np.rint(_parse(raw, nulls, b"nan", np.float64) * 100)
+        return pd.array(amounts, dtype="Int64"), None
+    if type_code in FLOAT_TYPES or type_code in DECIMAL_TYPES:
+        return _parse(raw, nulls, b"nan", np.float64), None
+    if type_code in INT_TYPES:
+        if nulls.any():
+            return _parse(raw, nulls, b"nan", np.float64), None
+        return _parse(raw, nulls, b"0", np.int64), None
+    if type_code in DATE_TYPES:
+        return _parse(raw, nulls, b"NaT", DATE_TYPES[type_code]), None
+    if type_code in BINARY_TYPES:
+        return raw, None
+
+    codes, uniques = pd.factorize(raw)
+    if categorical is None:
+        categorical = len(uniques) <= MAX_CATEGORIES and len(uniques) <= max(len(raw) // 2, 1)
+    if categorical:
+        return pd.Categorical.from_codes(codes, [u.decode() for u in uniques]), True
+    return pd.Series(raw, dtype=object).str.decode("utf-8").to_numpy(dtype=object), False
+
+
+def _combine(parts):
+    if not parts:
+        return np.array([], dtype=object)
+    if isinstance(parts[0], pd.Categorical):
+        return pd.api.types.union_categoricals(parts)
+    if any(isinstance(p, pd.api.extensions.ExtensionArray) for p in parts):
+        return pd.concat([pd.Series(p) for p in parts], ignore_index=True).array
+    return np.concatenate(parts)
+
+
+# Fetching
+
+def stream_mysql(conn, query, params=None, chunk_rows=CHUNK_ROWS, cents=False):
+    """Runs query on a MySQL connection and builds a typed DataFrame chunk by chunk."""
+    cursor = conn.cursor(raw=True, buffered=False)
+    try:
+        cursor.execute(query, params or None)
+        names = [d[0] for d in cursor.description]
+        type_codes = [d[1] for d in cursor.description]
+        columns = [[] for _ in names]
+        categorical = [None] * len(names)
+
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            for i, values in enumerate(zip(*rows)):
+                part, categorical[i] = convert_column(values, type_codes[i], categorical[i], cents)
+                columns[i].append(part)
+            del rows
+    finally:
+        cursor.close()
+    return pd.DataFrame({name: _combine(parts) for name, parts in zip(names, columns)})
+
+
+def categorize(df):
+    """Low-cardinality string columns of an already-typed frame (e.g. from DuckDB) as categoricals."""
+    for column in df.columns:
+        if df[column].dtype == object and len(df):
+            distinct = df[column].nunique()
+            if distinct <= MAX_CATEGORIES and distinct <= len(df) // 2:
+                df[column] = df[column].astype("category")
+    return df
+
+
+# Throughput
+
+def report(label, df, seconds):
+    """Records and logs one fetch: rows, seconds, rows/s and frame size."""
+    # Shallow size: exact for numeric and categorical columns, cheap to compute
+    megabytes = df.memory_usage().sum() / 2 ** 20
+    stats = {
+        "query": label,
+        "rows": len(df),
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(df) / seconds) if seconds else None,
+        "frame_mb": round(megabytes, 1),
+    }
+    with _stats_lock:
+        _stats.append(stats)
+    record("fetch", label, seconds)
+    print(f"Fetched {label}: {len(df):,} rows in {seconds:.2f}s "
+          f"({stats['rows_per_sec'] or 0:,} rows/s, {megabytes:.1f} MB)")
+
+
+def fetch_stats():
+    """The most recent fetches, newest last."""
+    with _stats_lock:
+        return list(_stats)